@@ -8,3 +8,14 @@ CALL sp_UpdateRegionSurplusAndImports();
 CALL sp_CalculatePlantEfficiency();
 
 CALL sp_InsertAllMissingActiveStatuses();
+
+
+-- Date-scoped refresh (only the report dates of the last ingest, see DML.sql):
+-- CREATE TEMPORARY TABLE IF NOT EXISTS tmp_ingest_dates (Report_Date DATE PRIMARY KEY);
+-- CREATE TEMPORARY TABLE IF NOT EXISTS tmp_new_plants (Plant_ID VARCHAR(20) PRIMARY KEY);
+-- INSERT IGNORE INTO tmp_ingest_dates VALUES ('2025-08-01');
+-- UPDATE REGION_DETAILS rd JOIN tmp_ingest_dates t ON rd.Report_Date = t.Report_Date SET rd.Grid_Frequency_Hz = 60.00;
+-- CALL sp_UpdateRegionGenerationForDates();
+-- CALL sp_UpdateRegionSurplusAndImportsForDates();
+-- CALL sp_CalculatePlantEfficiencyForDates();
+-- CALL sp_InsertMissingActiveStatusesForDates();
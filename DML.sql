@@ -140,6 +140,144 @@ END$$
 
 DELIMITER ;
 
+-- ------------------------------------------------------------------
+-- Date-scoped variants of the post-load procedures.
+-- They only touch the report dates listed in the session's temporary
+-- table tmp_ingest_dates, filled by the caller on the same connection:
+--
+--   CREATE TEMPORARY TABLE IF NOT EXISTS tmp_ingest_dates (Report_Date DATE PRIMARY KEY);
+--   INSERT IGNORE INTO tmp_ingest_dates VALUES ('2025-08-01'), ('2025-08-02');
+--
+-- REGION_DETAILS.Report_Date and PRODUCTIONLOG.Log_Date are indexed
+-- (their DATE_DIM foreign keys), so each call reads only those dates.
+-- A temporary table can be opened only once per statement, hence one
+-- reference to it in each UPDATE.
+-- ------------------------------------------------------------------
+
+DELIMITER $$
+
+CREATE PROCEDURE sp_UpdateRegionGenerationForDates()
+BEGIN
+    UPDATE REGION_DETAILS AS rd
+    JOIN (
+        -- Total actual generation per state, for the touched dates only
+        SELECT 
+            p.State_Code,
+            pl.Log_Date,
+            SUM(pl.Todays_Actual_MU) AS Total_Actual_MU
+        FROM 
+            tmp_ingest_dates AS t
+        JOIN 
+            PRODUCTIONLOG AS pl ON pl.Log_Date = t.Report_Date
+        JOIN 
+            POWERPLANTS AS p ON pl.Plant_ID = p.Plant_ID
+        WHERE
+            p.State_Code IS NOT NULL
+        GROUP BY 
+            p.State_Code, pl.Log_Date
+    ) AS daily_totals 
+    ON 
+        rd.State_Code = daily_totals.State_Code 
+        AND rd.Report_Date = daily_totals.Log_Date
+    SET 
+        rd.Generated_MU = daily_totals.Total_Actual_MU;
+END$$
+
+DELIMITER ;
+
+DELIMITER $$
+
+CREATE PROCEDURE sp_UpdateRegionSurplusAndImportsForDates()
+BEGIN
+    UPDATE REGION_DETAILS AS rd
+    JOIN tmp_ingest_dates AS t ON rd.Report_Date = t.Report_Date
+    SET 
+        rd.Surplus_MU = CASE 
+                            WHEN rd.Generated_MU > rd.Demand_MU THEN (rd.Generated_MU - rd.Demand_MU) 
+                            ELSE 0 
+                        END,
+        
+        rd.Imported_MU = CASE 
+                             WHEN rd.Demand_MU > rd.Generated_MU THEN (rd.Demand_MU - rd.Generated_MU) 
+                             ELSE 0 
+                         END
+    WHERE 
+        rd.Generated_MU IS NOT NULL 
+        AND rd.Demand_MU IS NOT NULL;
+END$$
+
+DELIMITER ;
+
+DELIMITER $$
+
+CREATE PROCEDURE sp_CalculatePlantEfficiencyForDates()
+BEGIN
+    UPDATE PRODUCTIONLOG AS pl
+    JOIN tmp_ingest_dates AS t ON pl.Log_Date = t.Report_Date
+    SET 
+        pl.Efficiency_Percentage = (pl.Todays_Actual_MU / pl.Capable_Generation_MU) * 100
+    WHERE 
+        pl.Capable_Generation_MU IS NOT NULL 
+        AND pl.Capable_Generation_MU > 0
+        AND pl.Todays_Actual_MU IS NOT NULL;
+END$$
+
+DELIMITER ;
+
+-- Incremental sp_InsertAllMissingActiveStatuses: 'Active' rows only for
+-- (every plant x the dates in tmp_ingest_dates) and (the plants in
+-- tmp_new_plants x every date), so a run costs plants + new plants x dates
+-- instead of plants x all dates. The caller also fills
+--
+--   CREATE TEMPORARY TABLE IF NOT EXISTS tmp_new_plants (Plant_ID VARCHAR(20) PRIMARY KEY);
+--
+-- Both anti-joins are index lookups on idx_opstatus_plant_date
+-- (IndianEnergyDB.sql; on an existing database:
+--   ALTER TABLE OPERATIONAL_STATUS ADD INDEX idx_opstatus_plant_date (Plant_ID, Status_Date);)
+
+DELIMITER $$
+
+CREATE PROCEDURE sp_InsertMissingActiveStatusesForDates()
+BEGIN
+    -- Every plant, for the touched dates
+    INSERT INTO OPERATIONAL_STATUS (
+        Plant_ID, Unit_Number, Status_Date, Status,
+        Cap_Under_Outage_MW, Expected_Sync_Date, Remarks, Outage_Date
+    )
+    SELECT 
+        p.Plant_ID, 'Main', d.`Date`, 'Active', 0.00, NULL, NULL, NULL
+    FROM 
+        tmp_ingest_dates AS t
+    JOIN 
+        DATE_DIM AS d ON d.`Date` = t.Report_Date
+    CROSS JOIN 
+        POWERPLANTS AS p
+    LEFT JOIN 
+        OPERATIONAL_STATUS AS os ON os.Plant_ID = p.Plant_ID AND os.Status_Date = d.`Date`
+    WHERE 
+        os.Plant_ID IS NULL;
+
+    -- New plants, for every date
+    INSERT INTO OPERATIONAL_STATUS (
+        Plant_ID, Unit_Number, Status_Date, Status,
+        Cap_Under_Outage_MW, Expected_Sync_Date, Remarks, Outage_Date
+    )
+    SELECT 
+        p.Plant_ID, 'Main', d.`Date`, 'Active', 0.00, NULL, NULL, NULL
+    FROM 
+        tmp_new_plants AS n
+    JOIN 
+        POWERPLANTS AS p ON p.Plant_ID = n.Plant_ID
+    CROSS JOIN 
+        DATE_DIM AS d
+    LEFT JOIN 
+        OPERATIONAL_STATUS AS os ON os.Plant_ID = p.Plant_ID AND os.Status_Date = d.`Date`
+    WHERE 
+        os.Plant_ID IS NULL;
+END$$
+
+DELIMITER ;
+
 DELIMITER $$
 CREATE PROCEDURE sp_GenerateDailyEnergyReport(IN report_date DATE)
 BEGIN
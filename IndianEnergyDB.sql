@@ -55,6 +55,7 @@ CREATE TABLE OPERATIONAL_STATUS (
     Remarks TEXT,
     
     PRIMARY KEY (Plant_ID, Unit_Number, Status_Date),
+    INDEX idx_opstatus_plant_date (Plant_ID, Status_Date), -- Missing-status anti-joins
     
     FOREIGN KEY (Plant_ID) REFERENCES POWERPLANTS(Plant_ID),
     FOREIGN KEY (Status_Date) REFERENCES DATE_DIM(`Date`)
@@ -91,6 +92,25 @@ CREATE TABLE PRODUCTIONLOG (
     FOREIGN KEY (Log_Date) REFERENCES DATE_DIM(`Date`)
 );
 
+-- INGEST_MANIFEST (one row per source file a loader has seen; see ingest_manifest.py)
+CREATE TABLE INGEST_MANIFEST (
+    Source VARCHAR(20) NOT NULL,
+    File_Name VARCHAR(255) NOT NULL,
+    Content_Hash CHAR(64) NOT NULL,
+    File_Size BIGINT,
+    File_Mtime DOUBLE,
+    Report_Date DATE,
+    Status ENUM('loaded', 'failed') NOT NULL,
+    Rows_Loaded INT,
+    Parse_Seconds DECIMAL(10, 3),
+    Load_Seconds DECIMAL(10, 3),
+    Error TEXT,
+    Loaded_At DATETIME NOT NULL,
+
+    PRIMARY KEY (Source, File_Name),
+    INDEX idx_manifest_source_date (Source, Report_Date)
+);
+
 INSERT INTO STATE (State_Code, State_Name, Region, Population)
 VALUES 
 -- Northern Region
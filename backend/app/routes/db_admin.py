@@ -3,8 +3,7 @@ from app import db
 from sqlalchemy import text
 from datetime import datetime
 import traceback
-import subprocess
-import os
+from app.services.pipeline_job_service import PipelineJobService
 
 bp = Blueprint('db_admin', __name__)
 
@@ -173,168 +172,48 @@ def calculate_regional_metrics():
 
 @bp.route('/run-data-update', methods=['POST'])
 def run_data_update():
-    """Run the complete data update pipeline:
-    1. integrated_web_scrapping.py
-    2. parseall1.py
-    3. parseall2.py
-    4. parseall3.py
-    5. SQL updates and stored procedures
+    """Start the complete data update pipeline (pipeline.py at the project root) as a
+    background job and return its job ID right away (202). If a job is already running,
+    that job is returned with 409. Poll /run-data-update/jobs/<job_id> for progress.
+    Optional JSON body: {"full_refresh": true} recomputes every date after the load.
     """
     try:
-        # Get the base directory (DBMS_Final folder)
-        base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
-        
-        # Get Python executable from config
-        from app.config import Config
-        python_exe = getattr(Config, 'PYTHON_EXECUTABLE', 'python')
-        
-        results = []
-        
-        # Step 1: Run integrated_web_scrapping.py
-        print("Step 1: Running integrated_web_scrapping.py...")
-        script1 = os.path.join(base_dir, 'integrated_web_scrapping.py')
-        try:
-            result = subprocess.run(
-                [python_exe, script1],
-                cwd=base_dir,
-                capture_output=True,
-                text=True,
-                timeout=1500,  # 25 minutes timeout
-                env={**os.environ, 'PYTHONIOENCODING': 'utf-8'}  # Fix Unicode encoding
-            )
-            results.append({
-                'step': 'Web Scraping',
-                'success': result.returncode == 0,
-                'output': result.stdout[-500:] if result.stdout else '',  # Last 500 chars
-                'error': result.stderr[-500:] if result.stderr else ''
-            })
-            if result.returncode != 0:
-                print(f"Web scraping failed: {result.stderr}")
-        except Exception as e:
-            results.append({'step': 'Web Scraping', 'success': False, 'error': str(e)})
-            print(f"Web scraping error: {e}")
-        
-        # Step 2: Run parseall1.py
-        print("Step 2: Running parseall1.py...")
-        script2 = os.path.join(base_dir, 'parseall1.py')
-        try:
-            result = subprocess.run(
-                [python_exe, script2],
-                cwd=base_dir,
-                capture_output=True,
-                text=True,
-                timeout=1500,
-                env={**os.environ, 'PYTHONIOENCODING': 'utf-8'}
-            )
-            results.append({
-                'step': 'Parse Phase 1',
-                'success': result.returncode == 0,
-                'output': result.stdout[-500:] if result.stdout else '',
-                'error': result.stderr[-500:] if result.stderr else ''
-            })
-            if result.returncode != 0:
-                print(f"Parse 1 failed: {result.stderr}")
-        except Exception as e:
-            results.append({'step': 'Parse Phase 1', 'success': False, 'error': str(e)})
-            print(f"Parse 1 error: {e}")
-        
-        # Step 3: Run parseall2.py
-        print("Step 3: Running parseall2.py...")
-        script3 = os.path.join(base_dir, 'parseall2.py')
-        try:
-            result = subprocess.run(
-                [python_exe, script3],
-                cwd=base_dir,
-                capture_output=True,
-                text=True,
-                timeout=1500,
-                env={**os.environ, 'PYTHONIOENCODING': 'utf-8'}
-            )
-            results.append({
-                'step': 'Parse Phase 2',
-                'success': result.returncode == 0,
-                'output': result.stdout[-500:] if result.stdout else '',
-                'error': result.stderr[-500:] if result.stderr else ''
-            })
-            if result.returncode != 0:
-                print(f"Parse 2 failed: {result.stderr}")
-        except Exception as e:
-            results.append({'step': 'Parse Phase 2', 'success': False, 'error': str(e)})
-            print(f"Parse 2 error: {e}")
-        
-        # Step 4: Run parseall3.py
-        print("Step 4: Running parseall3.py...")
-        script4 = os.path.join(base_dir, 'parseall3.py')
-        try:
-            result = subprocess.run(
-                [python_exe, script4],
-                cwd=base_dir,
-                capture_output=True,
-                text=True,
-                timeout=1500,
-                env={**os.environ, 'PYTHONIOENCODING': 'utf-8'}
-            )
-            results.append({
-                'step': 'Parse Phase 3',
-                'success': result.returncode == 0,
-                'output': result.stdout[-500:] if result.stdout else '',
-                'error': result.stderr[-500:] if result.stderr else ''
-            })
-            if result.returncode != 0:
-                print(f"Parse 3 failed: {result.stderr}")
-        except Exception as e:
-            results.append({'step': 'Parse Phase 3', 'success': False, 'error': str(e)})
-            print(f"Parse 3 error: {e}")
-        
-        # Step 5: Run SQL updates
-        print("Step 5: Running SQL updates...")
-        sql_results = []
-        
-        try:
-            # Update Grid Frequency
-            db.session.execute(text("UPDATE REGION_DETAILS SET Grid_Frequency_Hz = 60.00"))
-            db.session.commit()
-            sql_results.append({'query': 'UPDATE REGION_DETAILS', 'success': True})
-        except Exception as e:
-            db.session.rollback()
-            sql_results.append({'query': 'UPDATE REGION_DETAILS', 'success': False, 'error': str(e)})
-            print(f"Update REGION_DETAILS error: {e}")
-        
-        # Call stored procedures
-        procedures = [
-            'sp_UpdateRegionGenerationFromProduction',
-            'sp_UpdateRegionSurplusAndImports',
-            'sp_CalculatePlantEfficiency',
-            'sp_InsertAllMissingActiveStatuses'
-        ]
-        
-        for proc_name in procedures:
-            try:
-                db.session.execute(text(f"CALL {proc_name}()"))
-                db.session.commit()
-                sql_results.append({'procedure': proc_name, 'success': True})
-                print(f"Successfully called {proc_name}")
-            except Exception as e:
-                db.session.rollback()
-                sql_results.append({'procedure': proc_name, 'success': False, 'error': str(e)})
-                print(f"Error calling {proc_name}: {e}")
-        
-        results.append({
-            'step': 'Database Updates',
-            'success': all(r.get('success', False) for r in sql_results),
-            'details': sql_results
-        })
-        
-        # Determine overall success
-        overall_success = all(r.get('success', False) for r in results)
-        
+        full_refresh = bool(request.json.get('full_refresh')) if request.is_json else False
+        job, created = PipelineJobService.start_job(full_refresh=full_refresh)
         return jsonify({
-            'success': overall_success,
-            'message': f"Pipeline completed. {sum(1 for r in results if r.get('success'))} of {len(results)} steps succeeded.",
-            'results': results
-        }), 200
-        
+            'success': created,
+            'job_id': job['job_id'],
+            'status': job['status'],
+            'status_url': f"/api/admin/run-data-update/jobs/{job['job_id']}",
+            'message': 'Data update started.' if created else 'A data update is already running.',
+            'job': job
+        }), 202 if created else 409
+
     except Exception as e:
         tb = traceback.format_exc()
         print(f"Error in run_data_update: {e}\n{tb}")
         return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@bp.route('/run-data-update/jobs', methods=['GET'])
+def list_data_update_jobs():
+    """Recent data update jobs, newest first (stage output omitted)."""
+    return jsonify({'success': True, 'jobs': PipelineJobService.list_jobs()}), 200
+
+
+@bp.route('/run-data-update/jobs/<job_id>', methods=['GET'])
+def get_data_update_job(job_id):
+    """Status of one data update job with per-stage state, durations and output tail."""
+    job = PipelineJobService.get_job(job_id)
+    if not job:
+        return jsonify({'success': False, 'error': f'Unknown job: {job_id}'}), 404
+    return jsonify({'success': True, 'job': job}), 200
+
+
+@bp.route('/run-data-update/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_data_update_job(job_id):
+    """Cancel a data update job: no further stages start; the running ones finish first."""
+    job = PipelineJobService.cancel_job(job_id)
+    if not job:
+        return jsonify({'success': False, 'error': f'Unknown job: {job_id}'}), 404
+    return jsonify({'success': True, 'job': job}), 202
@@ -0,0 +1,152 @@
+import os
+import sys
+import uuid
+import threading
+import traceback
+from collections import OrderedDict
+from datetime import datetime
+
+# The pipeline scripts live in the base directory (DBMS_Final folder)
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+MAX_JOBS = 20  # Finished jobs kept for status queries (oldest dropped first)
+
+ACTIVE_STATES = ('queued', 'running', 'cancelling')
+
+
+def _now():
+    return datetime.utcnow().isoformat(timespec='seconds') + 'Z'
+
+
+class PipelineJobService:
+    """Runs the data-update pipeline (pipeline.py) as a background job in this process.
+
+    Jobs live in memory, so status queries must reach the process that started the job
+    (the default single-process Flask server). Only one job runs at a time.
+    """
+
+    _jobs = OrderedDict()
+    _cancel_events = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _pipeline():
+        if BASE_DIR not in sys.path:
+            sys.path.insert(0, BASE_DIR)
+        import pipeline
+        return pipeline
+
+    @classmethod
+    def start_job(cls, full_refresh=False):
+        """Queue a pipeline run; returns (job, created). With a job already active, that job
+        is returned with created=False. full_refresh recomputes every date after the load,
+        not only the report dates it wrote."""
+        pipeline = cls._pipeline()
+        stages = pipeline.default_stages()
+        with cls._lock:
+            for job in cls._jobs.values():
+                if job['status'] in ACTIVE_STATES:
+                    return cls._snapshot(job), False
+            job_id = uuid.uuid4().hex
+            job = {
+                'job_id': job_id,
+                'status': 'queued',
+                'created_at': _now(),
+                'started_at': None,
+                'finished_at': None,
+                'duration_s': None,
+                'message': '',
+                'full_refresh': bool(full_refresh),
+                'stages': OrderedDict((s.name, {'step': s.step, 'state': 'pending', 'deps': list(s.deps)}) for s in stages),
+            }
+            cls._jobs[job_id] = job
+            cls._cancel_events[job_id] = threading.Event()
+            while len(cls._jobs) > MAX_JOBS:
+                old_id, old = next(iter(cls._jobs.items()))
+                if old['status'] in ACTIVE_STATES:
+                    break
+                cls._jobs.pop(old_id)
+                cls._cancel_events.pop(old_id, None)
+        threading.Thread(target=cls._run, args=(job_id, stages, full_refresh), name=f"pipeline-{job_id[:8]}", daemon=True).start()
+        return cls._snapshot(job), True
+
+    @classmethod
+    def _run(cls, job_id, stages, full_refresh):
+        pipeline = cls._pipeline()
+        job = cls._jobs[job_id]
+        cancel_event = cls._cancel_events[job_id]
+
+        def on_event(name, state, result):
+            with cls._lock:
+                stage = job['stages'][name]
+                if state == 'running':
+                    stage.update({'state': 'running', 'started_at': _now()})
+                else:
+                    stage.update(result)
+                    stage['state'] = 'cancelled' if state == 'cancelled' else ('succeeded' if result['success'] else 'failed')
+                    stage['finished_at'] = _now()
+
+        with cls._lock:
+            if job['status'] == 'queued':
+                job['status'] = 'running'
+            job['started_at'] = _now()
+        started = datetime.utcnow()
+        try:
+            results = pipeline.run_pipeline(stages, on_event=on_event, cancel_event=cancel_event, full_refresh=full_refresh)
+            succeeded = sum(1 for r in results if r.get('success'))
+            # A cancel arriving after the last stage started skips nothing: the run finished normally
+            if any(r.get('cancelled') for r in results):
+                status = 'cancelled'
+            else:
+                status = 'succeeded' if succeeded == len(results) else 'failed'
+            message = f"Pipeline {status}. {succeeded} of {len(results)} steps succeeded."
+        except Exception as e:
+            print(f"Error in pipeline job {job_id}: {e}\n{traceback.format_exc()}")
+            status, message = 'failed', str(e)
+        with cls._lock:
+            job.update({
+                'status': status,
+                'message': message,
+                'finished_at': _now(),
+                'duration_s': round((datetime.utcnow() - started).total_seconds(), 2),
+            })
+
+    @classmethod
+    def get_job(cls, job_id):
+        with cls._lock:
+            job = cls._jobs.get(job_id)
+            return cls._snapshot(job) if job else None
+
+    @classmethod
+    def list_jobs(cls):
+        """Jobs newest first, without stage output."""
+        with cls._lock:
+            jobs = [cls._snapshot(job) for job in reversed(cls._jobs.values())]
+        for job in jobs:
+            for stage in job['stages']:
+                stage.pop('output', None)
+        return jobs
+
+    @classmethod
+    def cancel_job(cls, job_id):
+        """Stop starting new stages; running stages finish first (status 'cancelling' until then).
+        Returns the job, or None if unknown."""
+        with cls._lock:
+            job = cls._jobs.get(job_id)
+            if not job:
+                return None
+            if job['status'] in ACTIVE_STATES:
+                cls._cancel_events[job_id].set()
+                job['status'] = 'cancelling'
+            return cls._snapshot(job)
+
+    @staticmethod
+    def _snapshot(job):
+        """JSON-ready copy of a job (call with the lock held)."""
+        data = {k: v for k, v in job.items() if k != 'stages'}
+        data['stages'] = [{'stage': name, **stage} for name, stage in job['stages'].items()]
+        data['progress'] = {
+            'done': sum(1 for s in job['stages'].values() if s['state'] in ('succeeded', 'failed', 'cancelled')),
+            'total': len(job['stages']),
+        }
+        data['success'] = job['status'] == 'succeeded'
+        return data
@@ -0,0 +1,326 @@
+"""
+benchmark_ingest.py
+
+Measures ingest speed of parseall1.py (DGR XLS), parseall2.py (cleaned RE XLSX) and
+parseall3.py (state_daily_avg.csv) over the report corpus committed in this repo.
+
+- Each parser runs in a fresh process, so peak RSS is per parser
+- Rows go to a pluggable sink: memory (no DB), sqlite (file or :memory:) or mysql
+  (point it at a scratch copy of IndianEnergyDB; parseall2 commits its plant/date rows there)
+- Reports rows/s, read / parse / write seconds and peak RSS as JSON, so runs on two
+  commits can be diffed
+
+Usage:
+  python benchmark_ingest.py --sink memory --json bench.json
+  python benchmark_ingest.py --sink sqlite --sqlite-path bench.db --parsers parseall1 --limit 10
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import re
+import sqlite3
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, redirect_stdout
+from datetime import date, datetime
+
+from bulk_loader import StagedTable
+
+PARSERS = ['parseall1', 'parseall2', 'parseall3']
+RE_REPORTS_FOLDER = "Processed_Renewable_XLSX_reports" # parseall2.REPORTS_FOLDER is an absolute local path
+MYSQL_DEFAULTS = {'host': 'localhost', 'port': 3306, 'user': 'root', 'password': '', 'database': 'IndianEnergyDB_bench'}
+
+# parseall3 has no staging spec of its own: its single upsert
+DEMAND_TABLES = {'REGION_DEMAND': StagedTable('REGION_DETAILS', ['State_Code', 'Report_Date', 'Demand_MU'], ['Demand_MU'])}
+
+# Tables (columns, primary key) the sqlite sink creates; the subset of IndianEnergyDB.sql the parsers touch
+SQLITE_SCHEMA = {
+    'STATE': (['State_Code', 'State_Name', 'Region', 'Population'], ['State_Code']),
+    'SECTOR': (['Sector_ID', 'Sector_Name'], ['Sector_ID']),
+    'DATE_DIM': (['Date', 'Day', 'Month', 'Year'], ['Date']),
+    'POWERPLANTS': (['Plant_ID', 'Plant_Name', 'State_Code', 'Sector_ID', 'Type_ID'], ['Plant_ID']),
+    'OPERATIONAL_STATUS': (['Plant_ID', 'Unit_Number', 'Status_Date', 'Cap_Under_Outage_MW', 'Status', 'Outage_Date', 'Expected_Sync_Date', 'Remarks'],
+                           ['Plant_ID', 'Unit_Number', 'Status_Date']),
+    'REGION_DETAILS': (['State_Code', 'Report_Date', 'Generated_MU', 'Imported_MU', 'Surplus_MU', 'Demand_MU', 'Monitored_Capacity_MW', 'Grid_Frequency_HZ'],
+                       ['State_Code', 'Report_Date']),
+    'PRODUCTIONLOG': (['Plant_ID', 'Log_Date', 'Efficiency_Percentage', 'Todays_Actual_MU', 'Capable_Generation_MU', 'Operational_Capacity_MW', 'Coal_Stock_Days'],
+                      ['Plant_ID', 'Log_Date']),
+}
+SECTOR_ROWS = [('PVT', 'Private'), ('CCT', 'Central'), ('ST', 'State')] # As seeded by IndianEnergyDB.sql
+
+# ---------------------------
+# STAGE TIMER
+# ---------------------------
+class StageTimer:
+    """Accumulates wall time per stage; a nested stage pauses the enclosing one, so stages never overlap."""
+    def __init__(self):
+        self.seconds = {}; self._stack = []
+
+    @contextmanager
+    def stage(self, name):
+        now = time.perf_counter()
+        if self._stack: self._charge(now)
+        self._stack.append([name, now])
+        try: yield
+        finally:
+            now = time.perf_counter(); self._charge(now); self._stack.pop()
+            if self._stack: self._stack[-1][1] = now
+
+    def _charge(self, now):
+        name, start = self._stack[-1]
+        self.seconds[name] = self.seconds.get(name, 0.0) + now - start
+
+def peak_rss_mb():
+    try:
+        import resource
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return round(rss / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1) # bytes on macOS, KiB elsewhere
+    except ImportError: pass
+    try:
+        import psutil
+        return round(psutil.Process().memory_info().peak_wset / (1024 * 1024), 1) # Windows
+    except (ImportError, AttributeError): return None
+
+# ---------------------------
+# SINKS (same add / flush / discard interface as BatchUpsertWriter / BulkLoadWriter)
+# ---------------------------
+def _db_value(v):
+    return v.isoformat() if isinstance(v, (date, datetime)) else v
+
+class _SQLiteCursor:
+    """The slice of the mysql.connector cursor API the parsers use, over sqlite3 (%s -> ?)."""
+    def __init__(self, cnx, dictionary=False):
+        self._cur = cnx.cursor(); self._dictionary = dictionary
+
+    def execute(self, sql, params=()):
+        self._cur.execute(sql.replace('%s', '?'), tuple(_db_value(v) for v in params))
+
+    def executemany(self, sql, rows):
+        self._cur.executemany(sql.replace('%s', '?'), [tuple(_db_value(v) for v in row) for row in rows])
+
+    def _row(self, row):
+        if row is None or not self._dictionary: return row
+        return dict(zip([d[0] for d in self._cur.description], row))
+
+    def fetchone(self): return self._row(self._cur.fetchone())
+    def fetchall(self): return [self._row(r) for r in self._cur.fetchall()]
+    def close(self): self._cur.close()
+
+class SQLiteConnection:
+    """sqlite3 connection with the mysql.connector calls the parsers make (cursor(dictionary=...), is_connected)."""
+    def __init__(self, path=':memory:'):
+        self.raw = sqlite3.connect(path)
+        for table, (columns, key) in SQLITE_SCHEMA.items():
+            self.raw.execute(f"CREATE TABLE IF NOT EXISTS {table} ({', '.join(columns)}, PRIMARY KEY ({', '.join(key)}))")
+        from parseall1 import STATE_MAP
+        self.raw.executemany("INSERT OR IGNORE INTO STATE (State_Code, State_Name) VALUES (?, ?)", [(c, n.title()) for n, c in STATE_MAP.items()])
+        self.raw.executemany("INSERT OR IGNORE INTO SECTOR (Sector_ID, Sector_Name) VALUES (?, ?)", SECTOR_ROWS)
+        self.raw.commit()
+
+    def cursor(self, dictionary=False): return _SQLiteCursor(self.raw, dictionary)
+    def commit(self): self.raw.commit()
+    def rollback(self): self.raw.rollback()
+    def is_connected(self): return True
+    def close(self): self.raw.close()
+
+class MemorySink:
+    """Keeps flushed rows in lists: measures reading and parsing without database work.
+    Lookups parseall2 needs (states, sectors, plants, dates) go to an in-memory sqlite catalog."""
+    name = 'memory'
+
+    def __init__(self, tables, timer, options=None):
+        self.tables = dict(tables); self.timer = timer
+        self.buffers = {n: [] for n in self.tables}; self.rows = {n: [] for n in self.tables}
+        self.written = {n: 0 for n in self.tables}; self.failed = {n: 0 for n in self.tables}
+        self.cnx = self._connect(options)
+
+    def _connect(self, options): return SQLiteConnection()
+
+    def add(self, name, params, desc=''):
+        self.buffers[name].append(tuple(params))
+
+    def pending(self):
+        return sum(len(rows) for rows in self.buffers.values())
+
+    def flush(self):
+        with self.timer.stage('write'):
+            for name, rows in self.buffers.items():
+                if rows: self._write(name, rows); self.written[name] += len(rows)
+            self.buffers = {n: [] for n in self.tables}
+
+    def discard(self):
+        self.buffers = {n: [] for n in self.tables}
+
+    def commit(self):
+        with self.timer.stage('write'): self.cnx.commit()
+
+    def close(self): self.cnx.close()
+
+    def _write(self, name, rows): self.rows[name].extend(rows)
+
+class SQLiteSink(MemorySink):
+    """Upserts into sqlite tables (INSERT ... ON CONFLICT DO UPDATE) with the parsers' refreshed columns."""
+    name = 'sqlite'
+
+    def _connect(self, options): return SQLiteConnection(options or ':memory:')
+
+    def _write(self, name, rows):
+        spec = self.tables[name]; key = SQLITE_SCHEMA[spec.target][1]
+        updates = ', '.join(f"{c} = excluded.{c}" if c in spec.columns else f"{c} = NULL" for c in spec.update_columns)
+        sql = (f"INSERT INTO {spec.target} ({', '.join(spec.columns)}) VALUES ({', '.join('?' * len(spec.columns))}) "
+               f"ON CONFLICT ({', '.join(key)}) DO UPDATE SET {updates}")
+        self.cnx.raw.executemany(sql, [tuple(_db_value(v) for v in row) for row in rows])
+
+class MySQLSink(MemorySink):
+    """Multi-row upserts (executemany, as BatchUpsertWriter does) into a MySQL scratch database."""
+    name = 'mysql'
+
+    def _connect(self, options):
+        import mysql.connector
+        return mysql.connector.connect(**{**MYSQL_DEFAULTS, **(options or {})})
+
+    def _write(self, name, rows):
+        spec = self.tables[name]
+        updates = ', '.join(f"{c}=VALUES({c})" if c in spec.columns else f"{c}=NULL" for c in spec.update_columns)
+        sql = (f"INSERT INTO {spec.target} ({', '.join(spec.columns)}) VALUES ({', '.join(['%s'] * len(spec.columns))}) "
+               f"ON DUPLICATE KEY UPDATE {updates}")
+        cursor = self.cnx.cursor()
+        try: cursor.executemany(sql, rows)
+        finally: cursor.close()
+
+SINKS = {cls.name: cls for cls in (MemorySink, SQLiteSink, MySQLSink)}
+
+# ---------------------------
+# PER-PARSER RUNS (each in its own process)
+# ---------------------------
+def _limited(items, limit):
+    return items[:limit] if limit else items
+
+def bench_parseall1(sink, timer, limit=None, use_cache=False):
+    import parseall1 as p1
+    p1.DEBUG = False
+    files = _limited(sorted(f for f in os.listdir(p1.REPORT_FOLDER) if re.match(r"dgr2-\d{4}-\d{2}-\d{2}\.xls$", f)), limit)
+    plant_index = p1.PlantIndex()
+    for fname in files:
+        report_date = datetime.strptime(fname[5:15], "%Y-%m-%d").date()
+        path = os.path.join(p1.REPORT_FOLDER, fname)
+        with timer.stage('read'):
+            df = p1.read_excel_cached(path) if use_cache else p1.try_read_excel(path)
+        if df is None: continue
+        with timer.stage('parse'):
+            region_data, plant_records = p1.extract_report_records(df, report_date, use_cache=use_cache)
+        with timer.stage('write'):
+            p1.write_region_data(sink.cnx, report_date, region_data, bulk=sink)
+            if plant_records is not None: p1.write_plant_records(sink.cnx, report_date, plant_records, plant_index, bulk=sink)
+    sink.commit()
+    return len(files)
+
+@contextmanager
+def _excel_reads_booked_as(timer, stage, module):
+    # parseall2 reads inside process_single_file; its workbook reader is timed in this process only
+    original = module.read_report_sheets
+    def timed(*args, **kwargs):
+        with timer.stage(stage): return original(*args, **kwargs)
+    module.read_report_sheets = timed
+    try: yield
+    finally: module.read_report_sheets = original
+
+def bench_parseall2(sink, timer, limit=None, use_cache=False):
+    import parseall2 as p2
+    files = []
+    for fname in sorted(os.listdir(RE_REPORTS_FOLDER)):
+        m = re.search(r"(\d{1,2})_([A-Za-z]{3,4})_(\d{4})", fname)
+        if not fname.lower().endswith(".xlsx") or not m: continue
+        files.append((datetime.strptime(f"{m.group(1)}_{m.group(2)[:3]}_{m.group(3)}", "%d_%b_%Y").date(), fname))
+    files = _limited(sorted(files), limit)
+    cursor = sink.cnx.cursor(dictionary=True)
+    maps = p2.load_lookup_maps(cursor); plant_index = p2.PlantNameIndex.load(cursor) # Once per run, as in parseall2.main
+    with _excel_reads_booked_as(timer, 'read', p2):
+        for report_date, fname in files:
+            with timer.stage('parse'): # Minus the Excel reads and sink writes it makes
+                p2.process_single_file(sink.cnx, cursor, os.path.join(RE_REPORTS_FOLDER, fname), report_date,
+                                       bulk=sink, plant_index=plant_index, maps=maps)
+    sink.commit()
+    return len(files)
+
+def bench_parseall3(sink, timer, limit=None, use_cache=False):
+    import pandas as pd
+    import parseall3 as p3
+    with timer.stage('read'):
+        df = pd.read_csv(p3.CSV_FILE)
+    with timer.stage('parse'): # Full (non-incremental) load; every CSV date counts as present in DATE_DIM
+        df = p3.normalize_demand(df)
+        rows = [(r.StateCode, r.Date, float(r.Avg_Demand)) for r in _limited(df, limit and limit * 40).itertuples(index=False)]
+    for row in rows: sink.add('REGION_DEMAND', row)
+    sink.flush(); sink.commit()
+    return 1
+
+BENCHES = {'parseall1': (bench_parseall1, 'BULK_TABLES'), 'parseall2': (bench_parseall2, 'BULK_TABLES'), 'parseall3': (bench_parseall3, None)}
+
+def run_one(parser_name, sink_name, sink_options, limit=None, use_cache=False, verbose=False):
+    """Runs one parser end to end against a fresh sink; returns its result record."""
+    bench, tables_attr = BENCHES[parser_name]
+    tables = getattr(__import__(parser_name), tables_attr) if tables_attr else DEMAND_TABLES
+    timer = StageTimer()
+    sink = SINKS[sink_name](tables, timer, sink_options)
+    started = time.perf_counter()
+    try:
+        with open(os.devnull, 'w') as devnull, redirect_stdout(sys.stdout if verbose else devnull):
+            files = bench(sink, timer, limit, use_cache)
+    finally:
+        sink.close()
+    total = time.perf_counter() - started
+    rows = sum(sink.written.values())
+    seconds = {stage: round(timer.seconds.get(stage, 0.0), 4) for stage in ('read', 'parse', 'write')}
+    seconds['total'] = round(total, 4)
+    return {'parser': parser_name, 'files': files, 'rows': rows, 'rows_by_table': dict(sink.written),
+            'rows_per_s': round(rows / total, 1) if total else None, 'seconds': seconds, 'peak_rss_mb': peak_rss_mb()}
+
+def git_commit():
+    try: return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError): return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the report parsers over the committed corpus.")
+    parser.add_argument("--parsers", nargs='+', choices=PARSERS, default=PARSERS)
+    parser.add_argument("--sink", choices=list(SINKS), default='memory')
+    parser.add_argument("--sqlite-path", default=':memory:', help="Database file for --sink sqlite.")
+    for key, value in MYSQL_DEFAULTS.items():
+        parser.add_argument(f"--mysql-{key}", type=type(value), default=value, help=f"--sink mysql connection {key}.")
+    parser.add_argument("--limit", type=int, default=None, help="Files per parser (parseall3: ~40 CSV rows per file).")
+    parser.add_argument("--cache", action="store_true", help="Let parseall1 use its workbook/layout caches (default: cold reads).")
+    parser.add_argument("--json", default=None, help="Write the results here ('-' for stdout).")
+    parser.add_argument("--verbose", action="store_true", help="Keep the parsers' own output.")
+    args = parser.parse_args()
+
+    os.chdir(os.path.dirname(os.path.abspath(__file__))) # Parsers use paths relative to the repo root
+    sink_options = {'sqlite': args.sqlite_path, 'mysql': {k: getattr(args, f"mysql_{k}") for k in MYSQL_DEFAULTS}}.get(args.sink)
+
+    results = []
+    for name in args.parsers:
+        print(f"[BENCH] {name} -> {args.sink} ...", file=sys.stderr)
+        # A fresh spawned process per parser: clean imports and a per-parser peak RSS
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as pool:
+            result = pool.submit(run_one, name, args.sink, sink_options, args.limit, args.cache, args.verbose).result()
+        results.append(result)
+        s = result['seconds']
+        print(f"[BENCH] {name}: {result['files']} files, {result['rows']} rows, {result['rows_per_s']} rows/s | "
+              f"read {s['read']:.2f}s parse {s['parse']:.2f}s write {s['write']:.2f}s total {s['total']:.2f}s | "
+              f"peak RSS {result['peak_rss_mb']} MB", file=sys.stderr)
+
+    report = {
+        'meta': {'commit': git_commit(), 'timestamp': datetime.now().isoformat(timespec='seconds'),
+                 'python': platform.python_version(), 'platform': platform.platform(),
+                 'sink': args.sink, 'limit': args.limit, 'cache': args.cache},
+        'results': results,
+    }
+    if args.json == '-': print(json.dumps(report, indent=2))
+    elif args.json:
+        with open(args.json, 'w', encoding='utf-8') as fh: json.dump(report, fh, indent=2)
+        print(f"[BENCH] Results written to {args.json}", file=sys.stderr)
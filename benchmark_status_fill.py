@@ -0,0 +1,139 @@
+"""
+benchmark_status_fill.py
+
+Compares the post-load 'Active' status fill as history grows: the full
+sp_InsertAllMissingActiveStatuses (every plant x every DATE_DIM date, NOT EXISTS per pair)
+against sp_InsertMissingActiveStatusesForDates (every plant x the day just loaded, plus the
+new plants x every date; index-backed anti-joins).
+
+For each history length a synthetic database gets `plants` plants with a status row on every
+past day, then one new day (and --new-plants plants) is loaded and both fills are timed on
+the same state (each in its own transaction, rolled back). Both insert the same rows.
+
+The statements are the procedure bodies of DML.sql, so they run unchanged on sqlite and on a
+scratch MySQL database (--sink mysql; the bench tables are dropped and recreated there).
+
+Usage:
+  python benchmark_status_fill.py --days 30 180 365 730 --plants 500
+  python benchmark_status_fill.py --sink mysql --mysql-database IndianEnergyDB_bench --json fill.json
+"""
+
+import argparse
+import json
+import sqlite3
+import time
+from datetime import date, timedelta
+
+MYSQL_DEFAULTS = {'host': 'localhost', 'port': 3306, 'user': 'root', 'password': '', 'database': 'IndianEnergyDB_bench'}
+FIRST_DAY = date(2025, 8, 1)
+REPEATS = 3 # Best of
+
+SCHEMA = [
+    "CREATE TABLE DATE_DIM (`Date` DATE PRIMARY KEY, Day INT, Month INT, Year INT)",
+    "CREATE TABLE POWERPLANTS (Plant_ID VARCHAR(20) PRIMARY KEY, Plant_Name VARCHAR(255) NOT NULL)",
+    """CREATE TABLE OPERATIONAL_STATUS (
+        Plant_ID VARCHAR(20), Unit_Number VARCHAR(20), Status_Date DATE, Cap_Under_Outage_MW DECIMAL(10, 2),
+        Status VARCHAR(20), Outage_Date DATE, Expected_Sync_Date DATE, Remarks TEXT,
+        PRIMARY KEY (Plant_ID, Unit_Number, Status_Date))""",
+    "CREATE INDEX idx_opstatus_plant_date ON OPERATIONAL_STATUS (Plant_ID, Status_Date)",
+    "CREATE INDEX idx_opstatus_date ON OPERATIONAL_STATUS (Status_Date)", # MySQL's implicit DATE_DIM foreign key index
+]
+TEMP_TABLES = [
+    "CREATE TEMPORARY TABLE tmp_ingest_dates (Report_Date DATE PRIMARY KEY)",
+    "CREATE TEMPORARY TABLE tmp_new_plants (Plant_ID VARCHAR(20) PRIMARY KEY)",
+]
+INSERT_STATUS = """INSERT INTO OPERATIONAL_STATUS (Plant_ID, Unit_Number, Status_Date, Status,
+                       Cap_Under_Outage_MW, Expected_Sync_Date, Remarks, Outage_Date)"""
+
+# sp_InsertAllMissingActiveStatuses
+FULL_FILL = [INSERT_STATUS + """
+    SELECT p.Plant_ID, 'Main', d.`Date`, 'Active', 0.00, NULL, NULL, NULL
+    FROM POWERPLANTS p CROSS JOIN DATE_DIM d
+    WHERE NOT EXISTS (SELECT 1 FROM OPERATIONAL_STATUS os WHERE os.Plant_ID = p.Plant_ID AND os.Status_Date = d.`Date`)"""]
+
+# sp_InsertMissingActiveStatusesForDates
+INCREMENTAL_FILL = [INSERT_STATUS + """
+    SELECT p.Plant_ID, 'Main', d.`Date`, 'Active', 0.00, NULL, NULL, NULL
+    FROM tmp_ingest_dates AS t JOIN DATE_DIM AS d ON d.`Date` = t.Report_Date CROSS JOIN POWERPLANTS AS p
+    LEFT JOIN OPERATIONAL_STATUS AS os ON os.Plant_ID = p.Plant_ID AND os.Status_Date = d.`Date`
+    WHERE os.Plant_ID IS NULL""", INSERT_STATUS + """
+    SELECT p.Plant_ID, 'Main', d.`Date`, 'Active', 0.00, NULL, NULL, NULL
+    FROM tmp_new_plants AS n JOIN POWERPLANTS AS p ON p.Plant_ID = n.Plant_ID CROSS JOIN DATE_DIM AS d
+    LEFT JOIN OPERATIONAL_STATUS AS os ON os.Plant_ID = p.Plant_ID AND os.Status_Date = d.`Date`
+    WHERE os.Plant_ID IS NULL"""]
+
+
+def connect(sink, options):
+    if sink == 'sqlite':
+        return sqlite3.connect(':memory:'), '?'
+    import mysql.connector
+    return mysql.connector.connect(**options), '%s'
+
+
+def build_history(cnx, mark, days, plants, new_plants):
+    """Status rows for every plant on `days` past days; then one more day and new_plants plants
+    loaded without their 'Active' rows. Returns the new day."""
+    cur = cnx.cursor()
+    for table in ['OPERATIONAL_STATUS', 'POWERPLANTS', 'DATE_DIM', 'tmp_ingest_dates', 'tmp_new_plants']:
+        cur.execute(f"DROP TABLE IF EXISTS {table}") # Also drops a TEMPORARY table of that name
+    for sql in SCHEMA + TEMP_TABLES: cur.execute(sql)
+    dates = [FIRST_DAY + timedelta(days=n) for n in range(days + 1)]
+    plant_ids = [f"B{n}" for n in range(plants + new_plants)]
+    cur.executemany(f"INSERT INTO DATE_DIM VALUES ({mark}, {mark}, {mark}, {mark})", [(d, d.day, d.month, d.year) for d in dates])
+    cur.executemany(f"INSERT INTO POWERPLANTS VALUES ({mark}, {mark})", [(p, p) for p in plant_ids])
+    rows = [(p, d) for d in dates[:-1] for p in plant_ids[:plants]]
+    for start in range(0, len(rows), 50000):
+        cur.executemany(f"INSERT INTO OPERATIONAL_STATUS (Plant_ID, Unit_Number, Status_Date, Status) VALUES ({mark}, 'Main', {mark}, 'Active')",
+                        rows[start:start + 50000])
+    cur.execute(f"INSERT INTO tmp_ingest_dates VALUES ({mark})", (dates[-1],))
+    if new_plants: cur.executemany(f"INSERT INTO tmp_new_plants VALUES ({mark})", [(p,) for p in plant_ids[plants:]])
+    cnx.commit()
+    cur.close()
+    return dates[-1]
+
+
+def time_fill(cnx, statements):
+    """(best seconds, rows inserted) of the statements, each try rolled back."""
+    best, inserted = None, 0
+    for _ in range(REPEATS):
+        cur = cnx.cursor()
+        started = time.perf_counter()
+        inserted = 0
+        for sql in statements:
+            cur.execute(sql); inserted += cur.rowcount
+        elapsed = time.perf_counter() - started
+        cnx.rollback(); cur.close()
+        best = elapsed if best is None else min(best, elapsed)
+    return best, inserted
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Full vs incremental missing-status fill as history grows")
+    parser.add_argument("--days", type=int, nargs='+', default=[30, 90, 180, 365, 730], help="History lengths (days already loaded).")
+    parser.add_argument("--plants", type=int, default=500)
+    parser.add_argument("--new-plants", type=int, default=0, help="Plants created by the simulated load.")
+    parser.add_argument("--sink", choices=['sqlite', 'mysql'], default='sqlite')
+    for key, value in MYSQL_DEFAULTS.items():
+        parser.add_argument(f"--mysql-{key}", type=type(value), default=value, help=f"--sink mysql connection {key}.")
+    parser.add_argument("--json", default=None, help="Write the results here ('-' for stdout).")
+    args = parser.parse_args()
+
+    cnx, mark = connect(args.sink, {key: getattr(args, f"mysql_{key}") for key in MYSQL_DEFAULTS})
+    results = []
+    print(f"{'days':>6} {'status rows':>12} {'full ms':>10} {'incr ms':>10} {'rows':>7}")
+    for days in args.days:
+        build_history(cnx, mark, days, args.plants, args.new_plants)
+        full_s, full_rows = time_fill(cnx, FULL_FILL)
+        incr_s, incr_rows = time_fill(cnx, INCREMENTAL_FILL)
+        if full_rows != incr_rows:
+            print(f"⚠️ Row counts differ at {days} days: full {full_rows}, incremental {incr_rows}")
+        results.append({'days': days, 'plants': args.plants, 'new_plants': args.new_plants, 'status_rows': days * args.plants,
+                        'full_ms': round(full_s * 1000, 2), 'incremental_ms': round(incr_s * 1000, 2), 'rows_inserted': incr_rows})
+        print(f"{days:>6} {days * args.plants:>12} {full_s * 1000:>10.1f} {incr_s * 1000:>10.1f} {incr_rows:>7}")
+    cnx.close()
+
+    if args.json:
+        text = json.dumps({'sink': args.sink, 'results': results}, indent=2)
+        if args.json == '-': print(text)
+        else:
+            with open(args.json, 'w', encoding='utf-8') as fh: fh.write(text + '\n')
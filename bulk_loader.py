@@ -0,0 +1,88 @@
+import os
+import shutil
+import tempfile
+from datetime import date, datetime
+
+
+class StagedTable:
+    """How rows added under one name are merged: target table, the columns each added row fills
+    (in order), and the columns ON DUPLICATE KEY UPDATE refreshes. Update columns that are not
+    loaded are refreshed to NULL, like VALUES(col) of a NULL literal in the row-at-a-time SQL."""
+    def __init__(self, target, columns, update_columns):
+        self.target = target; self.columns = list(columns); self.update_columns = list(update_columns)
+
+
+def _tsv_field(value):
+    # LOAD DATA defaults: tab-separated, newline-terminated, backslash escapes, \N for NULL
+    if value is None or (isinstance(value, float) and value != value): return '\\N'
+    if isinstance(value, (date, datetime)): text = value.isoformat()
+    elif isinstance(value, float): text = repr(value)
+    else: text = str(value)
+    return text.replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+
+class BulkLoadWriter:
+    """Stages rows in local TSV files and merges them set-based in merge().
+
+    Same add / flush / discard interface as a buffered upsert writer: rows added since the last
+    flush() are kept in memory (discard() drops them, e.g. when one report fails) and flush()
+    appends them to one TSV per staged name. merge() loads each file with LOAD DATA LOCAL INFILE
+    into a TEMPORARY copy of the target (REPLACE, so the last row per key wins like repeated
+    upserts) and moves it with one INSERT ... SELECT ... ON DUPLICATE KEY UPDATE per table, in
+    the order of `tables`. The connection needs allow_local_infile=True.
+    """
+    def __init__(self, tables, work_dir=None, label='BULK'):
+        self.tables = dict(tables); self.label = label
+        self.work_dir = tempfile.mkdtemp(prefix='bulk_', dir=work_dir)
+        self.paths = {name: os.path.join(self.work_dir, f"{name}.tsv") for name in self.tables}
+        self.buffers = {name: [] for name in self.tables}
+        self.written = {name: 0 for name in self.tables} # Rows staged on disk
+        self.failed = {name: 0 for name in self.tables}
+
+    def add(self, name, params, desc=''):
+        self.buffers[name].append(tuple(params))
+
+    def pending(self):
+        return sum(len(rows) for rows in self.buffers.values())
+
+    def flush(self):
+        for name, rows in self.buffers.items():
+            if not rows: continue
+            with open(self.paths[name], 'a', encoding='utf-8', newline='\n') as fh:
+                fh.writelines('\t'.join(_tsv_field(v) for v in row) + '\n' for row in rows)
+            self.written[name] += len(rows)
+        self.buffers = {name: [] for name in self.tables}
+
+    def discard(self):
+        self.buffers = {name: [] for name in self.tables}
+
+    def merge(self, cnx):
+        """Loads and merges every staged file in one transaction; returns {name: rows merged}.
+        The caller commits (or rolls back on error)."""
+        self.flush()
+        merged = {}
+        cursor = cnx.cursor()
+        try:
+            for name, spec in self.tables.items():
+                if not self.written[name]: continue
+                stage = f"stage_{name}"
+                cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS {stage}")
+                cursor.execute(f"CREATE TEMPORARY TABLE {stage} LIKE {spec.target}")
+                path = self.paths[name].replace('\\', '/')
+                cursor.execute(f"LOAD DATA LOCAL INFILE '{path}' REPLACE INTO TABLE {stage} CHARACTER SET utf8mb4 "
+                               f"FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n' "
+                               f"({', '.join(spec.columns)})")
+                insert_cols = spec.columns + [c for c in spec.update_columns if c not in spec.columns]
+                updates = ', '.join(f"{c} = s.{c}" for c in spec.update_columns)
+                cursor.execute(f"INSERT INTO {spec.target} ({', '.join(insert_cols)}) "
+                               f"SELECT {', '.join('s.' + c for c in insert_cols)} FROM {stage} AS s "
+                               f"ON DUPLICATE KEY UPDATE {updates}")
+                merged[name] = self.written[name]
+                cursor.execute(f"DROP TEMPORARY TABLE {stage}")
+        finally:
+            try: cursor.close()
+            except Exception: pass
+        return merged
+
+    def close(self):
+        shutil.rmtree(self.work_dir, ignore_errors=True)
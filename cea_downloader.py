@@ -0,0 +1,215 @@
+"""
+cea_downloader.py
+
+Concurrent downloader for the CEA daily RE generation PDFs.
+
+- Bounded concurrency (thread pool), request starts spaced per host
+- ETag / Last-Modified kept per file; --refresh revalidates with conditional GETs
+- Interrupted downloads stay as '<file>.part' and resume with Range / If-Range
+- Dates that returned 404 are remembered and only re-probed while they are recent
+
+Any base URL works, so a local stand-in (e.g. python -m http.server) can serve the files:
+  python cea_downloader.py --base-url http://localhost:8000/ --dir /tmp/pdfs --start 2025-08-01 --end 2025-08-10
+"""
+
+import os
+import json
+import time
+import argparse
+import threading
+import requests
+import urllib3
+from concurrent.futures import ThreadPoolExecutor
+from collections import Counter
+from datetime import datetime, timedelta
+from urllib.parse import urlsplit
+
+# ---------- CONFIGURATION ----------
+CEA_BASE_URL = "https://cea.nic.in/wp-content/uploads/daily_reports/"
+DOWNLOAD_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Daily_Renewable_PDF_Reports")
+STATE_FILE = ".download_state.json"  # Inside the download folder
+DOWNLOAD_WORKERS = 4
+REQUEST_INTERVAL = 0.5     # Seconds between request starts to one host
+MAX_RETRIES = 3
+RETRY_DELAY = 3
+MISSING_RECHECK_DAYS = 7   # A 404 for a date older than this is not probed again
+CHUNK_SIZE = 8192
+
+
+def report_file_name(target_date):
+    return f"{target_date.day}_{target_date.strftime('%b')}_{target_date.strftime('%Y')}_Daily_RE_Generation_Report.pdf"
+
+
+class HostRateLimiter:
+    """Spaces request starts to the same host at least `interval` seconds apart (thread-safe)."""
+    def __init__(self, interval):
+        self.interval = interval
+        self._lock = threading.Lock(); self._next = {}
+
+    def wait(self, url):
+        host = urlsplit(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next.get(host, now))
+            self._next[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class DownloadState:
+    """Validators (ETag / Last-Modified / size) per downloaded file and the 404 dates, as one JSON file."""
+    def __init__(self, path):
+        self.path = path; self._lock = threading.Lock()
+        self.files, self.missing = {}, {}
+        try:
+            with open(path, encoding='utf-8') as fh:
+                data = json.load(fh)
+            self.files, self.missing = data.get('files', {}), data.get('missing', {})
+        except (OSError, ValueError):
+            pass
+
+    def file(self, name):
+        with self._lock:
+            return dict(self.files.get(name, {}))
+
+    def set_file(self, name, **fields):
+        with self._lock:
+            self.files.setdefault(name, {}).update({k: v for k, v in fields.items() if v is not None})
+            self.missing.pop(name, None)
+
+    def mark_missing(self, name):
+        with self._lock:
+            self.missing[name] = datetime.now().isoformat(timespec='seconds')
+
+    def is_missing(self, name):
+        with self._lock:
+            return name in self.missing
+
+    def save(self):
+        with self._lock:
+            data = {'files': self.files, 'missing': self.missing}
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as fh:
+            json.dump(data, fh, indent=1, sort_keys=True)
+        os.replace(tmp, self.path)
+
+
+class CEADownloader:
+    """Downloads one report per date into download_dir; run() fans the dates out over a thread pool."""
+    def __init__(self, base_url=CEA_BASE_URL, download_dir=DOWNLOAD_DIR, workers=DOWNLOAD_WORKERS,
+                 interval=REQUEST_INTERVAL, max_retries=MAX_RETRIES, retry_delay=RETRY_DELAY,
+                 missing_recheck_days=MISSING_RECHECK_DAYS, timeout=(10, 30), verify=False):
+        self.base_url = base_url; self.download_dir = download_dir; self.workers = workers
+        self.max_retries = max_retries; self.retry_delay = retry_delay
+        self.missing_recheck_days = missing_recheck_days; self.timeout = timeout; self.verify = verify
+        self.limiter = HostRateLimiter(interval)
+        os.makedirs(download_dir, exist_ok=True)
+        self.state = DownloadState(os.path.join(download_dir, STATE_FILE))
+        self._local = threading.local()
+        if not verify:
+            urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+    def _session(self):
+        # requests.Session is not thread-safe; one per worker thread
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update({'User-Agent': 'Mozilla/5.0'})
+            session.verify = self.verify
+            self._local.session = session
+        return session
+
+    def _request_headers(self, name, path, part, refresh):
+        """Conditional headers for a refresh, Range / If-Range to resume a .part; returns (headers, offset)."""
+        entry = self.state.file(name)
+        validator = entry.get('etag') or entry.get('last_modified')
+        if refresh and os.path.exists(path):
+            headers = {}
+            if entry.get('etag'): headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'): headers['If-Modified-Since'] = entry['last_modified']
+            return headers, 0
+        if os.path.exists(part) and validator:
+            offset = os.path.getsize(part)
+            if offset:
+                return {'Range': f"bytes={offset}-", 'If-Range': validator}, offset
+        return {}, 0
+
+    def fetch(self, target_date, refresh=False):
+        """Downloads one date's report; returns 'exists', 'downloaded', 'not_modified', 'missing',
+        'known_missing' or 'failed'."""
+        name = report_file_name(target_date)
+        url = f"{self.base_url}{name}"
+        path = os.path.join(self.download_dir, name); part = path + '.part'
+        if os.path.exists(path) and not refresh:
+            print(f"✅ Already exists. Skipping: {name}")
+            return 'exists'
+        if self.state.is_missing(name) and (datetime.now().date() - target_date).days > self.missing_recheck_days:
+            print(f"⏭️  Known missing (404), not re-probed: {name}")
+            return 'known_missing'
+
+        for attempt in range(self.max_retries):
+            headers, offset = self._request_headers(name, path, part, refresh)
+            print(f"Attempting to download: {name} (Attempt {attempt + 1}/{self.max_retries})"
+                  + (f", resuming at {offset} bytes" if offset else ""))
+            self.limiter.wait(url)
+            try:
+                with self._session().get(url, headers=headers, stream=True, timeout=self.timeout) as response:
+                    status = response.status_code
+                    if status == 304:
+                        print(f"✅ Not modified: {name}")
+                        return 'not_modified'
+                    if status == 404:
+                        print(f"❌ File not found (404). Report may not exist for this date: {name}")
+                        self.state.mark_missing(name)
+                        return 'missing'
+                    if status == 416 or (status == 206 and not response.headers.get('Content-Range', '').startswith(f"bytes {offset}-")):
+                        # Stale partial file: start over
+                        if os.path.exists(part): os.remove(part)
+                        continue
+                    if status in (200, 206):
+                        # Validators first, so an interrupted body can resume against the same version
+                        self.state.set_file(name, etag=response.headers.get('ETag'),
+                                            last_modified=response.headers.get('Last-Modified'))
+                        with open(part, 'ab' if status == 206 else 'wb') as f:
+                            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                                f.write(chunk)
+                        os.replace(part, path)
+                        self.state.set_file(name, size=os.path.getsize(path))
+                        print(f"✅ Success! Report saved as: {path}")
+                        return 'downloaded'
+                    print(f"❌ Server error (Status {status}): {name}")
+            except Exception as e:
+                print(f"❌ Connection error for {name}: {e}")
+            if attempt < self.max_retries - 1:
+                print(f"Retrying {name} in {self.retry_delay} seconds...")
+                time.sleep(self.retry_delay)
+        print(f"❌ Max retries exceeded. Failed to download: {name}")
+        return 'failed'
+
+    def run(self, dates, refresh=False):
+        """Fetches every date concurrently; returns a Counter of fetch() results."""
+        results = Counter()
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, self.workers)) as pool:
+                for status in pool.map(lambda d: self.fetch(d, refresh), dates):
+                    results[status] += 1
+        finally:
+            self.state.save()
+        return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Download CEA daily RE generation PDFs")
+    parser.add_argument("--base-url", default=CEA_BASE_URL)
+    parser.add_argument("--dir", default=DOWNLOAD_DIR)
+    parser.add_argument("--start", required=True, help="YYYY-MM-DD")
+    parser.add_argument("--end", default=None, help="YYYY-MM-DD (default: today)")
+    parser.add_argument("--workers", type=int, default=DOWNLOAD_WORKERS)
+    parser.add_argument("--interval", type=float, default=REQUEST_INTERVAL)
+    parser.add_argument("--refresh", action="store_true", help="Revalidate existing files with conditional requests")
+    args = parser.parse_args()
+    start = datetime.strptime(args.start, "%Y-%m-%d").date()
+    end = datetime.strptime(args.end, "%Y-%m-%d").date() if args.end else datetime.now().date()
+    dates = [start + timedelta(days=n) for n in range((end - start).days + 1)]
+    downloader = CEADownloader(args.base_url, args.dir, workers=args.workers, interval=args.interval)
+    print(dict(downloader.run(dates, refresh=args.refresh)))
@@ -0,0 +1,134 @@
+"""
+fact_store.py
+
+Canonical store of the normalized daily facts of all three sources, one typed
+Parquet file per dataset and date:
+
+  <FACT_STORE_DIR>/<dataset>/date=YYYY-MM-DD/part.parquet
+
+  dgr_region  - DGR state / region totals (parseall1 Pass 1)
+  dgr_plant   - DGR plant rows; Plant_Seq is the row's position in the report (parseall1 Pass 2)
+  dgr_status  - DGR operational status rows, linked to dgr_plant by Plant_Seq
+  re_summary  - RE report state summary (integrated_web_scrapping, read by parseall2)
+  re_station  - RE report station table (integrated_web_scrapping, read by parseall2)
+  demand      - Merit-India state daily averages (integrated_web_scrapping, read by parseall3)
+
+Producers write a date's partition once it is parsed; loaders read the columns they
+need (read_partition / read_facts) instead of re-parsing XLS, PDF or CSV reports.
+"""
+
+import os
+import re
+import pandas as pd
+from datetime import date, datetime
+
+# ---------- CONFIGURATION ----------
+FACT_STORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fact_store")
+PART_FILE = "part.parquet"
+
+# Column -> dtype per dataset ('string' / 'float64' / 'Int64'); datasets with a prefix entry also
+# accept any extra column starting with it, typed as given (e.g. the demand Avg_* columns)
+SCHEMAS = {
+    'dgr_region': {'State_Code': 'string', 'Monitored_Capacity_MW': 'float64'},
+    'dgr_plant': {'Plant_Seq': 'Int64', 'Plant_Name': 'string', 'State_Code': 'string', 'Sector_ID': 'string',
+                  'Type_ID': 'string', 'Operational_Capacity_MW': 'float64', 'Todays_Actual_MU': 'float64',
+                  'Capable_Generation_MU': 'float64', 'Coal_Stock_Days': 'float64'},
+    'dgr_status': {'Plant_Seq': 'Int64', 'Unit_Number': 'string', 'Cap_Under_Outage_MW': 'float64', 'Status': 'string',
+                   'Expected_Sync_Date': 'string', 'Remarks': 'string', 'Outage_Date': 'string'},
+    're_summary': {'State / Region': 'string', 'Wind Energy': 'float64', 'Solar Energy': 'float64',
+                   'Others RES': 'float64', 'Total': 'float64'},
+    're_station': {'Station': 'string', 'State / Region': 'string', 'Sector': 'string', 'Owner': 'string',
+                   'Type': 'string', 'Operational Capacity': 'float64', 'Actual Generation': 'float64'},
+    'demand': {'StateCode': 'string', 'Avg_Demand': 'float64'},
+}
+SCHEMA_PREFIXES = {'demand': ('Avg_', 'float64')}
+
+_PARTITION_RE = re.compile(r'^date=(\d{4}-\d{2}-\d{2})$')
+
+
+def clean_number_series(col):
+    """Floats from report cells: commas, units and other characters except digits, '.' and '-' are
+    dropped; blanks, '-', '--', 'nan', 'none' and unparseable values become NaN."""
+    if pd.api.types.is_numeric_dtype(col):
+        return col.astype('float64')
+    text = col.astype(str).str.strip() # Missing cells become 'nan' / 'None'
+    blank = text.str.lower().isin(['', 'nan', '-', 'none', '--'])
+    return pd.to_numeric(text.str.replace(r'[^0-9.\-]', '', regex=True).where(~blank), errors='coerce').astype('float64')
+
+
+def typed_frame(dataset, df):
+    """df with exactly the dataset's columns, in schema order and cast to the schema's dtypes."""
+    schema = dict(SCHEMAS[dataset])
+    prefix = SCHEMA_PREFIXES.get(dataset)
+    if prefix:
+        schema.update({c: prefix[1] for c in df.columns if str(c).startswith(prefix[0]) and c not in schema})
+    out = {}
+    for col, dtype in schema.items():
+        values = df[col] if col in df.columns else pd.Series(pd.NA, index=df.index)
+        if dtype == 'float64':
+            out[col] = clean_number_series(values)
+        elif dtype == 'Int64':
+            out[col] = pd.to_numeric(values, errors='coerce').astype('Int64')
+        else:
+            out[col] = values.astype('string')
+    return pd.DataFrame(out, index=pd.RangeIndex(len(df)))
+
+
+def _day(value):
+    if isinstance(value, datetime): return value.date()
+    if isinstance(value, date): return value
+    return datetime.strptime(str(value), '%Y-%m-%d').date()
+
+
+def partition_path(dataset, day, root=FACT_STORE_DIR):
+    return os.path.join(root, dataset, f"date={_day(day).isoformat()}", PART_FILE)
+
+
+def write_partition(dataset, day, df, root=FACT_STORE_DIR):
+    """Replaces the dataset's partition for day with df (typed to the schema); atomic per file."""
+    path = partition_path(dataset, day, root)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    typed_frame(dataset, df).to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    return path
+
+
+def remove_partition(dataset, day, root=FACT_STORE_DIR):
+    path = partition_path(dataset, day, root)
+    if os.path.exists(path): os.remove(path)
+
+
+def has_partition(dataset, day, root=FACT_STORE_DIR):
+    return os.path.exists(partition_path(dataset, day, root))
+
+
+def partition_dates(dataset, start=None, end=None, root=FACT_STORE_DIR):
+    """Sorted dates that have a partition of dataset, optionally limited to [start, end]."""
+    folder = os.path.join(root, dataset)
+    if not os.path.isdir(folder): return []
+    days = []
+    for name in os.listdir(folder):
+        m = _PARTITION_RE.match(name)
+        if not m or not os.path.exists(os.path.join(folder, name, PART_FILE)): continue
+        day = _day(m.group(1))
+        if (start is None or day >= _day(start)) and (end is None or day <= _day(end)):
+            days.append(day)
+    return sorted(days)
+
+
+def read_partition(dataset, day, columns=None, root=FACT_STORE_DIR):
+    """One date's facts; columns limits what is read from the file (column pruning)."""
+    return pd.read_parquet(partition_path(dataset, day, root), columns=columns)
+
+
+def read_facts(dataset, columns=None, start=None, end=None, root=FACT_STORE_DIR):
+    """Facts of every partition in [start, end] with a leading 'Date' column (datetime.date)."""
+    frames = []
+    for day in partition_dates(dataset, start, end, root):
+        df = read_partition(dataset, day, columns, root)
+        df.insert(0, 'Date', day)
+        frames.append(df)
+    if not frames:
+        return pd.DataFrame(columns=['Date'] + list(columns or SCHEMAS[dataset]))
+    return pd.concat(frames, ignore_index=True)
@@ -8,6 +8,7 @@ import '../styles/Navbar.css';
 const Navbar = () => {
   const [searchQuery, setSearchQuery] = useState('');
   const [updating, setUpdating] = useState(false);
+  const [updateProgress, setUpdateProgress] = useState(null);
   const navigate = useNavigate();
   const location = useLocation();
 
@@ -71,7 +72,7 @@ const Navbar = () => {
     
     setUpdating(true);
     try {
-      const response = await runDataUpdate();
+      const response = await runDataUpdate((job) => setUpdateProgress(job.progress));
       if (response.success) {
         alert(`✅ Data update completed successfully!\n\n${response.message || ''}`);
         // Optionally refresh the current page
@@ -84,6 +85,7 @@ const Navbar = () => {
       alert(`❌ Update failed:\n\n${error.message || 'Server error'}`);
     } finally {
       setUpdating(false);
+      setUpdateProgress(null);
     }
   };
 
@@ -115,7 +117,7 @@ const Navbar = () => {
           title="Run data update pipeline"
         >
           <FaSyncAlt className={updating ? 'spinning' : ''} />
-          <span>{updating ? 'Updating...' : 'Update'}</span>
+          <span>{updating ? `Updating${updateProgress ? ` ${updateProgress.done}/${updateProgress.total}` : ''}...` : 'Update'}</span>
         </button>
         <button className="navbar-btn" aria-label="Profile" onClick={() => navigate('/companies')}>
           <FaUserCircle />
@@ -44,13 +44,47 @@ export const calculateRegionalMetrics = async (startDate, endDate) => {
   }
 };
 
-export const runDataUpdate = async () => {
+const JOB_POLL_INTERVAL_MS = 5000;
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+export const getDataUpdateJob = async (jobId) => {
+  const response = await api.get(`/admin/run-data-update/jobs/${jobId}`);
+  return response.data.job;
+};
+
+export const cancelDataUpdate = async (jobId) => {
   try {
-    // Set timeout to 2 hours (7200000ms) to allow all scripts to complete
-    const response = await api.post('/admin/run-data-update', null, {
-      timeout: 7200000  // 2 hours in milliseconds
-    });
+    const response = await api.post(`/admin/run-data-update/jobs/${jobId}/cancel`);
     return response.data;
+  } catch (error) {
+    console.error('Error cancelling data update:', error);
+    if (error.response && error.response.data) {
+      return error.response.data;
+    }
+    return { success: false, error: error.message };
+  }
+};
+
+// Starts the pipeline as a background job (or attaches to the running one) and polls it
+// until it finishes; onProgress(job) is called after every poll
+export const runDataUpdate = async (onProgress) => {
+  try {
+    let job;
+    try {
+      const response = await api.post('/admin/run-data-update');
+      job = response.data.job;
+    } catch (error) {
+      // 409: a job is already running, follow that one
+      if (!(error.response && error.response.status === 409)) throw error;
+      job = error.response.data.job;
+    }
+    while (['queued', 'running', 'cancelling'].includes(job.status)) {
+      if (onProgress) onProgress(job);
+      await sleep(JOB_POLL_INTERVAL_MS);
+      job = await getDataUpdateJob(job.job_id);
+    }
+    if (onProgress) onProgress(job);
+    return { success: job.success, message: job.message, job_id: job.job_id, results: job.stages };
   } catch (error) {
     console.error('Error running data update:', error);
     if (error.response && error.response.data) {
@@ -64,7 +98,9 @@ const admin = {
   generateDailyReport,
   identifyUnderperforming,
   calculateRegionalMetrics,
-  runDataUpdate
+  runDataUpdate,
+  getDataUpdateJob,
+  cancelDataUpdate
 };
 
 export default admin;
\ No newline at end of file
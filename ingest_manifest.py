@@ -0,0 +1,133 @@
+"""
+ingest_manifest.py
+
+INGEST_MANIFEST: one row per (source, file) a loader has seen, with the content hash,
+parse status, row count and timings of its last load.
+
+  manifest = IngestManifest(cnx, 'dgr')
+  load, digest = manifest.check(name, path)            # False: unchanged since its last good load
+  ... load the file ...
+  manifest.record(name, digest, 'loaded', report_date, rows=n, parse_s=t1, load_s=t2)
+
+check() trusts an unchanged size and mtime before hashing, so a re-run over unchanged files
+costs one stat per file. A changed hash (a republished report) or a 'failed' last load makes
+check() ask for a re-load. With deferred=True (bulk-load runs) record() only queues the row
+and flush() writes them once the staged data is merged.
+"""
+
+import os
+import hashlib
+from datetime import datetime
+
+CHUNK_SIZE = 1024 * 1024
+
+CREATE_MANIFEST_SQL = """
+    CREATE TABLE IF NOT EXISTS INGEST_MANIFEST (
+        Source VARCHAR(20) NOT NULL,
+        File_Name VARCHAR(255) NOT NULL,
+        Content_Hash CHAR(64) NOT NULL,
+        File_Size BIGINT,
+        File_Mtime DOUBLE,
+        Report_Date DATE,
+        Status ENUM('loaded', 'failed') NOT NULL,
+        Rows_Loaded INT,
+        Parse_Seconds DECIMAL(10, 3),
+        Load_Seconds DECIMAL(10, 3),
+        Error TEXT,
+        Loaded_At DATETIME NOT NULL,
+        PRIMARY KEY (Source, File_Name),
+        INDEX idx_manifest_source_date (Source, Report_Date)
+    )
+"""
+UPSERT_MANIFEST_SQL = """
+    INSERT INTO INGEST_MANIFEST (Source, File_Name, Content_Hash, File_Size, File_Mtime, Report_Date, Status,
+                                 Rows_Loaded, Parse_Seconds, Load_Seconds, Error, Loaded_At)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE Content_Hash=VALUES(Content_Hash), File_Size=VALUES(File_Size), File_Mtime=VALUES(File_Mtime),
+        Report_Date=VALUES(Report_Date), Status=VALUES(Status), Rows_Loaded=VALUES(Rows_Loaded),
+        Parse_Seconds=VALUES(Parse_Seconds), Load_Seconds=VALUES(Load_Seconds), Error=VALUES(Error), Loaded_At=VALUES(Loaded_At)
+"""
+TOUCH_MANIFEST_SQL = "UPDATE INGEST_MANIFEST SET File_Size = %s, File_Mtime = %s WHERE Source = %s AND File_Name = %s"
+
+
+def _paths(paths):
+    return [paths] if isinstance(paths, str) else list(paths)
+
+
+def file_stat(paths):
+    """(total size, latest mtime) of the existing files among paths."""
+    stats = [os.stat(p) for p in _paths(paths) if os.path.exists(p)]
+    return sum(s.st_size for s in stats), max((s.st_mtime for s in stats), default=0.0)
+
+
+def file_digest(paths):
+    """SHA-256 over the contents of the existing files among paths, in the given order."""
+    digest = hashlib.sha256()
+    for path in _paths(paths):
+        if not os.path.exists(path): continue
+        with open(path, 'rb') as fh:
+            for chunk in iter(lambda: fh.read(CHUNK_SIZE), b''):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+class IngestManifest:
+    """The manifest rows of one source, loaded once; check() / record() per file."""
+    def __init__(self, cnx, source, deferred=False):
+        self.cnx = cnx; self.source = source; self.deferred = deferred
+        self.entries = {}; self.pending = []; self._stats = {}
+        cur = cnx.cursor()
+        try:
+            cur.execute(CREATE_MANIFEST_SQL)
+            cur.execute("SELECT File_Name, Content_Hash, File_Size, File_Mtime, Status, Report_Date FROM INGEST_MANIFEST WHERE Source = %s",
+                        (source,))
+            for name, digest, size, mtime, status, report_date in cur.fetchall():
+                self.entries[name] = {'hash': digest, 'size': size, 'mtime': mtime, 'status': status, 'date': report_date}
+        finally:
+            cur.close()
+
+    def watermark(self):
+        """Latest Report_Date loaded from this source (None if none)."""
+        return max((e['date'] for e in self.entries.values() if e['status'] == 'loaded' and e['date']), default=None)
+
+    def check(self, name, paths):
+        """(needs_load, content hash) of a file (or a list of files loaded as one unit)."""
+        size, mtime = file_stat(paths)
+        self._stats[name] = (size, mtime)
+        entry = self.entries.get(name)
+        if entry and entry['status'] == 'loaded' and entry['size'] == size and entry['mtime'] == mtime:
+            return False, entry['hash']
+        digest = file_digest(paths)
+        if entry and entry['status'] == 'loaded' and entry['hash'] == digest:
+            # Touched but identical: remember the new size / mtime so the next run skips the hash
+            self._write(TOUCH_MANIFEST_SQL, [(size, mtime, self.source, name)])
+            entry.update(size=size, mtime=mtime)
+            return False, digest
+        return True, digest
+
+    def record(self, name, digest, status, report_date=None, rows=None, parse_s=None, load_s=None, error=None):
+        """Outcome of one load ('loaded' / 'failed'); written now, or by flush() when deferred."""
+        size, mtime = self._stats.get(name, (None, None))
+        self.pending.append((self.source, name, digest, size, mtime, report_date, status, rows,
+                             None if parse_s is None else round(parse_s, 3), None if load_s is None else round(load_s, 3),
+                             None if error is None else str(error)[:2000], datetime.now().replace(microsecond=0)))
+        if not self.deferred: self.flush()
+
+    def _write(self, sql, rows):
+        cur = self.cnx.cursor()
+        try:
+            cur.executemany(sql, rows)
+            self.cnx.commit()
+        finally:
+            cur.close()
+
+    def flush(self):
+        """Writes the queued rows (deferred mode: once the run's staged data is merged)."""
+        if self.pending: self._write(UPSERT_MANIFEST_SQL, self.pending)
+        for row in self.pending:
+            self.entries[row[1]] = {'hash': row[2], 'size': row[3], 'mtime': row[4], 'status': row[6], 'date': row[5]}
+        self.pending = []
+
+    def discard(self):
+        """Drops the queued rows (the staged data they describe was not merged)."""
+        self.pending = []
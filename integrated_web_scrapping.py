@@ -12,31 +12,38 @@ All original logic, messages, and folder structures are preserved.
 
 import os
 import re
+import json
 import time
 import zipfile
 import shutil
+import argparse
+import multiprocessing
 import urllib3
 import pdfplumber
 import pandas as pd
 import requests
-from io import StringIO
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 from requests.exceptions import RequestException, ConnectTimeout
 from urllib3.exceptions import IncompleteRead
+from keyword_matcher import KeywordMatcher
+from cea_downloader import CEADownloader, CEA_BASE_URL
+from remote_zip import HttpRangeFile, RangeNotSupported
+from fact_store import has_partition, partition_dates, remove_partition, write_partition
 
 # -------------------------------------------------------------------
 # 1️⃣ DAILY PLANT DETAILS (from daily_plant_details.py)
 # -------------------------------------------------------------------
 
 ZIP_URL = 'https://github.com/vanga/india-power-generation/raw/main/data/npp/daily-generation/raw/2025.zip'
-DOWNLOAD_FOLDER = 'temp_download'
-EXTRACT_FOLDER = 'temp_extract'
-XLS_OUTPUT_FOLDER = 'Daily_Plant_Generation_XLS_Reports'
+ZIP_DATA_PREFIX = '2025/xls/'  # Archive folder holding the dgr2-YYYY-MM-DD.xls reports
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # Data folders live next to this script
+DOWNLOAD_FOLDER = os.path.join(BASE_DIR, 'temp_download')
+XLS_OUTPUT_FOLDER = os.path.join(BASE_DIR, 'Daily_Plant_Generation_XLS_Reports')
 DOWNLOAD_FILE_PATH = os.path.join(DOWNLOAD_FOLDER, '2025.zip')
 
 def setup_folders():
     os.makedirs(DOWNLOAD_FOLDER, exist_ok=True)
-    os.makedirs(EXTRACT_FOLDER, exist_ok=True)
     os.makedirs(XLS_OUTPUT_FOLDER, exist_ok=True)
 
 def download_zip_file():
@@ -54,45 +61,56 @@ def download_zip_file():
         print(f"Error downloading the file: {e}")
         return False
 
-def extract_zip_file():
-    print(f"Extracting {DOWNLOAD_FILE_PATH} to {EXTRACT_FOLDER}...")
+def open_daily_generation_zip():
+    """ZipFile over the remote archive read with HTTP Range requests (only the central directory and
+    the members read are fetched); falls back to downloading the whole archive. Returns (zip, remote)."""
+    session = requests.Session()
+    session.headers.update({'User-Agent': 'Mozilla/5.0'})
     try:
-        with zipfile.ZipFile(DOWNLOAD_FILE_PATH, 'r') as zip_ref:
-            zip_ref.extractall(EXTRACT_FOLDER)
-        print("Extraction complete.")
-    except (zipfile.BadZipFile, Exception) as e:
-        print(f"An error occurred during extraction: {e}")
+        remote = HttpRangeFile(ZIP_URL, session=session)
+        print(f"Reading archive index via range requests ({remote.size} bytes on server)...")
+        return zipfile.ZipFile(remote), remote
+    except (RangeNotSupported, zipfile.BadZipFile, requests.exceptions.RequestException) as e:
+        print(f"Range requests unavailable ({e}); downloading the whole archive.")
+    setup_folders()
+    if not download_zip_file():
+        return None, None
+    return zipfile.ZipFile(DOWNLOAD_FILE_PATH, 'r'), None
 
-def process_and_copy_files(start_date):
-    print("Processing extracted files...")
+def copy_new_members(zip_ref, start_date):
+    """Writes only the dgr2-*.xls members dated start_date or later (and not present locally)
+    straight into XLS_OUTPUT_FOLDER."""
     processed_count = 0
-    data_folder = os.path.join(EXTRACT_FOLDER, '2025', 'xls')
-    if not os.path.exists(data_folder):
-        print(f"Error: Could not find the data folder at {data_folder}")
-        return
-    for filename in os.listdir(data_folder):
-        if filename.endswith('.xls'):
-            try:
-                date_str_from_file = filename.replace('dgr2-', '').replace('.xls', '')
-                file_date = datetime.strptime(date_str_from_file, '%Y-%m-%d').date()
-                destination_filepath = os.path.join(XLS_OUTPUT_FOLDER, filename)
-                if file_date >= start_date and not os.path.exists(destination_filepath):
-                    print(f"  -> Found new report: {filename}. Copying...")
-                    shutil.copy(os.path.join(data_folder, filename), destination_filepath)
-                    print(f"     Saved as {destination_filepath}")
-                    processed_count += 1
-            except Exception as e:
-                print(f"  -> Could not process file '{filename}'. Reason: {e}")
+    for info in zip_ref.infolist():
+        if not info.filename.startswith(ZIP_DATA_PREFIX) or info.is_dir():
+            continue
+        filename = info.filename[len(ZIP_DATA_PREFIX):]
+        if '/' in filename or not filename.endswith('.xls'):
+            continue
+        try:
+            date_str_from_file = filename.replace('dgr2-', '').replace('.xls', '')
+            file_date = datetime.strptime(date_str_from_file, '%Y-%m-%d').date()
+            destination_filepath = os.path.join(XLS_OUTPUT_FOLDER, filename)
+            if file_date >= start_date and not os.path.exists(destination_filepath):
+                print(f"  -> Found new report: {filename}. Extracting...")
+                with zip_ref.open(info) as src, open(destination_filepath + '.tmp', 'wb') as dst:
+                    shutil.copyfileobj(src, dst)
+                os.replace(destination_filepath + '.tmp', destination_filepath)
+                print(f"     Saved as {destination_filepath}")
+                processed_count += 1
+        except Exception as e:
+            print(f"  -> Could not process file '{filename}'. Reason: {e}")
     if processed_count == 0:
         print("No new reports to process. Your local folder is up to date.")
     else:
         print(f"Successfully copied {processed_count} new reports.")
 
 def cleanup():
+    if not os.path.exists(DOWNLOAD_FOLDER):
+        return
     print("Cleaning up temporary files...")
     try:
         shutil.rmtree(DOWNLOAD_FOLDER)
-        shutil.rmtree(EXTRACT_FOLDER)
         print("Cleanup complete.")
     except OSError as e:
         print(f"Error during cleanup: {e}")
@@ -113,10 +131,15 @@ def sync_daily_plant_reports():
     start_date = (latest_date_found + timedelta(days=1)) if latest_date_found else DEFAULT_START_DATE
     print(f"--- Starting Daily Report Sync ({datetime.now().strftime('%Y-%m-%d %H:%M:%S')}) ---")
     print(f"Checking for new files from {start_date} onwards...")
-    setup_folders()
-    if download_zip_file():
-        extract_zip_file()
-        process_and_copy_files(start_date)
+    try:
+        zip_ref, remote = open_daily_generation_zip()
+        if zip_ref is not None:
+            with zip_ref:
+                copy_new_members(zip_ref, start_date)
+            if remote is not None:
+                print(f"Fetched {remote.bytes_fetched} of {remote.size} archive bytes.")
+    except (zipfile.BadZipFile, Exception) as e:
+        print(f"An error occurred while reading the archive: {e}")
     cleanup()
     print("--- Sync Finished ---")
 
@@ -127,44 +150,11 @@ def sync_daily_plant_reports():
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
-def download_cea_report(session, target_date):
-    day_str = str(target_date.day)
-    month_str = target_date.strftime("%b")
-    year_str = target_date.strftime("%Y")
-    base_url = "https://cea.nic.in/wp-content/uploads/daily_reports/"
-    file_name = f"{day_str}_{month_str}_{year_str}_Daily_RE_Generation_Report.pdf"
-    download_url = f"{base_url}{file_name}"
-    local_filepath = os.path.join('Daily_Renewable_PDF_Reports', file_name)
-    if os.path.exists(local_filepath):
-        print(f"✅ Already exists. Skipping: {file_name}")
-        return
-    max_retries, retry_delay = 3, 3
-    for attempt in range(max_retries):
-        print(f"Attempting to download: {file_name} (Attempt {attempt + 1}/{max_retries})")
-        try:
-            response = session.get(download_url, stream=True, timeout=(10, 30))
-            if response.status_code == 200:
-                os.makedirs('Daily_Renewable_PDF_Reports', exist_ok=True)
-                with open(local_filepath, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        f.write(chunk)
-                print(f"✅ Success! Report saved as: {local_filepath}")
-                return
-            elif response.status_code == 404:
-                print("❌ File not found (404). Report may not exist for this date.")
-                return
-            else:
-                print(f"❌ Server error (Status {response.status_code}).")
-        except Exception as e:
-            print(f"❌ Connection error: {e}")
-        if attempt < max_retries - 1:
-            print(f"Retrying in {retry_delay} seconds...")
-            time.sleep(retry_delay)
-        else:
-            print("❌ Max retries exceeded. Failed to download this file.")
-
-def download_renewable_pdfs():
-    DOWNLOAD_DIR = 'Daily_Renewable_PDF_Reports'
+DOWNLOAD_WORKERS = 4      # Concurrent PDF downloads
+DOWNLOAD_INTERVAL = 0.5   # Seconds between requests to cea.nic.in
+
+def download_renewable_pdfs(workers=DOWNLOAD_WORKERS):
+    DOWNLOAD_DIR = os.path.join(BASE_DIR, 'Daily_Renewable_PDF_Reports')
     DEFAULT_START_DATE = datetime(2025, 8, 1).date()
     os.makedirs(DOWNLOAD_DIR, exist_ok=True)
     latest_date_found = None
@@ -182,85 +172,209 @@ def download_renewable_pdfs():
     if start_date > end_date:
         print(f"All reports are up to date. Last file found: {latest_date_found}")
         return
-    with requests.Session() as session:
-        session.headers.update({'User-Agent': 'Mozilla/5.0'})
-        session.verify = False
-        print(f"--- Starting download from {start_date} to {end_date} ---")
-        current_date = start_date
-        while current_date <= end_date:
-            print(f"\nProcessing date: {current_date.strftime('%Y-%m-%d')}")
-            download_cea_report(session, current_date)
-            time.sleep(2)
-            current_date += timedelta(days=1)
-    print("\n--- Download complete. ---")
+    print(f"--- Starting download from {start_date} to {end_date} ({workers} workers) ---")
+    dates = [start_date + timedelta(days=n) for n in range((end_date - start_date).days + 1)]
+    downloader = CEADownloader(CEA_BASE_URL, DOWNLOAD_DIR, workers=workers, interval=DOWNLOAD_INTERVAL)
+    results = downloader.run(dates)
+    print(f"\n--- Download complete: {dict(results)} ---")
 
 
 # -------------------------------------------------------------------
 # 3️⃣ DAILY RENEWABLE PROCESS (from daily_renewable_process.py)
 # -------------------------------------------------------------------
 
-def process_renewable_pdfs():
-    PDF_DIR = "Daily_Renewable_PDF_Reports"
-    OUTPUT_DIR = "Processed_Renewable_XLSX_reports"
+PDF_WORKERS = 1         # Processes for PDF table extraction (1 = sequential, in this process)
+PDF_PAGES_PER_TASK = 8  # Pages of one PDF per pool task, so large PDFs spread over several workers
+RE_XLSX_OUTPUT = True   # Also write the _cleaned.xlsx (the RE facts always go to the fact store)
+PDF_POOL_CONTEXT = multiprocessing.get_context("spawn")  # Never fork the caller (e.g. the backend running pipeline.py)
+
+HINDI_TO_ENGLISH = {"चडंीगढ़":"Chandigarh","दिल्ली":"Delhi","हररयजणज":"Haryana","दहमजचल प्रिेश":"Himachal Pradesh","र्म्मू और कश्मीर":"Jammu and Kashmir","लद्िजख़":"Ladakh","परं्जब":"Punjab","रजर्स्थजन":"Rajasthan","उत्तर प्रिेश":"Uttar Pradesh","उत्तरजखडं":"Uttarakhand","उत्तरी के्षत्र":"Northern Region","गरु्रजत":"Gujarat","छत्तीसगढ़":"Chhattisgarh","मध्य प्रिेश":"Madhya Pradesh","महजरजष्ट्र":"Maharashtra","आधं्र प्रिेश":"Andhra Pradesh","तलेगंजनज":"Telangana","कनजाटक":"Karnataka","केरल":"Kerala","तममलनजडु":"Tamil Nadu","पवूी के्षत्र":"Eastern Region","पश्श्चमी के्षत्र":"Western Region","िक्षक्षणी के्षत्र":"Southern Region","उत्तर-पवूी के्षत्र":"North Eastern Region","सम्पणूा भजरत":"All India"}
+# One regex pass per state cell; first() keeps the dict-order "first substring hit" of the old loop
+HINDI_STATE_MATCHER = KeywordMatcher([('state', hindi, None) for hindi in HINDI_TO_ENGLISH])
+
+def translate_state(state):
+    """English name for a Hindi state cell (first HINDI_TO_ENGLISH key it contains), else the cell."""
+    hindi = HINDI_STATE_MATCHER.first(state, 'state')
+    return HINDI_TO_ENGLISH[hindi] if hindi is not None else state
+
+def extract_pdf_pages(pdf_path, page_indices=None):
+    """Extracts the tables of one PDF's pages (default: all but the last page).
+    Returns (total_pages, [(page_index, summary_rows, station_rows, log_lines), ...]) in page order."""
+    results = []
+    with pdfplumber.open(pdf_path) as pdf:
+        total_pages = len(pdf.pages)
+        if page_indices is None:
+            page_indices = range(total_pages - 1)
+        for i in page_indices:
+            log = [f"📄 Processing page {i+1}/{total_pages}..."]
+            summary_rows, station_rows = [], []
+            table = pdf.pages[i].extract_table()
+            if not table:
+                log.append(f"⚠️  No table found on page {i+1}")
+            elif i == 0:
+                for row in table:
+                    if len(row) >= 9:
+                        state = row[0]
+                        if state:
+                            state = translate_state(state)
+                            wind, solar, others, total = row[1:5]
+                            summary_rows.append([state, wind, solar, others, total])
+            else:
+                for row in table:
+                    if row and len(row) >= 8:
+                        cleaned = [cell if cell else "" for cell in row[:7]]
+                        station_rows.append(cleaned)
+            results.append((i, summary_rows, station_rows, log))
+    return total_pages, results
+
+def submit_pdf_extraction(pdf_path, executor=None):
+    """Starts extracting one PDF; returns a callable giving extract_pdf_pages()'s result.
+    With an executor the pages are split into PDF_PAGES_PER_TASK chunks that run in the pool and
+    are joined back in page order; without one the whole file is extracted when the callable runs."""
+    if executor is None:
+        return lambda: extract_pdf_pages(pdf_path)
+    try:
+        with pdfplumber.open(pdf_path) as pdf:
+            total_pages = len(pdf.pages)
+    except Exception as e:
+        def failed():
+            raise e
+        return failed
+    pages = list(range(total_pages - 1))
+    futures = [executor.submit(extract_pdf_pages, pdf_path, pages[k:k + PDF_PAGES_PER_TASK])
+               for k in range(0, len(pages), PDF_PAGES_PER_TASK)]
+    return lambda: (total_pages, [r for f in futures for r in f.result()[1]])
+
+def process_renewable_pdfs(workers=PDF_WORKERS):
+    PDF_DIR = os.path.join(BASE_DIR, "Daily_Renewable_PDF_Reports")
+    OUTPUT_DIR = os.path.join(BASE_DIR, "Processed_Renewable_XLSX_reports")
     os.makedirs(OUTPUT_DIR, exist_ok=True)
-    hindi_to_english = {"चडंीगढ़":"Chandigarh","दिल्ली":"Delhi","हररयजणज":"Haryana","दहमजचल प्रिेश":"Himachal Pradesh","र्म्मू और कश्मीर":"Jammu and Kashmir","लद्िजख़":"Ladakh","परं्जब":"Punjab","रजर्स्थजन":"Rajasthan","उत्तर प्रिेश":"Uttar Pradesh","उत्तरजखडं":"Uttarakhand","उत्तरी के्षत्र":"Northern Region","गरु्रजत":"Gujarat","छत्तीसगढ़":"Chhattisgarh","मध्य प्रिेश":"Madhya Pradesh","महजरजष्ट्र":"Maharashtra","आधं्र प्रिेश":"Andhra Pradesh","तलेगंजनज":"Telangana","कनजाटक":"Karnataka","केरल":"Kerala","तममलनजडु":"Tamil Nadu","पवूी के्षत्र":"Eastern Region","पश्श्चमी के्षत्र":"Western Region","िक्षक्षणी के्षत्र":"Southern Region","उत्तर-पवूी के्षत्र":"North Eastern Region","सम्पणूा भजरत":"All India"}
     print(f"--- Starting PDF Processing ---")
-    for filename in os.listdir(PDF_DIR):
-        if not filename.endswith(".pdf"):
-            continue
-        pdf_path = os.path.join(PDF_DIR, filename)
-        output_filename = filename.replace(".pdf", "_cleaned.xlsx")
-        output_path = os.path.join(OUTPUT_DIR, output_filename)
-        if os.path.exists(output_path):
-            print(f"\n⏭️  Skipping '{filename}' (already processed).")
-            continue
-        print(f"\n--- Processing '{filename}' ---")
-        summary_data, station_data = [], []
-        try:
-            with pdfplumber.open(pdf_path) as pdf:
-                total_pages = len(pdf.pages)
-                print(f"🔍 Found {total_pages} pages in PDF")
-                for i, page in enumerate(pdf.pages):
-                    if i == total_pages - 1:
-                        print(f"⏭️  Skipping last page ({i+1})...")
-                        continue
-                    print(f"📄 Processing page {i+1}/{total_pages}...")
-                    table = page.extract_table()
-                    if not table:
-                        print(f"⚠️  No table found on page {i+1}")
-                        continue
-                    if i == 0:
-                        for row in table:
-                            if len(row) >= 9:
-                                state = row[0]
-                                if state:
-                                    for hindi, eng in hindi_to_english.items():
-                                        if hindi in state:
-                                            state = eng
-                                            break
-                                    wind, solar, others, total = row[1:5]
-                                    summary_data.append([state, wind, solar, others, total])
-                    else:
-                        for row in table:
-                            if row and len(row) >= 8:
-                                cleaned = [cell if cell else "" for cell in row[:7]]
-                                station_data.append(cleaned)
-            df_summary = pd.DataFrame(summary_data, columns=["State / Region","Wind Energy","Solar Energy","Others RES","Total"])
-            df_station = pd.DataFrame(station_data, columns=["Station","State / Region","Sector","Owner","Type","Operational Capacity","Actual Generation"])
-            df_summary = df_summary[df_summary['State / Region']!='State / Region']
-            df_station = df_station[df_station['Station']!='Station']
-            if df_summary.empty and df_station.empty:
-                print(f"⚠️  No data extracted from '{filename}'.")
+    executor = ProcessPoolExecutor(max_workers=workers, mp_context=PDF_POOL_CONTEXT) if workers > 1 else None
+    try:
+        # Every pending file is queued first so the pool stays busy; results are written in listing order
+        jobs = []
+        for filename in os.listdir(PDF_DIR):
+            if not filename.endswith(".pdf"):
+                continue
+            pdf_path = os.path.join(PDF_DIR, filename)
+            output_filename = filename.replace(".pdf", "_cleaned.xlsx")
+            output_path = os.path.join(OUTPUT_DIR, output_filename)
+            report_date = re_report_date(filename)
+            has_facts = report_date is not None and has_partition('re_station', report_date)
+            if os.path.exists(output_path) and not has_facts and report_date is not None:
+                store_re_facts_from_xlsx(output_path, report_date)
+                has_facts = True
+            if has_facts or (report_date is None and os.path.exists(output_path)):
+                print(f"\n⏭️  Skipping '{filename}' (already processed).")
                 continue
+            jobs.append((filename, output_path, submit_pdf_extraction(pdf_path, executor)))
+        for filename, output_path, extraction in jobs:
+            write_renewable_xlsx(filename, output_path, extraction)
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+    print("\n--- All PDF processing complete. ---")
+
+def build_renewable_frames(total_pages, pages, verbose=True):
+    """Summary / station DataFrames from extract_pdf_pages()'s page results (in page order)."""
+    summary_data, station_data = [], []
+    if verbose:
+        print(f"🔍 Found {total_pages} pages in PDF")
+    for i, summary_rows, station_rows, log in pages:
+        if verbose:
+            for line in log:
+                print(line)
+        summary_data.extend(summary_rows)
+        station_data.extend(station_rows)
+    if verbose and total_pages:
+        print(f"⏭️  Skipping last page ({total_pages})...")
+    df_summary = pd.DataFrame(summary_data, columns=["State / Region","Wind Energy","Solar Energy","Others RES","Total"])
+    df_station = pd.DataFrame(station_data, columns=["Station","State / Region","Sector","Owner","Type","Operational Capacity","Actual Generation"])
+    df_summary = df_summary[df_summary['State / Region']!='State / Region']
+    df_station = df_station[df_station['Station']!='Station']
+    return df_summary, df_station
+
+def verify_renewable_outputs(workers=PDF_WORKERS, limit=None):
+    """Re-extracts PDFs that already have a _cleaned.xlsx and reports whether both sheets match it."""
+    PDF_DIR = os.path.join(BASE_DIR, "Daily_Renewable_PDF_Reports")
+    OUTPUT_DIR = os.path.join(BASE_DIR, "Processed_Renewable_XLSX_reports")
+    print(f"--- Verifying PDF extraction against existing outputs ---")
+    pairs = []
+    for filename in sorted(os.listdir(PDF_DIR)):
+        output_path = os.path.join(OUTPUT_DIR, filename.replace(".pdf", "_cleaned.xlsx"))
+        if filename.endswith(".pdf") and os.path.exists(output_path):
+            pairs.append((filename, output_path))
+    pairs = pairs[:limit] if limit else pairs
+    as_text = lambda df: df.fillna("").astype(str).reset_index(drop=True)
+    mismatched = []
+    executor = ProcessPoolExecutor(max_workers=workers, mp_context=PDF_POOL_CONTEXT) if workers > 1 else None
+    try:
+        jobs = [(filename, output_path, submit_pdf_extraction(os.path.join(PDF_DIR, filename), executor))
+                for filename, output_path in pairs]
+        for filename, output_path, extraction in jobs:
+            started = time.perf_counter()
+            frames = build_renewable_frames(*extraction(), verbose=False)
+            elapsed = time.perf_counter() - started
+            sheets = ["Summary (State Data)", "Stations (Plant Data)"]
+            same = all(as_text(df).equals(as_text(pd.read_excel(output_path, sheet_name=sheet, dtype=str, keep_default_na=False)))
+                       for df, sheet in zip(frames, sheets))
+            print(f"{'✅' if same else '❌'} {filename} ({elapsed:.2f}s)")
+            if not same:
+                mismatched.append(filename)
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+    print(f"\n--- Verified {len(pairs)} files, {len(mismatched)} mismatched. ---")
+    return mismatched
+
+def re_report_date(filename):
+    """Report date from names like '1_Aug_2025_Daily_RE_Generation_Report.pdf' ('Sept' accepted)."""
+    match = re.search(r"(\d{1,2})_([A-Za-z]{3,4})_(\d{4})", filename)
+    if not match:
+        return None
+    try:
+        return datetime.strptime(f"{match.group(1)}_{match.group(2)[:3]}_{match.group(3)}", "%d_%b_%Y").date()
+    except ValueError:
+        return None
+
+def store_re_facts(report_date, df_summary, df_station):
+    write_partition('re_summary', report_date, df_summary)
+    write_partition('re_station', report_date, df_station)
+
+def store_re_facts_from_xlsx(output_path, report_date):
+    """Fact store partitions for a report processed before the store existed (from its _cleaned.xlsx)."""
+    try:
+        sheets = pd.read_excel(output_path, sheet_name=["Summary (State Data)", "Stations (Plant Data)"], dtype=str)
+        store_re_facts(report_date, sheets["Summary (State Data)"], sheets["Stations (Plant Data)"])
+        print(f"🗄️  Stored facts for {report_date} from {os.path.basename(output_path)}")
+    except Exception as e:
+        print(f"⚠️  Could not store facts from '{output_path}': {e}")
+
+def write_renewable_xlsx(filename, output_path, extraction):
+    """Merges one PDF's page results in page order, stores them in the fact store (re_summary /
+    re_station) and, with RE_XLSX_OUTPUT, writes its _cleaned.xlsx."""
+    print(f"\n--- Processing '{filename}' ---")
+    report_date = re_report_date(filename)
+    try:
+        df_summary, df_station = build_renewable_frames(*extraction())
+        if df_summary.empty and df_station.empty:
+            print(f"⚠️  No data extracted from '{filename}'.")
+            return
+        if report_date is not None:
+            store_re_facts(report_date, df_summary, df_station)
+            print(f"🗄️  Stored facts for {report_date}")
+        if RE_XLSX_OUTPUT or report_date is None:
             with pd.ExcelWriter(output_path, engine="openpyxl") as writer:
                 df_summary.to_excel(writer, sheet_name="Summary (State Data)", index=False)
                 df_station.to_excel(writer, sheet_name="Stations (Plant Data)", index=False)
             print(f"✅ Extraction complete! File saved as: {output_path}")
-        except Exception as e:
-            print(f"❌ ERROR processing '{filename}': {e}")
-            if os.path.exists(output_path):
-                os.remove(output_path)
-    print("\n--- All PDF processing complete. ---")
+    except Exception as e:
+        print(f"❌ ERROR processing '{filename}': {e}")
+        if os.path.exists(output_path):
+            os.remove(output_path)
+        if report_date is not None:
+            remove_partition('re_summary', report_date); remove_partition('re_station', report_date)
 
 
 # -------------------------------------------------------------------
@@ -268,18 +382,42 @@ def process_renewable_pdfs():
 # -------------------------------------------------------------------
 
 BASE_URL = "https://raw.githubusercontent.com/vanga/india-power-generation/main/data/meritindia/current-generation/raw/{year}-{month:02d}.csv"
-OUTPUT_FILE = "state_daily_avg.csv"
+OUTPUT_FILE = os.path.join(BASE_DIR, "state_daily_avg.csv")
+MERIT_STATE_FILE = os.path.join(BASE_DIR, ".merit_month_state.json")  # ETag / Last-Modified of each monthly CSV already aggregated
+CSV_CHUNK_ROWS = 200000                       # Rows per streamed read_csv chunk
 
-def download_monthly_csv(year, month):
-    url = BASE_URL.format(year=year, month=month)
+def load_month_validators(path=MERIT_STATE_FILE):
+    try:
+        with open(path, encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {}
+
+def save_month_validators(validators, path=MERIT_STATE_FILE):
+    with open(path + ".tmp", "w", encoding="utf-8") as fh:
+        json.dump(validators, fh, indent=1, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+def download_monthly_csv(session, year, month, validators, base_url=BASE_URL):
+    """Streams one month's CSV with a conditional GET; returns (daily averages, new validators).
+    Unchanged (304) or missing months give (empty DataFrame, None)."""
+    url = base_url.format(year=year, month=month)
     print(f"🔽 Fetching data from: {url}")
-    response = requests.get(url)
-    if response.status_code != 200:
-        print(f"⚠️  No data found for {year}-{month:02d}")
-        return pd.DataFrame()
-    df = pd.read_csv(StringIO(response.text))
-    print(f"✅ Fetched {len(df)} records for {year}-{month:02d}")
-    return df
+    known = validators.get(f"{year}-{month:02d}", {})
+    headers = {}
+    if known.get("etag"): headers["If-None-Match"] = known["etag"]
+    if known.get("last_modified"): headers["If-Modified-Since"] = known["last_modified"]
+    with session.get(url, headers=headers, stream=True, timeout=60) as response:
+        if response.status_code == 304:
+            print(f"⏭️  {year}-{month:02d} unchanged since last run")
+            return pd.DataFrame(), None
+        if response.status_code != 200:
+            print(f"⚠️  No data found for {year}-{month:02d}")
+            return pd.DataFrame(), None
+        response.raw.decode_content = True
+        df_avg, records = aggregate_daily_chunks(pd.read_csv(response.raw, chunksize=CSV_CHUNK_ROWS))
+        print(f"✅ Fetched {records} records for {year}-{month:02d}")
+        return df_avg, {"etag": response.headers.get("ETag"), "last_modified": response.headers.get("Last-Modified")}
 
 def detect_datetime_column(columns):
     for c in columns:
@@ -287,68 +425,129 @@ def detect_datetime_column(columns):
             return c
     return None
 
-def compute_daily_average(df):
-    df.columns = [col.strip() for col in df.columns]
-    datetime_col = detect_datetime_column(df.columns)
-    if not datetime_col:
-        print(f"⚠️ No datetime-like column found. Available: {list(df.columns)}")
-        return pd.DataFrame()
-    state_col = next((c for c in df.columns if "state" in c.lower() and "code" in c.lower()), None)
-    numeric_cols = [c for c in df.columns if any(k.lower() in c.lower() for k in ["Demand","ISGS","Import","Generation"])]
-    if not state_col or not numeric_cols:
-        print(f"⚠️ Missing required columns.")
-        return pd.DataFrame()
-    print(f"🕓 Using datetime column: {datetime_col}")
-    df[datetime_col] = pd.to_datetime(df[datetime_col], errors="coerce")
-    df = df.dropna(subset=[datetime_col])
-    df["Date"] = df[datetime_col].dt.date
-    for col in numeric_cols:
-        df[col] = pd.to_numeric(df[col].astype(str).str.replace(r"[^0-9\.\-]","",regex=True).replace("",None),errors="coerce")
-    grouped = df.groupby([state_col,"Date"],as_index=False)[numeric_cols].mean(numeric_only=True).round(2)
+def clean_numeric_column(col):
+    """Numbers from a raw column; only values that do not parse as-is get the digit/sign/dot cleanup."""
+    values = pd.to_numeric(col, errors="coerce")
+    needs_cleanup = values.isna() & col.notna()
+    if needs_cleanup.any():
+        cleaned = col[needs_cleanup].astype(str).str.replace(r"[^0-9\.\-]","",regex=True).replace("",None)
+        values[needs_cleanup] = pd.to_numeric(cleaned, errors="coerce")
+    return values
+
+def aggregate_daily_chunks(chunks):
+    """Per state and day means of the numeric columns over an iterable of CSV chunks, combined from
+    per-chunk sums and counts; returns (daily averages, records read)."""
+    sums, counts, records = [], [], 0
+    state_col = datetime_col = numeric_cols = None
+    for df in chunks:
+        records += len(df)
+        df.columns = [col.strip() for col in df.columns]
+        if numeric_cols is None:
+            datetime_col = detect_datetime_column(df.columns)
+            if not datetime_col:
+                print(f"⚠️ No datetime-like column found. Available: {list(df.columns)}")
+                return pd.DataFrame(), records
+            state_col = next((c for c in df.columns if "state" in c.lower() and "code" in c.lower()), None)
+            numeric_cols = [c for c in df.columns if any(k.lower() in c.lower() for k in ["Demand","ISGS","Import","Generation"])]
+            if not state_col or not numeric_cols:
+                print(f"⚠️ Missing required columns.")
+                return pd.DataFrame(), records
+            print(f"🕓 Using datetime column: {datetime_col}")
+        stamps = pd.to_datetime(df[datetime_col], errors="coerce")
+        df = df[stamps.notna()]
+        values = pd.DataFrame({col: clean_numeric_column(df[col]) for col in numeric_cols})
+        values[state_col] = df[state_col]
+        values["Date"] = stamps[stamps.notna()].dt.date
+        grouped = values.groupby([state_col,"Date"])[numeric_cols]
+        sums.append(grouped.sum()); counts.append(grouped.count())
+    if not sums:
+        return pd.DataFrame(), records
+    total = pd.concat(sums).groupby(level=[0, 1]).sum()
+    n = pd.concat(counts).groupby(level=[0, 1]).sum()
+    grouped = (total / n.where(n > 0)).round(2).reset_index()
     rename_map = {c:f"Avg_{c}" for c in numeric_cols}
     grouped.rename(columns=rename_map,inplace=True)
     print(f"📊 Computed daily averages.")
-    return grouped
+    return grouped, records
+
+def compute_daily_average(df):
+    return aggregate_daily_chunks([df])[0]
 
-def update_local_csv(new_data):
-    if os.path.exists(OUTPUT_FILE):
-        old = pd.read_csv(OUTPUT_FILE)
+def update_local_csv(new_data, output_file=OUTPUT_FILE):
+    if os.path.exists(output_file):
+        old = pd.read_csv(output_file)
         old["Date"]=pd.to_datetime(old["Date"]).dt.date
         combined = pd.concat([old,new_data],ignore_index=True)
         combined.drop_duplicates(subset=["Date","StateCode"],keep="last",inplace=True)
         combined.sort_values(by=["Date"],inplace=True)
     else:
         combined = new_data
-    combined.to_csv(OUTPUT_FILE,index=False)
-    print(f"💾 Updated local file: {OUTPUT_FILE}")
+    combined.to_csv(output_file,index=False)
+    print(f"💾 Updated local file: {output_file}")
 
-def compute_state_daily_averages():
+def append_local_csv(new_data, output_file=OUTPUT_FILE):
+    """Appends rows dated after everything in output_file; rewrites it only if the columns changed."""
+    new_data = new_data.drop_duplicates(subset=["Date","StateCode"],keep="last").sort_values(by=["Date"],kind="stable")
+    if not os.path.exists(output_file):
+        new_data.to_csv(output_file,index=False)
+        print(f"💾 Created local file: {output_file}")
+        return
+    header = list(pd.read_csv(output_file, nrows=0).columns)
+    if not set(new_data.columns) <= set(header):
+        update_local_csv(new_data, output_file)
+        return
+    new_data.reindex(columns=header).to_csv(output_file,mode="a",header=False,index=False)
+    print(f"💾 Appended {len(new_data)} rows to local file: {output_file}")
+
+def store_demand_facts(output_file=OUTPUT_FILE):
+    """Writes a 'demand' fact store partition for every date of output_file that has none yet."""
+    if not os.path.exists(output_file):
+        return
+    df=pd.read_csv(output_file)
+    df["Date"]=pd.to_datetime(df["Date"]).dt.date
+    stored=set(partition_dates("demand"))
+    new_days=0
+    for day,rows in df[~df["Date"].isin(stored)].groupby("Date"):
+        write_partition("demand",day,rows.drop(columns=["Date"]))
+        new_days+=1
+    if new_days:
+        print(f"🗄️  Stored demand facts for {new_days} dates")
+
+def compute_state_daily_averages(base_url=BASE_URL, output_file=OUTPUT_FILE, state_file=MERIT_STATE_FILE):
     print("🚀 Starting Renewable Energy Data Fetching...")
     last_processed=None
-    if os.path.exists(OUTPUT_FILE):
-        df=pd.read_csv(OUTPUT_FILE)
-        if not df.empty:
-            last_processed=pd.to_datetime(df["Date"]).max().date()
+    if os.path.exists(output_file):
+        dates=pd.read_csv(output_file, usecols=["Date"])["Date"]
+        if not dates.empty:
+            last_processed=pd.to_datetime(dates).max().date()
             print(f"📆 Last processed date: {last_processed}")
-    start_year,start_month=2025,8
+    # Months before the last processed one are complete; only that month onwards can hold new rows
+    start_year,start_month=(last_processed.year,last_processed.month) if last_processed else (2025,8)
     current_year,current_month=datetime.now().year,datetime.now().month
+    # Without existing output every month must be read again, whatever was cached
+    validators=load_month_validators(state_file) if last_processed else {}
+    fetched={}
     all_data=[]
-    for year in range(start_year,current_year+1):
-        for month in range(1,13):
-            if (year==start_year and month<start_month) or (year==current_year and month>current_month):
-                continue
-            df=download_monthly_csv(year,month)
-            if df.empty: continue
-            df_avg=compute_daily_average(df)
-            if df_avg.empty: continue
-            if last_processed:
-                df_avg=df_avg[df_avg["Date"]>last_processed]
+    with requests.Session() as session:
+        for year in range(start_year,current_year+1):
+            for month in range(1,13):
+                if (year==start_year and month<start_month) or (year==current_year and month>current_month):
+                    continue
+                df_avg,month_validators=download_monthly_csv(session,year,month,validators,base_url)
+                if month_validators: fetched[f"{year}-{month:02d}"]=month_validators
                 if df_avg.empty: continue
-            all_data.append(df_avg)
+                if last_processed:
+                    df_avg=df_avg[df_avg["Date"]>last_processed]
+                    if df_avg.empty: continue
+                all_data.append(df_avg)
     if all_data:
-        update_local_csv(pd.concat(all_data,ignore_index=True))
+        append_local_csv(pd.concat(all_data,ignore_index=True), output_file)
     else:
         print("✅ No new data found.")
+    store_demand_facts(output_file)
+    # Validators only once the rows they cover are on disk
+    validators.update(fetched)
+    save_month_validators(validators, state_file)
     print("🎯 All processing complete.")
 
 
@@ -356,13 +555,22 @@ def compute_state_daily_averages():
 # MAIN SEQUENCE
 # -------------------------------------------------------------------
 
-def main():
+def main(pdf_workers=PDF_WORKERS):
     print("\n================= INTEGRATED WEB SCRAPPING PIPELINE =================")
     sync_daily_plant_reports()
     download_renewable_pdfs()
-    process_renewable_pdfs()
+    process_renewable_pdfs(pdf_workers)
     compute_state_daily_averages()
     print("\n================= PIPELINE EXECUTION COMPLETE =================")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Integrated web scrapping pipeline")
+    parser.add_argument("--pdf-workers", type=int, default=PDF_WORKERS,
+                        help="Processes for RE PDF table extraction (1 = sequential)")
+    parser.add_argument("--verify-pdf-extraction", action="store_true",
+                        help="Only re-extract already processed PDFs and compare with their _cleaned.xlsx")
+    args = parser.parse_args()
+    if args.verify_pdf_extraction:
+        verify_renewable_outputs(args.pdf_workers)
+    else:
+        main(pdf_workers=args.pdf_workers)
@@ -0,0 +1,41 @@
+import re
+
+
+class KeywordMatcher:
+    """Finds every keyword of several groups in a string with one precompiled alternation regex.
+
+    entries: [(group, key, pattern), ...]; pattern is a regex source, or None for a plain
+    substring match of key. scan() reports the same hits as testing each pattern separately
+    (re.search / `key in text`), but walks the text once instead of once per keyword.
+    """
+    def __init__(self, entries):
+        self.entries = [(group, key) for group, key, _ in entries]
+        sources = [pattern if pattern is not None else re.escape(key) for _, key, pattern in entries]
+        self._patterns = [re.compile(src) for src in sources]
+        # Longest keys first, so at each position the alternation prefers e.g. 'STATE SECTOR' over 'STATE'
+        order = sorted(range(len(entries)), key=lambda i: -len(entries[i][1]))
+        alternation = '|'.join(f'(?P<k{i}>{sources[i]})' for i in order)
+        # Zero-width lookahead: finditer tries every start position, so overlapping keys are all seen
+        self._regex = re.compile(f'(?=(?:{alternation}))')
+        # Keys the alternation can hide: later alternatives that also match at the start of key i
+        rank = {i: n for n, i in enumerate(order)}
+        self._shadowed = [[j for j in order if rank[j] > rank[i] and self._patterns[j].match(entries[i][1])]
+                          for i in range(len(entries))]
+
+    def scan(self, text):
+        """Returns {group: [key, ...]} for all keys found in text; keys keep their entry order."""
+        found = set()
+        for m in self._regex.finditer(text):
+            i = int(m.lastgroup[1:]); pos = m.start()
+            found.add(i)
+            found.update(j for j in self._shadowed[i] if self._patterns[j].match(text, pos))
+        hits = {}
+        for i in sorted(found):
+            group, key = self.entries[i]
+            hits.setdefault(group, []).append(key)
+        return hits
+
+    def first(self, text, group):
+        """First key of group (in entry order) found in text, or None."""
+        keys = self.scan(text).get(group)
+        return keys[0] if keys else None
@@ -1,8 +1,20 @@
 import os
 import re
-from datetime import datetime, timedelta
+import argparse
+import hashlib
+import json
+import time
+import multiprocessing
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
 import mysql.connector
+import numpy as np
 import pandas as pd
+from keyword_matcher import KeywordMatcher
+from bulk_loader import BulkLoadWriter, StagedTable
+from fact_store import has_partition, partition_dates, partition_path, read_partition, remove_partition, write_partition
+from ingest_manifest import IngestManifest
 
 # ---------------------------
 # CONFIGURATION
@@ -14,8 +26,28 @@ DB_CONFIG = {
     'database': 'IndianEnergyDB',
     'port': 3306
 }
-REPORT_FOLDER = "Daily_Plant_Generation_XLS_Reports"
+BASE_DIR = os.path.dirname(os.path.abspath(__file__)) # Data folders live next to this script
+REPORT_FOLDER = os.path.join(BASE_DIR, "Daily_Plant_Generation_XLS_Reports")
 DEBUG = True
+BATCH_SIZE = 500 # Rows per multi-row INSERT ... ON DUPLICATE KEY UPDATE
+PARSE_WORKERS = 1 # >1 reads/parses files in a process pool; DB writes stay sequential in date order
+USE_CACHE = True # Reuse decoded workbooks from CACHE_DIR (disable with --no-cache)
+CACHE_DIR = os.path.join(BASE_DIR, ".dgr_cache")
+BULK_LOAD = False # Stage rows in TSV files and merge them set-based at the end of the run (--bulk-load)
+CACHE_MAX_MB = 512 # Least recently used entries are evicted beyond this size
+CACHE_MAX_AGE_DAYS = 30 # Entries unused for longer are evicted
+CACHE_FORMAT_VERSION = 1 # Bump when try_read_excel's cleaning changes to invalidate old entries
+LAYOUT_ROWS = 14 # Top rows hashed into the layout fingerprint (the header search window)
+LAYOUT_CACHE_VERSION = 2 # Bump when detect_report_columns' heuristics change to invalidate known layouts
+WRITE_FACTS = True # Store each parsed report's records in the fact store (dgr_* datasets)
+FIRST_REPORT_DATE = datetime(2025, 8, 1).date() # Earlier reports are never loaded
+# Report dates that already hold DGR rows: only parseall1 writes Monitored_Capacity_MW and numeric Plant_IDs
+# (parseall2's plants are 'P<n>'); seeds an empty INGEST_MANIFEST
+DGR_LOADED_DATES_SQL = """
+    SELECT Report_Date FROM REGION_DETAILS WHERE Monitored_Capacity_MW IS NOT NULL
+    UNION
+    SELECT Log_Date FROM PRODUCTIONLOG WHERE Plant_ID NOT LIKE 'P%'
+"""
 
 # ---------------------------
 # CONSTANT MAPS
@@ -50,6 +82,26 @@ CONTEXT_HEADER_KEYWORDS = {
 }
 UNIT_REGEX = re.compile(r'^(UNIT[,\s]*\d+|UNIT\b)', re.IGNORECASE)
 UNIT_NUMBER_EXTRACT_REGEX = re.compile(r'\d+') # Regex to extract number
+TOTAL_ROW_REGEX = re.compile(r'\b(?:STATE|REGION)\s*TOTAL\b')
+SECTOR_FALLBACK_REGEX = re.compile(r'SECTOR[:\s]*([A-Z \.]{2,30})')
+# Flexible & vs AND, compiled once (same patterns both passes used inline)
+STATE_PATTERNS = [(name, code, re.compile(r'\b' + re.escape(name).replace('AND', '(?:AND|&)') + r'\b'))
+                  for name, code in STATE_MAP.items()]
+# State, sector and type keywords of a row found in one regex scan (classify_rows)
+ROW_KEYWORDS = KeywordMatcher([('state', name, pat.pattern) for name, _, pat in STATE_PATTERNS]
+                              + [('sector', key, None) for key in SECTOR_MAP]
+                              + [('type', key, None) for key in TYPE_MAP])
+
+# Row kinds produced by classify_rows()
+ROW_BLANK = 'BLANK'
+ROW_STATE_HEADER = 'STATE_HEADER'
+ROW_SECTOR_HEADER = 'SECTOR_HEADER'
+ROW_TYPE_HEADER = 'TYPE_HEADER'
+ROW_TOTAL = 'TOTAL'
+ROW_CONTEXT_KEYWORD = 'CONTEXT_KEYWORD'
+ROW_UNIT = 'UNIT'
+ROW_PLANT = 'PLANT'
+ROW_OTHER = 'OTHER'
 
 # ---------------------------
 # UTILITY FUNCTIONS (Same as v8/v7)
@@ -191,337 +243,572 @@ def create_db_conn(cfg):
         return cnx
     except mysql.connector.Error as err: raise RuntimeError(f"DB connection error: {err}")
     except Exception as e: raise RuntimeError(f"DB connection error: {e}")
+
 # ---------------------------
-# PASS 1: Extract Region Data
+# DECODED WORKBOOK CACHE (Parquet, keyed by file content hash)
 # ---------------------------
+# Cells of an object column are stored as a type code + exact text so mixed str/float/int/datetime
+# columns round-trip unchanged; other columns (float64, str) are stored natively.
+_CELL_NULL, _CELL_STR, _CELL_FLOAT, _CELL_INT, _CELL_DATETIME = range(5)
+
+def _file_digest(path):
+    h = hashlib.sha256(f"v{CACHE_FORMAT_VERSION}:".encode())
+    with open(path, 'rb') as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b''): h.update(chunk)
+    return h.hexdigest()
+
+def _encode_cells(values):
+    kinds = np.empty(len(values), dtype=np.int8); texts = []
+    for i, v in enumerate(values):
+        if v is None: kinds[i] = _CELL_NULL; texts.append(None)
+        elif isinstance(v, str): kinds[i] = _CELL_STR; texts.append(v)
+        elif isinstance(v, bool): return None # Not expected in DGR sheets; leave such files uncached
+        elif isinstance(v, (int, np.integer)): kinds[i] = _CELL_INT; texts.append(str(int(v)))
+        elif isinstance(v, (float, np.floating)): kinds[i] = _CELL_FLOAT; texts.append(repr(float(v)))
+        elif isinstance(v, datetime): kinds[i] = _CELL_DATETIME; texts.append(v.isoformat())
+        else: return None
+    return kinds, texts
+
+def _decode_cells(kinds, texts):
+    values = np.empty(len(kinds), dtype=object)
+    for kind, convert in ((_CELL_STR, str), (_CELL_FLOAT, float), (_CELL_INT, int), (_CELL_DATETIME, datetime.fromisoformat)):
+        mask = kinds == kind
+        if mask.any(): values[mask] = [convert(t) for t in texts[mask]]
+    return values
+
+def encode_frame_for_cache(df):
+    """Returns a Parquet-safe DataFrame for a try_read_excel result, or None if a cell type is unsupported."""
+    cols = {}
+    for c in df.columns:
+        if df[c].dtype != object: cols[str(c)] = df[c]; continue
+        encoded = _encode_cells(df[c].tolist())
+        if encoded is None: return None
+        cols[f"{c}:kind"] = encoded[0]
+        cols[f"{c}:text"] = pd.Series(encoded[1], dtype=object)
+    return pd.DataFrame(cols, index=pd.RangeIndex(len(df)))
+
+def decode_cached_frame(stored):
+    """Inverse of encode_frame_for_cache."""
+    out = {}
+    for name in stored.columns:
+        if name.endswith(':text'): continue
+        if name.endswith(':kind'):
+            c = name[:-len(':kind')]
+            out[int(c)] = pd.Series(_decode_cells(stored[name].to_numpy(), stored[f"{c}:text"].to_numpy(dtype=object)), dtype=object)
+        else: out[int(name)] = stored[name]
+    return pd.DataFrame(out)
+
+def read_excel_cached(path, use_cache=USE_CACHE, cache_dir=CACHE_DIR):
+    """try_read_excel with an on-disk cache of the cleaned DataFrame keyed by the file's content hash.
+    Cache problems (no Parquet engine, corrupt entry, read-only dir) only cost the Excel decode."""
+    if not use_cache: return try_read_excel(path)
+    try:
+        cache_path = os.path.join(cache_dir, _file_digest(path) + '.parquet')
+    except OSError as e:
+        print(f"[ERROR] Could not hash {os.path.basename(path)}: {e}")
+        return None
+
+    if os.path.exists(cache_path):
+        try:
+            df = decode_cached_frame(pd.read_parquet(cache_path))
+            os.utime(cache_path) # Mark as recently used for size-based eviction
+            if DEBUG: print(f"[CACHE] Hit for {os.path.basename(path)}")
+            return df
+        except Exception as e:
+            if DEBUG: print(f"[CACHE WARN] Unreadable entry for {os.path.basename(path)} ({e}); decoding workbook.")
+
+    df = try_read_excel(path)
+    if df is None: return None
+    try:
+        stored = encode_frame_for_cache(df)
+        if stored is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+            stored.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, cache_path) # Atomic: parallel workers never see partial files
+    except Exception as e:
+        if DEBUG: print(f"[CACHE WARN] Could not cache {os.path.basename(path)}: {e}")
+    return df
+
+def prune_read_cache(cache_dir=CACHE_DIR, max_mb=CACHE_MAX_MB, max_age_days=CACHE_MAX_AGE_DAYS):
+    """Evicts cache entries unused for max_age_days, then least recently used ones until under max_mb."""
+    if not os.path.isdir(cache_dir): return
+    now = datetime.now().timestamp()
+    entries = []
+    for name in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, name)
+        try: st = os.stat(path)
+        except OSError: continue
+        stale_tmp = name.endswith('.tmp') and now - st.st_mtime > 3600
+        if stale_tmp or (max_age_days is not None and now - st.st_mtime > max_age_days * 86400):
+            try: os.remove(path)
+            except OSError: pass
+        elif name.endswith('.parquet'): entries.append((st.st_mtime, st.st_size, path))
+
+    total = sum(size for _, size, _ in entries); removed = 0
+    for _, size, path in sorted(entries): # Oldest first
+        if max_mb is None or total <= max_mb * 1024 * 1024: break
+        try: os.remove(path); total -= size; removed += 1
+        except OSError: pass
+    if DEBUG and removed: print(f"[CACHE] Evicted {removed} entries; {total / 1024 / 1024:.1f} MB kept.")
+
 # ---------------------------
-# PASS 1: Extract Region Data
+# PLANT IDENTITY INDEX (loaded once per run)
 # ---------------------------
-def pre_scan_for_region_data(df, report_iso, monitored_col_idx, cnx):
-    """Scans DF, finds state totals (MW), and inserts into REGION_DETAILS."""
-    if DEBUG: print(f"\n--- Starting Pass 1: Region Data for {report_iso} ---")
-    pass1_cursor = None
-    inserted_count = 0
-    all_state_codes = set(STATE_MAP.values())
-    if 'BHU' in all_state_codes: all_state_codes.remove('BHU') # Exclude Bhutan import
+def _plant_key(plant_name, state_code):
+    # MySQL compares Plant_Name/State_Code case-insensitively; a NULL state never matches
+    if state_code is None: return None
+    return (str(plant_name).casefold(), str(state_code).casefold())
+
+def _numeric_plant_id(plant_id):
+    # Same value as CAST(Plant_ID AS UNSIGNED): leading digits, 0 otherwise (e.g. 'P12' from parseall2)
+    m = re.match(r'\s*(\d+)', str(plant_id)) if plant_id is not None else None
+    return int(m.group(1)) if m else 0
+
+class PlantIndex:
+    """In-memory (Plant_Name, State_Code) -> Plant_ID index plus the numeric Plant_ID allocator.
+
+    Replaces the per-row POWERPLANTS lookup and the per-file MAX(Plant_ID) scan. IDs handed
+    out since the last commit() are dropped again by rollback(), mirroring the DB transaction;
+    created lists the IDs of the plants committed since the index was loaded.
+    """
+    def __init__(self, ids_by_key=None, next_id=1):
+        self.ids_by_key = dict(ids_by_key or {})
+        self.next_id = next_id
+        self.created = []
+        self._pending_keys = []; self._committed_next_id = next_id
+
+    @classmethod
+    def load(cls, cnx):
+        cur = cnx.cursor()
+        try:
+            cur.execute("SELECT Plant_ID, Plant_Name, State_Code FROM POWERPLANTS ORDER BY Plant_ID")
+            ids_by_key = {}; max_id = 0
+            for plant_id, plant_name, state_code in cur.fetchall():
+                key = _plant_key(plant_name, state_code)
+                if key is not None: ids_by_key.setdefault(key, plant_id)
+                max_id = max(max_id, _numeric_plant_id(plant_id))
+        finally:
+            cur.close()
+        if DEBUG: print(f"[DB INFO] Plant index loaded: {len(ids_by_key)} plants, next Plant_ID {max_id + 1}")
+        return cls(ids_by_key, max_id + 1)
+
+    def lookup(self, plant_name, state_code):
+        key = _plant_key(plant_name, state_code)
+        return self.ids_by_key.get(key) if key is not None else None
+
+    def peek_new_id(self):
+        return str(self.next_id).zfill(3)
+
+    def register_new(self, plant_name, state_code, plant_id):
+        """Records a plant created with peek_new_id() and advances the allocator."""
+        key = _plant_key(plant_name, state_code)
+        if key is not None and key not in self.ids_by_key:
+            self.ids_by_key[key] = plant_id; self._pending_keys.append(key)
+        self.next_id = max(self.next_id, _numeric_plant_id(plant_id) + 1)
+
+    def forget(self, plant_ids):
+        """Drops plants registered since the last commit() whose POWERPLANTS row was not written."""
+        dropped = [key for key in self._pending_keys if self.ids_by_key[key] in plant_ids]
+        for key in dropped: self._pending_keys.remove(key); self.ids_by_key.pop(key)
+        return len(dropped)
+
+    def commit(self):
+        self.created.extend(self.ids_by_key[key] for key in self._pending_keys)
+        self._pending_keys = []; self._committed_next_id = self.next_id
+
+    def rollback(self):
+        for key in self._pending_keys: self.ids_by_key.pop(key, None)
+        self._pending_keys = []; self.next_id = self._committed_next_id
 
-    try:
-        pass1_cursor = cnx.cursor()
-        # [REFINED v8] Updated SQL to insert MW and NULLs for other fields
-        sql_region = """INSERT INTO REGION_DETAILS (
-                            State_Code, Report_Date, Monitored_Capacity_MW,
-                            Generated_MU, Imported_MU, Surplus_MU, Demand_MU, Grid_Frequency_HZ
-                        ) VALUES (%s, %s, %s, NULL, NULL, NULL, NULL, NULL)
-                        ON DUPLICATE KEY UPDATE Monitored_Capacity_MW=VALUES(Monitored_Capacity_MW)"""
-
-        current_state_code_pass1 = None # Persistent context for this pass
-        region_data_found = {} # {state_code: capacity_MW}
-
-        for r in range(len(df)):
-            row_vals = [sanitize_string(df.iat[r, c]) if c < df.shape[1] else '' for c in range(df.shape[1])]
-            combined = " ".join([x.upper() for x in row_vals if x])
-            if combined.strip() == '': continue
-
-            # Detect State Header - Update persistent context
-            is_state_header = False
-            state_code_in_row = None
-            for name, code in STATE_MAP.items():
-                pattern = r'\b' + re.escape(name).replace('AND', '(?:AND|&)') + r'\b' # Flexible & vs AND
-                if re.search(pattern, combined):
-                    state_code_in_row = code # Note mention
-                    non_empty_cells = sum(1 for x in row_vals if x)
-                    name_in_first_cols = any(name in (row_vals[c].upper() if c<len(row_vals) else '') for c in range(3))
-                    # Header: Name prominent, few other entries
-                    if name_in_first_cols and non_empty_cells < 8:
-                         current_state_code_pass1 = code # Update main context for Pass 1
-                         is_state_header = True
-                         # Reduced verbosity
-                         # if DEBUG: print(f"[PASS 1 CTX] Row {r}: State Context -> {name} ({current_state_code_pass1})")
-                         break # Found definitive state header
-
-            if is_state_header: continue # Skip the header row itself
-
-            # Detect STATE TOTAL / REGION TOTAL row
-            if re.search(r'\b(STATE|REGION)\s*TOTAL\b', combined):
-                monitored_val = safe_float(df.iat[r, monitored_col_idx]) if monitored_col_idx is not None else None
-                if monitored_val is None:
-                    numbers = [safe_float(v) for v in row_vals if safe_float(v) is not None]
-                    monitored_val = max(numbers) if numbers else None
-                # [REFINED v8] Store MW value directly
-                monitored_mw = monitored_val
-
-                # Use the persistent context from this pass
-                state_code_to_use = current_state_code_pass1
-                # Fallback: if context missing, check if state was mentioned in *this* total row
-                if not state_code_to_use and state_code_in_row:
-                    state_code_to_use = state_code_in_row
-                    # if DEBUG: print(f"[PASS 1 WARN] Row {r}: Using state '{state_code_to_use}' from TOTAL row.")
+# ---------------------------
+# BUFFERED UPSERT WRITER
+# ---------------------------
+# [REFINED v8] REGION_DETAILS gets MW and NULLs for other fields
+SQL_REGION = """INSERT INTO REGION_DETAILS (
+                    State_Code, Report_Date, Monitored_Capacity_MW,
+                    Generated_MU, Imported_MU, Surplus_MU, Demand_MU, Grid_Frequency_HZ
+                ) VALUES (%s, %s, %s, NULL, NULL, NULL, NULL, NULL)
+                ON DUPLICATE KEY UPDATE Monitored_Capacity_MW=VALUES(Monitored_Capacity_MW)"""
+SQL_PLANT = """INSERT INTO POWERPLANTS (Plant_ID, Plant_Name, State_Code, Sector_ID, Type_ID) VALUES (%s, %s, %s, %s, %s) ON DUPLICATE KEY UPDATE Plant_Name=VALUES(Plant_Name), State_Code=VALUES(State_Code), Sector_ID=VALUES(Sector_ID), Type_ID=VALUES(Type_ID)"""
+SQL_PROD = """INSERT INTO PRODUCTIONLOG (Plant_ID, Log_Date, Operational_Capacity_MW, Todays_Actual_MU, Capable_Generation_MU, Coal_Stock_Days, Efficiency_Percentage) VALUES (%s, %s, %s, %s, %s, %s, NULL) ON DUPLICATE KEY UPDATE Operational_Capacity_MW=VALUES(Operational_Capacity_MW), Todays_Actual_MU=VALUES(Todays_Actual_MU), Capable_Generation_MU=VALUES(Capable_Generation_MU), Coal_Stock_Days=VALUES(Coal_Stock_Days), Efficiency_Percentage=VALUES(Efficiency_Percentage)"""
+SQL_OP = """INSERT INTO OPERATIONAL_STATUS (Plant_ID, Unit_Number, Status_Date, Cap_Under_Outage_MW, Status, Expected_Sync_Date, Remarks, Outage_Date) VALUES (%s, %s, %s, %s, %s, %s, %s, %s) ON DUPLICATE KEY UPDATE Cap_Under_Outage_MW=VALUES(Cap_Under_Outage_MW), Status=VALUES(Status), Expected_Sync_Date=VALUES(Expected_Sync_Date), Remarks=VALUES(Remarks), Outage_Date=VALUES(Outage_Date)"""
+
+# Flush order matters: PRODUCTIONLOG / OPERATIONAL_STATUS reference POWERPLANTS
+UPSERT_SQL = {
+    'REGION_DETAILS': SQL_REGION,
+    'POWERPLANTS': SQL_PLANT,
+    'PRODUCTIONLOG': SQL_PROD,
+    'OPERATIONAL_STATUS': SQL_OP,
+}
 
-                # Reduced verbosity
-                # if DEBUG: print(f"[PASS 1 DEBUG] Row {r}: Found TOTAL. Context State={state_code_to_use}. MW={monitored_mw}.")
-                if state_code_to_use:
-                    region_data_found[state_code_to_use] = monitored_mw # Store MW
-                # elif DEBUG: print(f"[PASS 1 WARN] Row {r}: Found TOTAL row but no state context!")
+# Staging specs for --bulk-load: same columns and refreshed columns as the statements above,
+# in merge order (plants before the rows that reference them)
+BULK_TABLES = {
+    'POWERPLANTS': StagedTable('POWERPLANTS', ['Plant_ID', 'Plant_Name', 'State_Code', 'Sector_ID', 'Type_ID'],
+                               ['Plant_Name', 'State_Code', 'Sector_ID', 'Type_ID']),
+    'REGION_DETAILS': StagedTable('REGION_DETAILS', ['State_Code', 'Report_Date', 'Monitored_Capacity_MW'],
+                                  ['Monitored_Capacity_MW']),
+    'PRODUCTIONLOG': StagedTable('PRODUCTIONLOG', ['Plant_ID', 'Log_Date', 'Operational_Capacity_MW', 'Todays_Actual_MU', 'Capable_Generation_MU', 'Coal_Stock_Days'],
+                                 ['Operational_Capacity_MW', 'Todays_Actual_MU', 'Capable_Generation_MU', 'Coal_Stock_Days', 'Efficiency_Percentage']),
+    'OPERATIONAL_STATUS': StagedTable('OPERATIONAL_STATUS', ['Plant_ID', 'Unit_Number', 'Status_Date', 'Cap_Under_Outage_MW', 'Status', 'Expected_Sync_Date', 'Remarks', 'Outage_Date'],
+                                      ['Cap_Under_Outage_MW', 'Status', 'Expected_Sync_Date', 'Remarks', 'Outage_Date']),
+}
 
-        # Insert collected/missing region data
-        for state_code in sorted(list(all_state_codes)): # Insert in predictable order
-            mw_value = region_data_found.get(state_code, None) # Get MW value or None
+class BatchUpsertWriter:
+    """Buffers rows per table and writes them with executemany() in batches of batch_size.
+
+    mysql.connector rewrites an executemany() INSERT into one multi-row INSERT ... ON DUPLICATE
+    KEY UPDATE, so a batch costs one round trip. A failed batch is retried row by row so every
+    bad row is still reported (and the good ones still written); failed_rows keeps their params.
+    """
+    def __init__(self, cnx, batch_size=BATCH_SIZE, label='DB'):
+        self.cnx = cnx; self.batch_size = max(1, int(batch_size)); self.label = label
+        self.buffers = {table: [] for table in UPSERT_SQL}
+        self.written = {table: 0 for table in UPSERT_SQL}
+        self.failed = {table: 0 for table in UPSERT_SQL}
+        self.failed_rows = {table: [] for table in UPSERT_SQL}
+
+    def add(self, table, params, desc=''):
+        self.buffers[table].append((tuple(params), desc))
+        if len(self.buffers[table]) >= self.batch_size: self.flush()
+
+    def pending(self):
+        return sum(len(rows) for rows in self.buffers.values())
+
+    def flush(self):
+        if not self.pending(): return
+        cursor = self.cnx.cursor()
+        try:
+            for table, sql in UPSERT_SQL.items():
+                rows = self.buffers[table]; self.buffers[table] = []
+                for i in range(0, len(rows), self.batch_size):
+                    self._write_batch(cursor, table, sql, rows[i:i + self.batch_size])
+        finally:
+            try: cursor.close()
+            except Exception: pass
+
+    def discard(self):
+        self.buffers = {table: [] for table in UPSERT_SQL}
+
+    def _write_batch(self, cursor, table, sql, batch):
+        try:
+            cursor.executemany(sql, [params for params, _ in batch])
+            self.written[table] += len(batch)
+            return
+        except Exception as batch_err:
+            if DEBUG: print(f"[{self.label} WARN] {table} batch of {len(batch)} rows failed ({batch_err}); retrying row by row.")
+        for params, desc in batch:
             try:
-                # [REFINED v8] Insert MW value
-                pass1_cursor.execute(sql_region, (state_code, report_iso, mw_value))
-                inserted_count += 1
-                # Reduced verbosity
-                # if DEBUG and (mw_value is not None or state_code == 'CTG'):
-                #      print(f"[PASS 1 INSERT] REGION_DETAILS: State={state_code}, MW={mw_value}")
-            except mysql.connector.Error as err:
-                 print(f"[DB ERROR - PASS 1] REGION_DETAILS insert failed for State={state_code}: {err}")
+                cursor.execute(sql, params)
+                self.written[table] += 1
             except Exception as e:
-                 print(f"[ERROR - PASS 1] REGION insert for State={state_code}: {e}")
-
-        cnx.commit()
-        if DEBUG: print(f"--- Pass 1 Complete ({report_iso}): Committed {inserted_count} REGION_DETAILS ---")
+                self.failed[table] += 1; self.failed_rows[table].append(params)
+                print(f"[DB ERROR - {self.label}] {table} upsert failed for {desc}: {e}")
 
-    except Exception as e:
-        print(f"[ERROR - PASS 1] ({report_iso}) Error: {e}")
-        if cnx.is_connected(): cnx.rollback() # Rollback on error
-    finally:
-        if pass1_cursor:
-             try: pass1_cursor.close()
-             except: pass # Ignore close errors
+# ---------------------------
+# ROW CLASSIFICATION (vectorized, shared by Pass 1 and Pass 2)
+# ---------------------------
+def sanitize_frame(df):
+    """sanitize_string() applied to every cell, column by column."""
+    cells = df.where(df.notna(), '').astype(str).astype(object)
+    return cells.apply(lambda col: col.str.strip())
+
+def safe_float_series(col):
+    """Column version of safe_float() on sanitized strings; NaN where safe_float gives None."""
+    s_clean = col.str.replace(',', '', regex=False).str.replace(r'[^\d\.\-]', '', regex=True)
+    return pd.to_numeric(s_clean, errors='coerce')
+
+def _sector_fallback_key(cand):
+    cand = cand.strip()
+    return next((k for k in SECTOR_MAP if k in cand or cand in k), None)
+
+def classify_rows(df, plant_col=None, monitored_col=None):
+    """Classifies every row of a DGR sheet in one columnar pass.
+
+    Returns a DataFrame aligned with df rows: the joined upper-case row text, the
+    state header (if the row is one), the last state mentioned in the row, sector /
+    type header ids, the STATE/REGION TOTAL flag and a row 'kind' (ROW_* constants).
+    Plant/unit kinds need plant_col and monitored_col; without them such rows are ROW_OTHER.
+    """
+    n_rows, n_cols = df.shape
+    cells = sanitize_frame(df)
+    upper = cells.apply(lambda col: col.str.upper())
+    non_empty = (cells != '').to_numpy().sum(axis=1) if n_cols else np.zeros(n_rows, dtype=int)
+    is_blank = non_empty == 0
+
+    # " ".join(non-empty cells); \x1f is whitespace to str.strip() so no stripped cell starts or ends with it
+    joined = pd.Series('', index=df.index, dtype=object)
+    for c in range(n_cols): joined = joined + '\x1f' + upper.iloc[:, c]
+    combined = joined.str.strip('\x1f').str.replace('\x1f+', ' ', regex=True)
+
+    # --- State / sector / type keywords: one scan per row ---
+    keyword_hits = combined.map(ROW_KEYWORDS.scan)
+    first_sector = keyword_hits.map(lambda hits: hits['sector'][0] if 'sector' in hits else None)
+    first_type = keyword_hits.map(lambda hits: hits['type'][0] if 'type' in hits else None)
+
+    # --- State header / state mention ---
+    names = [name for name, _, _ in STATE_PATTERNS]
+    codes = np.array([code for _, code, _ in STATE_PATTERNS], dtype=object)
+    state_pos = {name: i for i, name in enumerate(names)}
+    state_hits = np.zeros((n_rows, len(names)), dtype=bool)
+    for r, hits in enumerate(keyword_hits):
+        for name in hits.get('state', ()): state_hits[r, state_pos[name]] = True
+    # Header: Name prominent, few other entries; first qualifying name in STATE_MAP order wins
+    header_hits = state_hits & (non_empty < 8)[:, None]
+    candidates = np.flatnonzero(header_hits.any(axis=1))
+    if len(candidates) and n_cols:
+        first_cols = upper.iloc[candidates, :min(3, n_cols)]
+        in_first_cols = np.column_stack([
+            np.logical_or.reduce([first_cols.iloc[:, c].str.contains(name, regex=False).to_numpy(dtype=bool) for c in range(first_cols.shape[1])])
+            for name in names])
+        header_hits[candidates] &= in_first_cols
+    else:
+        header_hits[:] = False
+    is_state_header = header_hits.any(axis=1)
+    header_idx = header_hits.argmax(axis=1)
+    # The old per-row loop kept overwriting the mention until it broke on a header
+    last_checked = np.where(is_state_header, header_idx, len(names) - 1)
+    mentioned = state_hits & (np.arange(len(names))[None, :] <= last_checked[:, None])
+    has_mention = mentioned.any(axis=1)
+    mention_idx = len(names) - 1 - mentioned[:, ::-1].argmax(axis=1)
+
+    # --- Sector / Type headers ---
+    sector_key = first_sector.astype(object)
+    no_direct = sector_key.isna().to_numpy() & ~is_blank
+    if no_direct.any():
+        cands = combined[no_direct].str.extract(SECTOR_FALLBACK_REGEX.pattern, expand=False).dropna()
+        if len(cands):
+            fallback_map = {cand: _sector_fallback_key(cand) for cand in cands.unique()}
+            sector_key.loc[cands.index] = cands.map(fallback_map)
+    sector_id = sector_key.map(SECTOR_MAP)
+    has_sector = sector_id.notna().to_numpy()
+
+    has_type = first_type.notna().to_numpy()
+    type_id = first_type.map(TYPE_MAP).to_numpy(dtype=object)
+
+    is_total = combined.str.contains(TOTAL_ROW_REGEX.pattern, regex=True).to_numpy(dtype=bool)
+
+    conditions = [is_blank, is_state_header, has_sector, has_type, is_total]
+    kinds = [ROW_BLANK, ROW_STATE_HEADER, ROW_SECTOR_HEADER, ROW_TYPE_HEADER, ROW_TOTAL]
+
+    # --- Plant / Unit rows ---
+    plant_cell = pd.Series('', index=df.index, dtype=object)
+    unit_source = pd.Series(None, index=df.index, dtype=object)
+    if plant_col is not None:
+        if plant_col < n_cols: plant_cell = cells.iloc[:, plant_col]
+        plant_up = plant_cell.str.upper()
+        unit_hits = np.column_stack([upper.iloc[:, c].str.match(UNIT_REGEX.pattern, flags=re.IGNORECASE).to_numpy(dtype=bool) for c in range(n_cols)])
+        plant_is_unit = unit_hits[:, plant_col] if plant_col < n_cols else np.zeros(n_rows, dtype=bool)
+        other_hits = unit_hits.copy()
+        if plant_col < n_cols: other_hits[:, plant_col] = False
+        other_is_unit = other_hits.any(axis=1)
+        other_source = cells.to_numpy()[np.arange(n_rows), other_hits.argmax(axis=1)] if n_cols else np.full(n_rows, None)
+        is_unit = plant_is_unit | other_is_unit
+        unit_source = pd.Series(np.where(plant_is_unit, plant_cell.to_numpy(), np.where(other_is_unit, other_source, None)), index=df.index, dtype=object)
+
+        is_context_keyword = plant_up.isin(CONTEXT_HEADER_KEYWORDS).to_numpy()
+        valid_name = ((plant_cell.str.len() >= 2) & plant_cell.str.contains(r'[a-zA-Z]', regex=True)).to_numpy(dtype=bool)
+        has_monitored = (safe_float_series(cells.iloc[:, monitored_col]).notna().to_numpy()
+                         if monitored_col is not None else np.zeros(n_rows, dtype=bool))
+        conditions += [is_context_keyword, is_unit, valid_name & has_monitored]
+        kinds += [ROW_CONTEXT_KEYWORD, ROW_UNIT, ROW_PLANT]
+
+    def text_col(values):
+        # object dtype with None for "no value", so row fields stay falsy like the old per-row locals
+        col = pd.Series(values, index=df.index, dtype=object)
+        return col.where(col.notna(), None)
+
+    return pd.DataFrame({
+        'kind': text_col(np.select(conditions, kinds, default=ROW_OTHER)),
+        'combined': text_col(combined),
+        'state_header_name': text_col(np.where(is_state_header, np.array(names, dtype=object)[header_idx], None)),
+        'state_header_code': text_col(np.where(is_state_header, codes[header_idx], None)),
+        'state_code_in_row': text_col(np.where(has_mention, codes[mention_idx], None)),
+        'sector_id': text_col(sector_id),
+        'type_id': text_col(type_id),
+        'is_total': is_total,
+        'plant_cell': text_col(plant_cell),
+        'unit_source': text_col(unit_source),
+    }, index=df.index)
 
 # ---------------------------
-# MAIN PROCESSING FUNCTION (for a single file/date) - v11 Logic
+# SINGLE-PASS PARSE (region totals + plants/units from one traversal)
 # ---------------------------
-def process_single_report(df, report_iso_date, db_connection):
-    """Processes plants, units, prod logs, op status for a given DataFrame and date."""
-    if DEBUG: print(f"\n--- Starting Pass 2: Plant/Unit Data for {report_iso_date} ---")
-    cursor = None
-    plants_inserted_updated = 0; prodlog_inserted_updated = 0; opstatus_inserted_updated = 0
-    try:
-        cursor = db_connection.cursor()
-
-        # --- Header Detection ---
-        keywords = {
-            'MONITORED': ['MONITORED CAP', 'MONITORED\nCAP'], 'TODAYS_PROGRAM': ["TODAY'S\nPROGRAM", "TODAY'S PROGRAM"],
-            'TODAYS_ACTUAL': ["TODAY'S\nACTUAL", "TODAY'S ACTUAL"], 'COAL_STOCK': ['COAL STOCK\nIN DAYS', 'COAL STOCK IN DAYS'],
-            'UNDER_OUTAGE': ['CAP. UNDER\nOUTAGE', 'CAP. UNDER OUTAGE'], 'OUTAGE_DATE': ['OUTAGE DATE'],
-            'EXPECTED_SYNC': ['EXPECTED DATE', 'SYNC. DATE', 'EXPECTED DATE /'], 'REMARKS': ['REMARKS']
-        }
-        found = find_header_columns_by_text(df, keywords, 14)
-
-        # --- Fallback & Plant Column Detection ---
-        fallback_needed=False; essential_cols=['MONITORED','TODAYS_PROGRAM','TODAYS_ACTUAL']
-        if any(found.get(k) is None for k in essential_cols): fallback_needed=True
-        if fallback_needed:
-            if DEBUG: print("[DETECT] Headers missing; using numeric fallback.")
-            numeric_counts = {c: sum(1 for r in range(12, min(150, len(df))) if safe_float(df.iat[r, c]) is not None) for c in range(df.shape[1])}
-            sorted_cols = sorted(numeric_counts.items(), key=lambda x: x[1], reverse=True)
-            monitored_guess = next((c for c, cnt in sorted_cols if c != 0 and cnt > 3), sorted_cols[0][0] if sorted_cols else 1)
-            if found.get('MONITORED') is None: found['MONITORED'] = monitored_guess
-            if found.get('TODAYS_PROGRAM') is None: found['TODAYS_PROGRAM'] = monitored_guess + 1 if monitored_guess + 1 < df.shape[1] else None
-            if found.get('TODAYS_ACTUAL') is None: found['TODAYS_ACTUAL'] = monitored_guess + 2 if monitored_guess + 2 < df.shape[1] else None
-            if found.get('COAL_STOCK') is None: found['COAL_STOCK'] = monitored_guess + 5 if monitored_guess + 5 < df.shape[1] else None
-            if found.get('UNDER_OUTAGE') is None: found['UNDER_OUTAGE'] = monitored_guess + 7 if monitored_guess + 7 < df.shape[1] else None
-            if found.get('OUTAGE_DATE') is None: found['OUTAGE_DATE'] = monitored_guess + 8 if monitored_guess + 8 < df.shape[1] else None
-            if found.get('EXPECTED_SYNC') is None: found['EXPECTED_SYNC'] = monitored_guess + 10 if monitored_guess + 10 < df.shape[1] else None
-            if found.get('REMARKS') is None: found['REMARKS'] = monitored_guess + 11 if monitored_guess + 11 < df.shape[1] else None
-        
-        # Reduced verbosity
-        # if DEBUG: print(f"[INFO ({report_iso_date})] Column mapping:", {k:v for k,v in found.items()})
-        if any(found.get(k) is None for k in ['MONITORED']):
-             print(f"[ERROR ({report_iso_date})] MONITORED column not found! Skipping Pass 2.")
-             return
-
-        start_scan=10; string_score={c: sum(1 for r in range(start_scan, min(len(df),start_scan+150)) if isinstance(df.iat[r,c], str) and re.search(r'[a-zA-Z]',df.iat[r,c]) and len(df.iat[r,c]) > 2) for c in range(df.shape[1])}
-        sorted_scores = sorted(string_score.items(), key=lambda x: x[1], reverse=True)
-        if sorted_scores and sorted_scores[0][0] == 0 and sorted_scores[0][1] > 10: plant_col = 0
-        else: best_plant_col=next((c for c, score in sorted_scores if c in [0,1]), -1); plant_col = best_plant_col if best_plant_col != -1 else next((c for c, score in sorted_scores if c > 2 and score > 0), 0)
-        # if DEBUG: print(f"[DETECT ({report_iso_date})] Chosen plant_col = {plant_col}") # Reduced verbosity
-
-        # --- SQL Templates ---
-        sql_plant = """INSERT INTO POWERPLANTS (Plant_ID, Plant_Name, State_Code, Sector_ID, Type_ID) VALUES (%s, %s, %s, %s, %s) ON DUPLICATE KEY UPDATE Plant_Name=VALUES(Plant_Name), State_Code=VALUES(State_Code), Sector_ID=VALUES(Sector_ID), Type_ID=VALUES(Type_ID)"""
-        sql_prod = """INSERT INTO PRODUCTIONLOG (Plant_ID, Log_Date, Operational_Capacity_MW, Todays_Actual_MU, Capable_Generation_MU, Coal_Stock_Days, Efficiency_Percentage) VALUES (%s, %s, %s, %s, %s, %s, NULL) ON DUPLICATE KEY UPDATE Operational_Capacity_MW=VALUES(Operational_Capacity_MW), Todays_Actual_MU=VALUES(Todays_Actual_MU), Capable_Generation_MU=VALUES(Capable_Generation_MU), Coal_Stock_Days=VALUES(Coal_Stock_Days), Efficiency_Percentage=VALUES(Efficiency_Percentage)"""
-        sql_op = """INSERT INTO OPERATIONAL_STATUS (Plant_ID, Unit_Number, Status_Date, Cap_Under_Outage_MW, Status, Expected_Sync_Date, Remarks, Outage_Date) VALUES (%s, %s, %s, %s, %s, %s, %s, %s) ON DUPLICATE KEY UPDATE Cap_Under_Outage_MW=VALUES(Cap_Under_Outage_MW), Status=VALUES(Status), Expected_Sync_Date=VALUES(Expected_Sync_Date), Remarks=VALUES(Remarks), Outage_Date=VALUES(Outage_Date)"""
-
-        # --- State machine variables ---
-        current_state_name = None; current_state_code = None
-        current_sector_id = None; current_type_id = None
-        current_plant_id = None
-        
-        # Get starting plant counter
-        plant_counter = 1; temp_id_cursor = None
+# Records yielded by iter_report_records(); plain tuples so worker processes can pickle them
+RegionRecord = namedtuple('RegionRecord', 'state_code monitored_mw') # One STATE/REGION TOTAL row
+# prod: (opcap, actual, program, coal); statuses: [(unit, outage_mw, status, expected, remarks, outage_date), ...]
+PlantRecord = namedtuple('PlantRecord', 'name state sector type prod statuses')
+
+def detect_report_columns(df, report_iso_date=None):
+    """Finds the data columns (header text, numeric fallback) and the plant name column.
+    Returns (found, plant_col); plant_col is None when the MONITORED column is missing."""
+    return _detect_report_columns(df, report_iso_date)[:2]
+
+def _detect_report_columns(df, report_iso_date=None):
+    """detect_report_columns() plus the numeric fallback's MONITORED guess (None if unused)."""
+    # --- Header Detection ---
+    keywords = {
+        'MONITORED': ['MONITORED CAP', 'MONITORED\nCAP'], 'TODAYS_PROGRAM': ["TODAY'S\nPROGRAM", "TODAY'S PROGRAM"],
+        'TODAYS_ACTUAL': ["TODAY'S\nACTUAL", "TODAY'S ACTUAL"], 'COAL_STOCK': ['COAL STOCK\nIN DAYS', 'COAL STOCK IN DAYS'],
+        'UNDER_OUTAGE': ['CAP. UNDER\nOUTAGE', 'CAP. UNDER OUTAGE'], 'OUTAGE_DATE': ['OUTAGE DATE'],
+        'EXPECTED_SYNC': ['EXPECTED DATE', 'SYNC. DATE', 'EXPECTED DATE /'], 'REMARKS': ['REMARKS']
+    }
+    found = find_header_columns_by_text(df, keywords, 14)
+
+    # --- Fallback & Plant Column Detection ---
+    fallback_needed=False; essential_cols=['MONITORED','TODAYS_PROGRAM','TODAYS_ACTUAL']; monitored_guess=None
+    if any(found.get(k) is None for k in essential_cols): fallback_needed=True
+    if fallback_needed:
+        if DEBUG: print("[DETECT] Headers missing; using numeric fallback.")
+        monitored_guess = guess_monitored_col(df)
+        if found.get('MONITORED') is None: found['MONITORED'] = monitored_guess
+        if found.get('TODAYS_PROGRAM') is None: found['TODAYS_PROGRAM'] = monitored_guess + 1 if monitored_guess + 1 < df.shape[1] else None
+        if found.get('TODAYS_ACTUAL') is None: found['TODAYS_ACTUAL'] = monitored_guess + 2 if monitored_guess + 2 < df.shape[1] else None
+        if found.get('COAL_STOCK') is None: found['COAL_STOCK'] = monitored_guess + 5 if monitored_guess + 5 < df.shape[1] else None
+        if found.get('UNDER_OUTAGE') is None: found['UNDER_OUTAGE'] = monitored_guess + 7 if monitored_guess + 7 < df.shape[1] else None
+        if found.get('OUTAGE_DATE') is None: found['OUTAGE_DATE'] = monitored_guess + 8 if monitored_guess + 8 < df.shape[1] else None
+        if found.get('EXPECTED_SYNC') is None: found['EXPECTED_SYNC'] = monitored_guess + 10 if monitored_guess + 10 < df.shape[1] else None
+        if found.get('REMARKS') is None: found['REMARKS'] = monitored_guess + 11 if monitored_guess + 11 < df.shape[1] else None
+
+    # Reduced verbosity
+    # if DEBUG: print(f"[INFO ({report_iso_date})] Column mapping:", {k:v for k,v in found.items()})
+    if any(found.get(k) is None for k in ['MONITORED']):
+         print(f"[ERROR ({report_iso_date})] MONITORED column not found! Skipping Pass 2.")
+         return found, None, monitored_guess
+
+    plant_col = guess_plant_col(df)
+    # if DEBUG: print(f"[DETECT ({report_iso_date})] Chosen plant_col = {plant_col}") # Reduced verbosity
+    return found, plant_col, monitored_guess
+
+_is_number_cell = np.frompyfunc(lambda v: safe_float(v) is not None, 1, 1)
+_is_name_cell = np.frompyfunc(lambda v: isinstance(v, str) and len(v) > 2 and re.search(r'[a-zA-Z]', v) is not None, 1, 1)
+
+def column_counts(df, start, stop, is_cell):
+    """Per column, how many of the data rows [start, stop) satisfy is_cell."""
+    window = df.iloc[start:stop].to_numpy(dtype=object)
+    return is_cell(window).astype(int).sum(axis=0) if window.size else np.zeros(df.shape[1], dtype=int)
+
+def guess_monitored_col(df):
+    """Numeric fallback: the non-first column with the most numbers in the data rows."""
+    sorted_cols = sorted(enumerate(column_counts(df, 12, 150, _is_number_cell)), key=lambda x: x[1], reverse=True)
+    return int(next((c for c, cnt in sorted_cols if c != 0 and cnt > 3), sorted_cols[0][0] if sorted_cols else 1))
+
+def guess_plant_col(df, start_scan=10):
+    """The column with the most name-like strings in the data rows (preferring columns 0 / 1)."""
+    sorted_scores = sorted(enumerate(column_counts(df, start_scan, start_scan + 150, _is_name_cell)), key=lambda x: x[1], reverse=True)
+    if sorted_scores and sorted_scores[0][0] == 0 and sorted_scores[0][1] > 10: return 0
+    best_plant_col = next((c for c, score in sorted_scores if c in [0,1]), -1)
+    return int(best_plant_col if best_plant_col != -1 else next((c for c, score in sorted_scores if c > 2 and score > 0), 0))
+
+def layout_fingerprint(df, rows=LAYOUT_ROWS):
+    """Hash of the column count and the top rows' cell text with digits masked, so the report
+    date and daily values in the title/header area do not change the fingerprint."""
+    h = hashlib.sha256(f"layout-v{LAYOUT_CACHE_VERSION}:{df.shape[1]}".encode())
+    for r in range(min(rows, len(df))):
+        h.update(('\x1e' + '\x1f'.join(re.sub(r'\d+', '#', sanitize_string(v).upper()) for v in df.iloc[r])).encode())
+    return h.hexdigest()
+
+def detect_report_columns_cached(df, report_iso_date=None, use_cache=USE_CACHE, cache_dir=CACHE_DIR):
+    """detect_report_columns() memoized per layout fingerprint in cache_dir, so only new layouts
+    pay for header detection. The fingerprint only covers the header rows, so the plant column and
+    the numeric fallback (both read from data rows) are re-checked against df on every hit; a
+    mismatch (same header, shifted data) re-detects. Cache problems only cost detection."""
+    if not use_cache: return detect_report_columns(df, report_iso_date)
+    cache_path = os.path.join(cache_dir, f"layout-{layout_fingerprint(df)}.json")
+    if os.path.exists(cache_path):
         try:
-            temp_id_cursor = db_connection.cursor()
-            temp_id_cursor.execute("SELECT MAX(CAST(Plant_ID AS UNSIGNED)) FROM POWERPLANTS")
-            max_id_result = temp_id_cursor.fetchone()
-            plant_counter = (max_id_result[0] if max_id_result[0] else 0) + 1
+            with open(cache_path, encoding='utf-8') as fh: entry = json.load(fh)
+            os.utime(cache_path) # Mark as recently used for age-based eviction
+            if ((entry['monitored_guess'] is None or entry['monitored_guess'] == guess_monitored_col(df))
+                    and (entry['plant_col'] is None or entry['plant_col'] == guess_plant_col(df))):
+                return entry['found'], entry['plant_col']
+            if DEBUG: print(f"[CACHE] Data columns moved for {report_iso_date}; detecting columns.")
+        except (OSError, ValueError, KeyError) as e:
+            if DEBUG: print(f"[CACHE WARN] Unreadable layout entry ({e}); detecting columns.")
+
+    found, plant_col, monitored_guess = _detect_report_columns(df, report_iso_date)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as fh: json.dump({'found': found, 'plant_col': plant_col, 'monitored_guess': monitored_guess}, fh)
+        os.replace(tmp_path, cache_path) # Atomic: parallel workers never see partial files
+        if DEBUG: print(f"[CACHE] New layout for {report_iso_date}: {os.path.basename(cache_path)}")
+    except (OSError, TypeError) as e:
+        if DEBUG: print(f"[CACHE WARN] Could not cache layout: {e}")
+    return found, plant_col
+
+def iter_report_records(df, report_iso_date=None, columns=None, region_monitored_col=None):
+    """Walks the sheet once and yields RegionRecord / PlantRecord values in sheet order; no DB access.
+
+    State context is tracked once for both record kinds. A PlantRecord is yielded when its unit rows
+    are complete (next plant, next state header or end of sheet). columns: detect_report_columns()
+    result, computed here if not given; without a plant column only RegionRecords are produced.
+    region_monitored_col: column read for TOTAL rows (None = largest number in the row, as Pass 1 did).
+    """
+    found, plant_col = columns if columns is not None else detect_report_columns(df, report_iso_date)
+
+    # --- State machine variables ---
+    current_state_name = None; current_state_code = None
+    current_sector_id = None; current_type_id = None
+    current_plant = None # Record of the last plant row; unit rows attach to it
+
+    # Row kinds come from one columnar pass; only rows that change context or carry data are visited
+    rows = classify_rows(df, plant_col=plant_col, monitored_col=found.get('MONITORED') if plant_col is not None else None)
+    relevant = (rows['kind'].isin([ROW_STATE_HEADER, ROW_SECTOR_HEADER, ROW_TYPE_HEADER, ROW_UNIT, ROW_PLANT]) | rows['is_total']).to_numpy()
+    for r, row in zip(np.flatnonzero(relevant), rows[relevant].itertuples(index=False)):
+        # --- Context Detection ---
+        if row.kind == ROW_STATE_HEADER:
+            if current_plant is not None: yield current_plant
+            current_state_name = row.state_header_name; current_state_code = row.state_header_code
+            current_sector_id, current_type_id, current_plant = None, None, None
             # Reduced verbosity
-            # if DEBUG: print(f"[DB INFO ({report_iso_date})] Starting plant counter at {plant_counter}")
-        except Exception as e: print(f"[DB ERROR ({report_iso_date})] Could not get max Plant_ID: {e}. Starting counter at 1.")
-        finally:
-             if temp_id_cursor: temp_id_cursor.close()
-
-        # --- Row Loop for Pass 2 ---
-        rows = len(df)
-        for r in range(rows):
-            row_vals = [sanitize_string(df.iat[r, c]) if c < df.shape[1] else '' for c in range(df.shape[1])]
-            combined = " ".join([x.upper() for x in row_vals if x])
-            if combined.strip() == '': continue
-
-            # --- Context Detection ---
-            is_context_row = False; state_code_in_row = None
-            # State Header
-            matched_state = None
-            for name, code in STATE_MAP.items():
-                pattern = r'\b' + re.escape(name).replace('AND', '(?:AND|&)') + r'\b'
-                if re.search(pattern, combined):
-                    state_code_in_row = code
-                    non_empty_cells = sum(1 for x in row_vals if x)
-                    name_in_first_cols = any(name in (row_vals[c].upper() if c<len(row_vals) else '') for c in range(3))
-                    if name_in_first_cols and non_empty_cells < 8:
-                         current_state_name = name; current_state_code = code
-                         current_sector_id, current_type_id, current_plant_id = None, None, None
-                         is_context_row = True
-                         # Reduced verbosity
-                         # if DEBUG: print(f"\n[PASS 2 CTX] Row {r}: State -> {current_state_name} ({current_state_code})")
-                         break
-            # Sector Header
-            if not is_context_row:
-                matched_sector_key = next((k for k in SECTOR_MAP if k in combined), None)
-                if not matched_sector_key:
-                     m_sector = re.search(r'SECTOR[:\s]*([A-Z \.]{2,30})', combined)
-                     if m_sector: cand=m_sector.group(1).strip(); matched_sector_key=next((k for k in SECTOR_MAP if k in cand or cand in k), None)
-                if matched_sector_key: current_sector_id = SECTOR_MAP[matched_sector_key]; is_context_row = True
-                # if DEBUG and is_context_row: print(f"[PASS 2 CTX] Row {r}: Sector -> {current_sector_id}")
-            # Type Header
-            if not is_context_row:
-                matched_type_key = next((k for k in TYPE_MAP if k in combined), None)
-                if matched_type_key: current_type_id = TYPE_MAP[matched_type_key]; is_context_row = True
-                # if DEBUG and is_context_row: print(f"[PASS 2 CTX] Row {r}: Type -> {current_type_id}")
-
-            if is_context_row: continue
-            if re.search(r'\b(STATE|REGION)\s*TOTAL\b', combined): continue
-
-            # --- Unit or Plant Logic ---
-            plant_cell = sanitize_string(df.iat[r, plant_col]) if plant_col < df.shape[1] else ''
-            plant_cell_up = plant_cell.upper()
-
-            if plant_cell_up in CONTEXT_HEADER_KEYWORDS: continue
-
-            is_unit = bool(UNIT_REGEX.match(plant_cell_up))
-            unit_name_source = plant_cell # Original string like "Unit,1"
-            unit_number_to_insert = 'N/A' # Default
-
-            if not is_unit: # Check other columns
-                for c in range(df.shape[1]):
-                    if c == plant_col: continue
-                    v = sanitize_string(df.iat[r, c])
-                    if UNIT_REGEX.match(v.upper()): is_unit = True; unit_name_source = v; break
-
-            # [REFINED v11] Extract number if it's a unit
-            if is_unit:
-                num_match = UNIT_NUMBER_EXTRACT_REGEX.search(unit_name_source)
-                if num_match:
-                    unit_number_to_insert = num_match.group(0) # e.g., '1', '6'
-                # else: unit_number_to_insert remains 'N/A'
-
-            # Process Unit Row (Conditional Insert for OS)
-            if is_unit:
-                if current_plant_id:
-                    outage_mw = safe_float(df.iat[r, found.get('UNDER_OUTAGE')]) if found.get('UNDER_OUTAGE') is not None else None
-                    expected_raw = df.iat[r, found.get('EXPECTED_SYNC')] if found.get('EXPECTED_SYNC') is not None else None
-                    remarks_raw = df.iat[r, found.get('REMARKS')] if found.get('REMARKS') is not None else None
-                    outage_date_raw = df.iat[r, found.get('OUTAGE_DATE')] if found.get('OUTAGE_DATE') is not None else None
-
-                    expected_iso = parse_date_like(expected_raw)
-                    outage_date_iso = parse_date_like(outage_date_raw)
-                    remarks_clean = sanitize_string(remarks_raw)
-                    outage_mw_to_insert = outage_mw # Always insert reported value
-
-                    # [REFINED v11] Specific status logic
-                    status_val_db = 'Active' # Default
-                    insert_os_record = False # Flag to decide insertion
-
-                    if remarks_clean and outage_date_iso:
-                        status_val_db = 'Under Outage'
-                        insert_os_record = True
-                    elif remarks_clean and not outage_date_iso:
-                        status_val_db = 'Not Commisioned' # Only remarks
-                        insert_os_record = True
-                    elif not remarks_clean and outage_date_iso:
-                        status_val_db = 'Active' # Only date means Active
-                        insert_os_record = True
-                    # else: (no remarks, no outage date) -> Active, insert_os_record = False
-
-                    # Insert status only if needed based on flags
-                    if insert_os_record:
-                        try:
-                            cursor.execute(sql_op, (
-                                current_plant_id, unit_number_to_insert, report_iso_date,
-                                outage_mw_to_insert, status_val_db,
-                                expected_iso, remarks_clean,
-                                outage_date_iso
-                            ))
-                            opstatus_inserted_updated += 1
-                            # Reduced verbosity
-                            # if DEBUG: print(f"[PASS 2 INSERT] OP_STATUS (unit) plant={current_plant_id} unit='{unit_number_to_insert}' status='{status_val_db}'")
-                        except Exception as e: print(f"[DB ERROR - PASS 2] OP_STATUS unit insert failed: {e}")
-                    # else: # Implicitly Active - Do not insert
-                    #     if DEBUG: print(f"[PASS 2 SKIP] OP_STATUS (unit) '{unit_name_source}' - Active, no outage details.")
-
-                # Reduced verbosity
-                # elif DEBUG: print(f"[PASS 2 SKIP] Row {r}: Unit '{unit_name_source}' no current_plant_id.")
-                continue # Always skip unit rows from plant logic
-
-            # Process Potential Plant Row
-            monitored_val = safe_float(df.iat[r, found.get('MONITORED')]) if found.get('MONITORED') is not None else None
-            is_valid_plant_name = bool(plant_cell) and len(plant_cell) >= 2 and re.search(r'[a-zA-Z]', plant_cell)
-            is_potential_plant = is_valid_plant_name and (monitored_val is not None)
-
-            if is_potential_plant:
-                plant_name = plant_cell
-                state_code_to_use = current_state_code
-                if not state_code_to_use:
-                     if state_code_in_row: state_code_to_use = state_code_in_row
-                     # Reduced verbosity
-                     # if DEBUG: print(f"[PASS 2 WARN] Row {r}: Using state '{state_code_to_use}' for plant '{plant_name}'")
-
-                # Look up existing plant ID or generate new
-                plant_id_to_use = None; temp_find_cursor = None; existing_plant = None
-                try:
-                    temp_find_cursor = db_connection.cursor(dictionary=True)
-                    temp_find_cursor.execute("SELECT Plant_ID FROM POWERPLANTS WHERE Plant_Name = %s AND State_Code = %s", (plant_name, state_code_to_use))
-                    existing_plant = temp_find_cursor.fetchone()
-                    if existing_plant: plant_id_to_use = existing_plant['Plant_ID']
-                    else: plant_id_to_use = str(plant_counter).zfill(3)
-                except Exception as lookup_e: print(f"[DB ERROR - PASS 2] Plant lookup failed: {lookup_e}"); continue
-                finally:
-                    if temp_find_cursor: temp_find_cursor.close()
-
-                # Insert/Update Plant
-                try:
-                    cursor.execute(sql_plant, (plant_id_to_use, plant_name, state_code_to_use, current_sector_id, current_type_id))
-                    if not existing_plant: plant_counter += 1
-                    current_plant_id = plant_id_to_use # Update context
-                    plants_inserted_updated += 1
-                    # Reduced verbosity
-                    # if DEBUG: print(f"[PASS 2 UPSERT] POWERPLANT id={current_plant_id} name='{plant_name[:60]}'")
-                except Exception as e: print(f"[DB ERROR - PASS 2] PLANT upsert failed for '{plant_name}': {e}"); continue
-
-                # Insert Production Log
-                prog_val=safe_float(df.iat[r, found.get('TODAYS_PROGRAM')]) if found.get('TODAYS_PROGRAM') is not None else None
-                actual_val=safe_float(df.iat[r, found.get('TODAYS_ACTUAL')]) if found.get('TODAYS_ACTUAL') is not None else None
-                coal_days=safe_float(df.iat[r, found.get('COAL_STOCK')]) if found.get('COAL_STOCK') is not None else None
-                opcap_mw = monitored_val
-                try:
-                    cursor.execute(sql_prod, (current_plant_id, report_iso_date, opcap_mw, actual_val, prog_val, coal_days))
-                    prodlog_inserted_updated +=1
-                    # Reduced verbosity
-                    # if DEBUG: print(f"[PASS 2 INSERT] PRODLOG plant={current_plant_id} opcap={opcap_mw}")
-                except Exception as e: print(f"[DB ERROR - PASS 2] PRODLOG insert failed: {e}")
-
-                # Insert Main Plant Operational Status (Conditional)
-                main_outage_mw = safe_float(df.iat[r, found.get('UNDER_OUTAGE')]) if found.get('UNDER_OUTAGE') is not None else None
+            # if DEBUG: print(f"\n[CTX] Row {r}: State -> {current_state_name} ({current_state_code})")
+            continue
+
+        # Detect STATE TOTAL / REGION TOTAL row
+        if row.is_total:
+            monitored_val = safe_float(df.iat[r, region_monitored_col]) if region_monitored_col is not None else None
+            if monitored_val is None:
+                numbers = [safe_float(v) for v in df.iloc[r] if safe_float(v) is not None]
+                monitored_val = max(numbers) if numbers else None
+            # [REFINED v8] Store MW value directly
+            # Fallback: if context missing, check if state was mentioned in *this* total row
+            state_code_to_use = current_state_code or row.state_code_in_row
+            # Reduced verbosity
+            # if DEBUG: print(f"[PASS 1 DEBUG] Row {r}: Found TOTAL. Context State={state_code_to_use}. MW={monitored_val}.")
+            if state_code_to_use: yield RegionRecord(state_code_to_use, monitored_val)
+            # elif DEBUG: print(f"[PASS 1 WARN] Row {r}: Found TOTAL row but no state context!")
+            # No continue: e.g. 'STATE TOTAL' also reads as a sector header below
+
+        if row.kind == ROW_SECTOR_HEADER:
+            current_sector_id = row.sector_id
+            # if DEBUG: print(f"[PASS 2 CTX] Row {r}: Sector -> {current_sector_id}")
+            continue
+        if row.kind == ROW_TYPE_HEADER:
+            current_type_id = row.type_id
+            # if DEBUG: print(f"[PASS 2 CTX] Row {r}: Type -> {current_type_id}")
+            continue
+        if row.kind not in (ROW_UNIT, ROW_PLANT): continue
+
+        # --- Unit or Plant Logic ---
+        plant_cell = row.plant_cell
+        state_code_in_row = row.state_code_in_row
+        is_unit = row.kind == ROW_UNIT
+        unit_name_source = row.unit_source # Original string like "Unit,1"
+        unit_number_to_insert = 'N/A' # Default
+
+        # [REFINED v11] Extract number if it's a unit
+        if is_unit:
+            num_match = UNIT_NUMBER_EXTRACT_REGEX.search(unit_name_source)
+            if num_match:
+                unit_number_to_insert = num_match.group(0) # e.g., '1', '6'
+            # else: unit_number_to_insert remains 'N/A'
+
+        # Process Unit Row (Conditional Insert for OS)
+        if is_unit:
+            if current_plant is not None:
+                outage_mw = safe_float(df.iat[r, found.get('UNDER_OUTAGE')]) if found.get('UNDER_OUTAGE') is not None else None
                 expected_raw = df.iat[r, found.get('EXPECTED_SYNC')] if found.get('EXPECTED_SYNC') is not None else None
                 remarks_raw = df.iat[r, found.get('REMARKS')] if found.get('REMARKS') is not None else None
                 outage_date_raw = df.iat[r, found.get('OUTAGE_DATE')] if found.get('OUTAGE_DATE') is not None else None
@@ -529,109 +816,392 @@ def process_single_report(df, report_iso_date, db_connection):
                 expected_iso = parse_date_like(expected_raw)
                 outage_date_iso = parse_date_like(outage_date_raw)
                 remarks_clean = sanitize_string(remarks_raw)
-                outage_mw_to_insert = main_outage_mw # Always insert reported value
+                outage_mw_to_insert = outage_mw # Always insert reported value
 
-                # [REFINED v11] Specific status logic & conditional insert
+                # [REFINED v11] Specific status logic
                 status_val_db = 'Active' # Default
-                insert_os_record = False # Flag
+                insert_os_record = False # Flag to decide insertion
 
                 if remarks_clean and outage_date_iso:
                     status_val_db = 'Under Outage'
                     insert_os_record = True
                 elif remarks_clean and not outage_date_iso:
-                    if "NOT YET COMMISSIONED" in remarks_clean.upper():
-                         status_val_db = 'Not Commisioned'
-                    else:
-                         status_val_db = 'Under Outage' # Remark implies issue
+                    status_val_db = 'Not Commisioned' # Only remarks
                     insert_os_record = True
                 elif not remarks_clean and outage_date_iso:
-                    status_val_db = 'Active' # Date only means Active
+                    status_val_db = 'Active' # Only date means Active
                     insert_os_record = True
                 # else: (no remarks, no outage date) -> Active, insert_os_record = False
 
-                # Insert status only if needed based on flags
+                # Record status only if needed based on flags
                 if insert_os_record:
-                    try:
-                        cursor.execute(sql_op, (
-                            current_plant_id, 'Main', report_iso_date,
-                            outage_mw_to_insert, status_val_db,
-                            expected_iso, remarks_clean,
-                            outage_date_iso
-                         ))
-                        opstatus_inserted_updated += 1
-                        # Reduced verbosity
-                        # if DEBUG: print(f"[PASS 2 INSERT] OP_STATUS (main) plant={current_plant_id} status='{status_val_db}'")
-                    except Exception as e:
-                        print(f"[DB ERROR - PASS 2] OP_STATUS main insert failed for {current_plant_id}: {e}")
-                # else:
-                #    if DEBUG: print(f"[PASS 2 SKIP] OP_STATUS (main) plant={current_plant_id} - Active, no details.")
-
-                continue # Go to next row
-
-            # --- Skip Row ---
+                    current_plant.statuses.append((
+                        unit_number_to_insert, outage_mw_to_insert, status_val_db,
+                        expected_iso, remarks_clean, outage_date_iso
+                    ))
+                    # Reduced verbosity
+                    # if DEBUG: print(f"[PASS 2 INSERT] OP_STATUS (unit) plant='{current_plant.name}' unit='{unit_number_to_insert}' status='{status_val_db}'")
+                # else: # Implicitly Active - Do not insert
+                #     if DEBUG: print(f"[PASS 2 SKIP] OP_STATUS (unit) '{unit_name_source}' - Active, no outage details.")
+
+            # Reduced verbosity
+            # elif DEBUG: print(f"[PASS 2 SKIP] Row {r}: Unit '{unit_name_source}' no current plant.")
+            continue # Always skip unit rows from plant logic
+
+        # Process Potential Plant Row
+        monitored_val = safe_float(df.iat[r, found.get('MONITORED')]) if found.get('MONITORED') is not None else None
+        is_valid_plant_name = bool(plant_cell) and len(plant_cell) >= 2 and re.search(r'[a-zA-Z]', plant_cell)
+        is_potential_plant = is_valid_plant_name and (monitored_val is not None)
+
+        if is_potential_plant:
+            plant_name = plant_cell
+            state_code_to_use = current_state_code
+            if not state_code_to_use:
+                 if state_code_in_row: state_code_to_use = state_code_in_row
+                 # Reduced verbosity
+                 # if DEBUG: print(f"[PASS 2 WARN] Row {r}: Using state '{state_code_to_use}' for plant '{plant_name}'")
+
+            # Production Log values
+            prog_val=safe_float(df.iat[r, found.get('TODAYS_PROGRAM')]) if found.get('TODAYS_PROGRAM') is not None else None
+            actual_val=safe_float(df.iat[r, found.get('TODAYS_ACTUAL')]) if found.get('TODAYS_ACTUAL') is not None else None
+            coal_days=safe_float(df.iat[r, found.get('COAL_STOCK')]) if found.get('COAL_STOCK') is not None else None
+            opcap_mw = monitored_val
+
+            if current_plant is not None: yield current_plant # Its unit rows are complete
+            current_plant = PlantRecord(plant_name, state_code_to_use, current_sector_id, current_type_id,
+                                        (opcap_mw, actual_val, prog_val, coal_days), []) # Update context
             # Reduced verbosity
-            # if DEBUG and r > 10:
-            #      if combined.strip(): print(f"[PASS 2 SKIP] Row {r}: No specific match. Plant Cell: '{plant_cell}', Monitored: {monitored_val}.")
+            # if DEBUG: print(f"[PASS 2 PLANT] name='{plant_name[:60]}' opcap={opcap_mw}")
+
+            # Main Plant Operational Status (Conditional)
+            main_outage_mw = safe_float(df.iat[r, found.get('UNDER_OUTAGE')]) if found.get('UNDER_OUTAGE') is not None else None
+            expected_raw = df.iat[r, found.get('EXPECTED_SYNC')] if found.get('EXPECTED_SYNC') is not None else None
+            remarks_raw = df.iat[r, found.get('REMARKS')] if found.get('REMARKS') is not None else None
+            outage_date_raw = df.iat[r, found.get('OUTAGE_DATE')] if found.get('OUTAGE_DATE') is not None else None
+
+            expected_iso = parse_date_like(expected_raw)
+            outage_date_iso = parse_date_like(outage_date_raw)
+            remarks_clean = sanitize_string(remarks_raw)
+            outage_mw_to_insert = main_outage_mw # Always insert reported value
+
+            # [REFINED v11] Specific status logic & conditional insert
+            status_val_db = 'Active' # Default
+            insert_os_record = False # Flag
+
+            if remarks_clean and outage_date_iso:
+                status_val_db = 'Under Outage'
+                insert_os_record = True
+            elif remarks_clean and not outage_date_iso:
+                if "NOT YET COMMISSIONED" in remarks_clean.upper():
+                     status_val_db = 'Not Commisioned'
+                else:
+                     status_val_db = 'Under Outage' # Remark implies issue
+                insert_os_record = True
+            elif not remarks_clean and outage_date_iso:
+                status_val_db = 'Active' # Date only means Active
+                insert_os_record = True
+            # else: (no remarks, no outage date) -> Active, insert_os_record = False
+
+            # Record status only if needed based on flags
+            if insert_os_record:
+                current_plant.statuses.append((
+                    'Main', outage_mw_to_insert, status_val_db,
+                    expected_iso, remarks_clean, outage_date_iso
+                ))
+                # Reduced verbosity
+                # if DEBUG: print(f"[PASS 2 INSERT] OP_STATUS (main) plant='{plant_name[:60]}' status='{status_val_db}'")
+            # else:
+            #    if DEBUG: print(f"[PASS 2 SKIP] OP_STATUS (main) plant='{plant_name[:60]}' - Active, no details.")
 
+            continue # Go to next row
 
-        # Commit after processing all rows for this file in Pass 2
-        db_connection.commit()
-        if DEBUG: print(f"--- Pass 2 Complete ({report_iso_date}): Committed Records ---")
-        if DEBUG: print(f"    Plants Upserted: {plants_inserted_updated}")
-        if DEBUG: print(f"    ProdLog Upserted: {prodlog_inserted_updated}")
-        if DEBUG: print(f"    OpStatus Inserted/Updated: {opstatus_inserted_updated}")
+        # --- Skip Row ---
+        # Reduced verbosity
+        # if DEBUG and r > 10:
+        #      if combined.strip(): print(f"[PASS 2 SKIP] Row {r}: No specific match. Plant Cell: '{plant_cell}', Monitored: {monitored_val}.")
+
+    if current_plant is not None: yield current_plant
+
+def extract_report_records(df, report_iso_date, region_monitored_col=None, use_cache=USE_CACHE):
+    """Collects iter_report_records() into (region_data, plant_records) for the writers:
+    {state_code: capacity_MW} (last TOTAL row per state wins) and the PlantRecords in sheet
+    order, or None when the MONITORED column is missing. Columns come from the layout cache."""
+    columns = detect_report_columns_cached(df, report_iso_date, use_cache)
+    region_data_found = {}
+    plant_records = [] if columns[1] is not None else None
+    for record in iter_report_records(df, report_iso_date, columns, region_monitored_col):
+        if isinstance(record, RegionRecord): region_data_found[record.state_code] = record.monitored_mw
+        else: plant_records.append(record)
+    return region_data_found, plant_records
+
+def extract_region_data(df, monitored_col_idx=None):
+    """Scans DF and finds state totals (MW). Returns {state_code: capacity_MW}; does not touch the DB."""
+    records = iter_report_records(df, columns=({}, None), region_monitored_col=monitored_col_idx)
+    return {rec.state_code: rec.monitored_mw for rec in records}
+
+def extract_plant_records(df, report_iso_date, use_cache=USE_CACHE):
+    """Plant records (PlantRecord, sheet order) of a DataFrame without touching the DB; None if the
+    MONITORED column is missing. Unit statuses hang off the plant row above them; plant IDs are
+    resolved by the writer."""
+    return extract_report_records(df, report_iso_date, use_cache=use_cache)[1]
+
+# ---------------------------
+# PASS 1: Region Data
+# ---------------------------
+def write_region_data(cnx, report_iso, region_data_found, batch_size=BATCH_SIZE, bulk=None):
+    """Upserts one REGION_DETAILS row per state (MW, or NULL when no total was found) in batches.
+    bulk: BulkLoadWriter that stages the rows instead (merged and committed by the caller)."""
+    if DEBUG: print(f"\n--- Starting Pass 1: Region Data for {report_iso} ---")
+    writer = bulk if bulk is not None else BatchUpsertWriter(cnx, batch_size, label='PASS 1')
+    written_before = writer.written['REGION_DETAILS']; failed_before = writer.failed['REGION_DETAILS']
+    all_state_codes = set(STATE_MAP.values())
+    if 'BHU' in all_state_codes: all_state_codes.remove('BHU') # Exclude Bhutan import
+
+    try:
+        # Insert collected/missing region data
+        for state_code in sorted(list(all_state_codes)): # Insert in predictable order
+            mw_value = region_data_found.get(state_code, None) # Get MW value or None
+            # [REFINED v8] Insert MW value
+            writer.add('REGION_DETAILS', (state_code, report_iso, mw_value), f"State={state_code}")
+            # Reduced verbosity
+            # if DEBUG and (mw_value is not None or state_code == 'CTG'):
+            #      print(f"[PASS 1 INSERT] REGION_DETAILS: State={state_code}, MW={mw_value}")
+
+        writer.flush()
+        if bulk is None: cnx.commit()
+        if DEBUG: print(f"--- Pass 1 Complete ({report_iso}): {'Staged' if bulk is not None else 'Committed'} {writer.written['REGION_DETAILS'] - written_before} REGION_DETAILS ---")
+        failed = writer.failed['REGION_DETAILS'] - failed_before
+        if failed: print(f"    Failed REGION_DETAILS rows: {failed}")
+        return not failed
+
+    except Exception as e:
+        print(f"[ERROR - PASS 1] ({report_iso}) Error: {e}")
+        writer.discard()
+        if cnx.is_connected(): cnx.rollback() # Rollback on error
+        return False
+
+def merge_bulk_load(cnx, bulk):
+    """Merges everything bulk staged during the run in one transaction (--bulk-load)."""
+    if DEBUG: print(f"\n--- Merging staged rows: {bulk.written} ---")
+    try:
+        merged = bulk.merge(cnx)
+        cnx.commit()
+    except Exception as e:
+        print(f"[ERROR - BULK] Merge failed, staged rows rolled back (kept in {bulk.work_dir}): {e}")
+        if cnx.is_connected(): cnx.rollback()
+        return False
+    if DEBUG: print(f"--- Bulk Merge Complete: {merged} ---")
+    bulk.close()
+    return True
+
+def pre_scan_for_region_data(df, report_iso, monitored_col_idx, cnx, batch_size=BATCH_SIZE):
+    """Scans DF, finds state totals (MW), and upserts them into REGION_DETAILS in batches."""
+    try: region_data_found = extract_region_data(df, monitored_col_idx)
+    except Exception as e:
+        print(f"[ERROR - PASS 1] ({report_iso}) Error: {e}")
+        return
+    write_region_data(cnx, report_iso, region_data_found, batch_size)
+
+# ---------------------------
+# MAIN PROCESSING FUNCTION (for a single file/date) - v11 Logic
+# ---------------------------
+def write_plant_records(db_connection, report_iso_date, plant_records, plant_index, batch_size=BATCH_SIZE, bulk=None):
+    """Resolves plant IDs through plant_index and upserts plants, prod logs and op status for one date.
+    Rows are buffered per table and upserted batch_size rows at a time; one commit per file.
+    bulk: BulkLoadWriter that stages the rows instead (merged and committed by the caller)."""
+    if DEBUG: print(f"\n--- Starting Pass 2: Plant/Unit Data for {report_iso_date} ---")
+    writer = bulk if bulk is not None else BatchUpsertWriter(db_connection, batch_size, label='PASS 2')
+    written_before = dict(writer.written); failed_before = dict(writer.failed)
+    try:
+        for plant in plant_records:
+            plant_name, state_code_to_use = plant.name, plant.state
+
+            # Look up existing plant ID or generate new
+            existing_plant = plant_index.lookup(plant_name, state_code_to_use)
+            plant_id_to_use = existing_plant if existing_plant else plant_index.peek_new_id()
+
+            # Insert/Update Plant (flushed before the rows that reference it)
+            writer.add('POWERPLANTS', (plant_id_to_use, plant_name, state_code_to_use, plant.sector, plant.type), f"'{plant_name}'")
+            if not existing_plant: plant_index.register_new(plant_name, state_code_to_use, plant_id_to_use)
+
+            # Insert Production Log
+            writer.add('PRODUCTIONLOG', (plant_id_to_use, report_iso_date) + plant.prod, f"plant={plant_id_to_use}")
+
+            # Insert Operational Status rows (main plant first, then its units, in sheet order)
+            for unit_number, *status_values in plant.statuses:
+                desc = f"main plant={plant_id_to_use}" if unit_number == 'Main' else f"unit plant={plant_id_to_use} unit='{unit_number}'"
+                writer.add('OPERATIONAL_STATUS', (plant_id_to_use, unit_number, report_iso_date, *status_values), desc)
+
+        # Flush remaining buffered rows and commit once for this file in Pass 2
+        writer.flush()
+        if bulk is None: db_connection.commit()
+        dropped = plant_index.forget({params[0] for params in writer.failed_rows['POWERPLANTS']}) if bulk is None else 0
+        if dropped: print(f"    New plants not written (dropped from the plant index): {dropped}")
+        plant_index.commit() # Staged rows already carry the new IDs
+        written = {t: n - written_before[t] for t, n in writer.written.items()}
+        if DEBUG: print(f"--- Pass 2 Complete ({report_iso_date}): {'Staged' if bulk is not None else 'Committed'} Records ---")
+        if DEBUG: print(f"    Plants Upserted: {written['POWERPLANTS']}")
+        if DEBUG: print(f"    ProdLog Upserted: {written['PRODUCTIONLOG']}")
+        if DEBUG: print(f"    OpStatus Inserted/Updated: {written['OPERATIONAL_STATUS']}")
+        failed = {t: n - failed_before[t] for t, n in writer.failed.items() if n > failed_before[t]}
+        if failed: print(f"    Failed rows: {failed}")
+        return not failed
 
 
     except Exception as e:
         print(f"[ERROR - PASS 2] ({report_iso_date}) An error occurred: {e}")
+        writer.discard()
         if db_connection.is_connected():
             try: db_connection.rollback()
             except Exception as rb_err: print(f"[DB WARN] Rollback failed: {rb_err}")
-    finally:
-        # Close only the cursor used in this function pass
-        if cursor:
-             try: cursor.close()
-             # Reduced verbosity
-             # if DEBUG: print(f"[DB] Closed Pass 2 cursor for {report_iso_date}")
-             except Exception as close_err:
-                 print(f"[DB WARN] Error closing Pass 2 cursor for {report_iso_date}: {close_err}")
+        plant_index.rollback()
+        return False
 
+def process_single_report(df, report_iso_date, db_connection, plant_index=None, batch_size=BATCH_SIZE):
+    """Processes plants, units, prod logs, op status for a given DataFrame and date.
+    plant_index: PlantIndex shared across the run (loaded here if not given)."""
+    try: plant_records = extract_plant_records(df, report_iso_date)
+    except Exception as e:
+        print(f"[ERROR - PASS 2] ({report_iso_date}) An error occurred: {e}")
+        return
+    if plant_records is None: return
 
-if __name__ == "__main__":
+    # Plant identities and the starting plant counter come from the run-wide index
+    if plant_index is None:
+        try: plant_index = PlantIndex.load(db_connection)
+        except Exception as e: print(f"[DB ERROR ({report_iso_date})] Could not load plant index: {e}. Starting counter at 1."); plant_index = PlantIndex()
+    write_plant_records(db_connection, report_iso_date, plant_records, plant_index, batch_size)
+
+# ---------------------------
+# PARALLEL PARSING (worker processes read + parse, main process writes in date order)
+# ---------------------------
+def parse_report_file(fullpath, report_date, use_cache=USE_CACHE):
+    """Reads one DGR file (through the decoded-workbook and layout caches) and extracts its Pass 1 and Pass 2
+    records in a single traversal without touching the DB.
+    Top-level so a ProcessPoolExecutor can pickle it; the result holds only plain Python values."""
+    started = time.perf_counter()
+    parsed = {'date': report_date, 'filename': os.path.basename(fullpath), 'status': 'parsed',
+              'region_data': None, 'plant_records': None, 'errors': {}, 'parse_s': None}
+    if not os.path.exists(fullpath):
+        parsed['status'] = 'missing'
+        return parsed
+    try:
+        df = read_excel_cached(fullpath, use_cache)
+    except Exception as e:
+        df = None; print(f"[ERROR] Reading {fullpath} failed: {e}")
+    if df is None:
+        parsed['status'] = 'unreadable'
+        return parsed
+
+    # One traversal yields both the Pass 1 (REGION_DETAILS) and Pass 2 (plant) records
+    try: parsed['region_data'], parsed['plant_records'] = extract_report_records(df, report_date, use_cache=use_cache)
+    except Exception as e: parsed['errors']['PARSE'] = str(e)
+    parsed['parse_s'] = time.perf_counter() - started
+    return parsed
+
+def iter_parsed_reports(to_process, workers=PARSE_WORKERS, use_cache=USE_CACHE):
+    """Yields parse_report_file results for [(date, filename), ...] strictly in the given order.
+    With workers > 1 files are parsed ahead in a process pool; the caller still consumes (and
+    writes) them one at a time in date order, so new plant IDs are allocated as in a sequential run."""
+    dates = [d for d, _ in to_process]
+    paths = [os.path.join(REPORT_FOLDER, f) for _, f in to_process]
+    cache_flags = [use_cache] * len(to_process)
+    if workers <= 1 or len(to_process) <= 1:
+        yield from map(parse_report_file, paths, dates, cache_flags)
+        return
+    # spawn: never fork the caller (e.g. the backend process running pipeline.py, with its threads)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+        yield from pool.map(parse_report_file, paths, dates, cache_flags)
 
+# ---------------------------
+# FACT STORE (normalized records per report date: dgr_region / dgr_plant / dgr_status)
+# ---------------------------
+DGR_PLANT_FACT_COLUMNS = ['Plant_Seq', 'Plant_Name', 'State_Code', 'Sector_ID', 'Type_ID',
+                          'Operational_Capacity_MW', 'Todays_Actual_MU', 'Capable_Generation_MU', 'Coal_Stock_Days']
+DGR_STATUS_FACT_COLUMNS = ['Plant_Seq', 'Unit_Number', 'Cap_Under_Outage_MW', 'Status', 'Expected_Sync_Date', 'Remarks', 'Outage_Date']
+
+def _fact_value(v):
+    # Parquet nulls / numpy scalars back to the plain values the writers get from a parse
+    if v is None or v is pd.NA or (isinstance(v, float) and v != v): return None
+    if isinstance(v, (float, np.floating)): return float(v)
+    if isinstance(v, np.integer): return int(v)
+    return v
+
+def store_report_facts(report_date, region_data, plant_records):
+    """Writes one report's Pass 1 / Pass 2 records to the fact store. Without plant records (no
+    MONITORED column) the plant partitions are removed, so load_report_facts gives None again."""
+    write_partition('dgr_region', report_date, pd.DataFrame(list(region_data.items()), columns=['State_Code', 'Monitored_Capacity_MW']))
+    if plant_records is None:
+        remove_partition('dgr_plant', report_date); remove_partition('dgr_status', report_date)
+        return
+    plants = [(seq, p.name, p.state, p.sector, p.type, *p.prod) for seq, p in enumerate(plant_records)]
+    statuses = [(seq, *status) for seq, p in enumerate(plant_records) for status in p.statuses]
+    write_partition('dgr_plant', report_date, pd.DataFrame(plants, columns=DGR_PLANT_FACT_COLUMNS))
+    write_partition('dgr_status', report_date, pd.DataFrame(statuses, columns=DGR_STATUS_FACT_COLUMNS))
+
+def load_report_facts(report_date):
+    """Inverse of store_report_facts: (region_data, plant_records or None) for one date."""
+    region = read_partition('dgr_region', report_date).astype(object)
+    region_data = {code: _fact_value(mw) for code, mw in region.itertuples(index=False, name=None)}
+    if not has_partition('dgr_plant', report_date): return region_data, None
+    statuses_by_seq = {}
+    if has_partition('dgr_status', report_date):
+        for row in read_partition('dgr_status', report_date, DGR_STATUS_FACT_COLUMNS).astype(object).itertuples(index=False, name=None):
+            statuses_by_seq.setdefault(_fact_value(row[0]), []).append(tuple(_fact_value(v) for v in row[1:]))
+    plant_records = []
+    for row in read_partition('dgr_plant', report_date, DGR_PLANT_FACT_COLUMNS).astype(object).itertuples(index=False, name=None):
+        seq, name, state, sector, type_id, *prod = (_fact_value(v) for v in row)
+        plant_records.append(PlantRecord(name, state, sector, type_id, tuple(prod), statuses_by_seq.get(seq, [])))
+    return region_data, plant_records
+
+def iter_fact_reports(to_process):
+    """parse_report_file-shaped results for [(date, label), ...] read from the fact store."""
+    for report_date, label in to_process:
+        started = time.perf_counter()
+        parsed = {'date': report_date, 'filename': label, 'status': 'parsed', 'region_data': None, 'plant_records': None, 'errors': {}}
+        try: parsed['region_data'], parsed['plant_records'] = load_report_facts(report_date)
+        except Exception as e: parsed['errors']['PARSE'] = str(e)
+        parsed['parse_s'] = time.perf_counter() - started
+        yield parsed
+
+def report_fact_paths(report_date):
+    """The fact store files one DGR report date is loaded from (--from-facts)."""
+    return [partition_path(dataset, report_date) for dataset in ('dgr_region', 'dgr_plant', 'dgr_status')]
+
+
+def main(workers=PARSE_WORKERS, no_cache=False, bulk_load=BULK_LOAD, from_facts=False, cnx=None, touched_dates=None,
+         new_plant_ids=None):
+    """Loads every report that is new or changed since its last load (INGEST_MANIFEST); returns the exit code (0 = ok).
+    cnx: an open connection to use (e.g. from a pool) instead of connecting with DB_CONFIG; it is
+    closed at the end like the own one (a pooled connection goes back to its pool).
+    touched_dates / new_plant_ids: sets that receive the report dates written and the Plant_IDs created."""
     print("\n================= MULTI-DAY DGR REPORT PROCESSOR (v11) =================")
 
     # --- Establish DB Connection ONCE ---
     main_cnx = None
     try:
-        main_cnx = mysql.connector.connect(**DB_CONFIG)
+        main_cnx = cnx or mysql.connector.connect(**DB_CONFIG, allow_local_infile=bulk_load)
         if DEBUG:
             print("[DB] Connected successfully.")
 
-        # --- Find last processed date from DATE_DIM ---
-        cursor = main_cnx.cursor()
-        cursor.execute("SELECT MAX(Date) FROM DATE_DIM;")
-        result = cursor.fetchone()
-        if result and result[0]:
-            last_date = result[0]
-            start_date = last_date + timedelta(days=1)
-            print(f"[INFO] Last processed date found in DB: {last_date}")
-        else:
-            start_date = datetime(2025, 8, 1).date()
-            print(f"[INFO] No previous date found. Starting from {start_date}")
-        cursor.close()
-
-        # --- Collect all matching XLS files ---
-        all_files = [
+        # --- What was loaded before: content hash per report file ---
+        manifest = IngestManifest(main_cnx, 'dgr_facts' if from_facts else 'dgr', deferred=bulk_load)
+        print(f"[INFO] Manifest: {len(manifest.entries)} files seen, last report loaded: {manifest.watermark()}")
+
+        # --- Collect all matching XLS files (or the fact store's report dates) ---
+        all_files = [] if from_facts else [
             f for f in os.listdir(REPORT_FOLDER)
             if re.match(r"dgr2-\d{4}-\d{2}-\d{2}\.xls$", f)
         ]
-        if not all_files:
+        if from_facts and not partition_dates('dgr_region'):
+            print("[CRITICAL ERROR] No DGR facts found in the fact store.")
+            return 1
+        if not all_files and not from_facts:
             print(f"[CRITICAL ERROR] No DGR XLS files found in folder: {REPORT_FOLDER}")
-            exit(1)
+            return 1
 
         # Sort files by date
-        file_dates = []
+        file_dates = [(d, f"fact store {d}") for d in partition_dates('dgr_region')] if from_facts else []
         for f in all_files:
             m = re.search(r"(\d{4}-\d{2}-\d{2})", f)
             if m:
@@ -642,30 +1212,57 @@ if __name__ == "__main__":
                     continue
         file_dates.sort()
 
-        # --- Filter files to process ---
-        to_process = [(d, f) for (d, f) in file_dates if d >= start_date]
+        file_dates = [(d, f) for (d, f) in file_dates if d >= FIRST_REPORT_DATE]
+        report_paths = {f: report_fact_paths(d) if from_facts else os.path.join(REPORT_FOLDER, f) for d, f in file_dates}
+
+        # --- Before the manifest existed: reports whose date already has DGR rows count as loaded ---
+        # (not DATE_DIM's last date: parseall2 / parseall3 add dates too)
+        if not manifest.entries:
+            cursor = main_cnx.cursor()
+            cursor.execute(DGR_LOADED_DATES_SQL)
+            loaded_dates = {r[0] for r in cursor.fetchall()}
+            cursor.close()
+            seeded = [(d, f) for d, f in file_dates if d in loaded_dates]
+            if seeded:
+                print(f"[INFO] Empty manifest: recording {len(seeded)} reports whose date already has DGR rows as loaded.")
+                for d, f in seeded: manifest.record(f, manifest.check(f, report_paths[f])[1], 'loaded', d)
+                manifest.flush()
+
+        # --- Filter files to process: new, changed (hash differs) or failed last time ---
+        digests = {}
+        to_process = []
+        for d, f in file_dates:
+            needs_load, digests[f] = manifest.check(f, report_paths[f])
+            if needs_load: to_process.append((d, f))
         if not to_process:
-            print(f"[INFO] All reports up to date. Last date processed: {start_date - timedelta(days=1)}")
-            exit(0)
+            print(f"[INFO] All reports up to date ({len(file_dates)} unchanged). Last date loaded: {manifest.watermark()}")
+            return 0
 
         print(f"[INFO] Found {len(to_process)} files to process (from {to_process[0][0]} to {to_process[-1][0]}).")
 
-        # --- Loop through each file and process sequentially ---
-        for report_date, filename in to_process:
-            fullpath = os.path.join(REPORT_FOLDER, filename)
+        # --- Load plant identities once for the whole run ---
+        plant_index = PlantIndex.load(main_cnx)
+        bulk = BulkLoadWriter(BULK_TABLES, label='BULK') if bulk_load else None
+        if bulk is not None: print(f"[INFO] Bulk-load mode: staging rows in {bulk.work_dir}")
+
+        # --- Parse files (optionally in parallel) and write them one by one in date order ---
+        if workers > 1: print(f"[INFO] Parsing with {workers} worker processes.")
+        use_cache = USE_CACHE and not no_cache
+        if use_cache: prune_read_cache()
+        reports = iter_fact_reports(to_process) if from_facts else iter_parsed_reports(to_process, workers, use_cache)
+        for parsed in reports:
+            report_date, filename = parsed['date'], parsed['filename']
             print(f"\n================ Processing {filename} ({report_date}) ================")
 
-            if not os.path.exists(fullpath):
-                print(f"[SKIP] File missing: {fullpath}")
+            if parsed['status'] == 'missing':
+                print(f"[SKIP] File missing: {os.path.join(REPORT_FOLDER, filename)}")
+                continue
+            if parsed['status'] != 'parsed':
+                print(f"[ERROR] Could not read {filename}, skipping.")
+                manifest.record(filename, digests[filename], 'failed', report_date, error=parsed['status'])
                 continue
 
             try:
-                # --- Read Excel ---
-                df_current = try_read_excel(fullpath)
-                if df_current is None:
-                    print(f"[ERROR] Could not read {filename}, skipping.")
-                    continue
-
                 # --- Insert date into DATE_DIM ---
                 date_insert_success = False
                 try:
@@ -685,28 +1282,68 @@ if __name__ == "__main__":
 
                 if not date_insert_success:
                     print(f"[SKIP] Skipping {filename} due to date insert failure.")
+                    manifest.record(filename, digests[filename], 'failed', report_date, error='DATE_DIM insert failed')
                     continue
 
+                if 'PARSE' in parsed['errors']:
+                    print(f"[ERROR - PARSE] ({report_date}) An error occurred: {parsed['errors']['PARSE']}")
+                    manifest.record(filename, digests[filename], 'failed', report_date, parse_s=parsed['parse_s'], error=parsed['errors']['PARSE'])
+                    continue
+
+                # --- Keep the normalized records so later loads can skip the XLS parse ---
+                if WRITE_FACTS and not from_facts:
+                    try: store_report_facts(report_date, parsed['region_data'], parsed['plant_records'])
+                    except Exception as e: print(f"[FACTS WARN] ({report_date}) Could not store facts: {e}")
+
                 # --- Run Pass 1 ---
-                pre_scan_for_region_data(df_current, report_date, None, main_cnx)
+                load_started = time.perf_counter()
+                ok = write_region_data(main_cnx, report_date, parsed['region_data'], bulk=bulk)
 
                 # --- Run Pass 2 ---
-                process_single_report(df_current, report_date, main_cnx)
+                if parsed['plant_records'] is not None: ok = write_plant_records(main_cnx, report_date, parsed['plant_records'], plant_index, bulk=bulk) and ok
 
-                print(f"[DONE] Successfully processed {filename}")
+                rows = len(parsed['region_data']) + len(parsed['plant_records'] or [])
+                manifest.record(filename, digests[filename], 'loaded' if ok else 'failed', report_date, rows=rows, parse_s=parsed['parse_s'],
+                                load_s=time.perf_counter() - load_started, error=None if ok else 'write failed (see log)')
+                if ok and touched_dates is not None: touched_dates.add(report_date)
+                print(f"[DONE] Successfully processed {filename}" if ok else f"[DONE] Processed {filename} with failed rows; it is loaded again next run")
 
             except Exception as e:
                 print(f"[CRITICAL ERROR] While processing {filename}: {e}")
+                manifest.record(filename, digests[filename], 'failed', report_date, error=e)
                 continue  # Continue to next file
 
+        if bulk is not None and not merge_bulk_load(main_cnx, bulk):
+            manifest.discard() # Nothing of this run was merged: the files stay new / changed
+            return 1
+        manifest.flush()
+        if new_plant_ids is not None: new_plant_ids.update(plant_index.created)
         print("\n================= ALL REPORTS PROCESSED SUCCESSFULLY =================")
+        return 0
 
     except mysql.connector.Error as err:
         print(f"[CRITICAL ERROR] Database error: {err}")
+        return 1
     except Exception as e:
         print(f"[CRITICAL ERROR] Unexpected error: {e}")
+        return 1
     finally:
         if main_cnx and main_cnx.is_connected():
             main_cnx.close()
             if DEBUG:
-                print("[DB] Main connection closed.")
\ No newline at end of file
+                print("[DB] Main connection closed.")
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Load daily DGR XLS reports into IndianEnergyDB.")
+    parser.add_argument("--workers", type=int, default=PARSE_WORKERS,
+                        help="Worker processes used to read/parse files (1 = sequential).")
+    parser.add_argument("--no-cache", action="store_true",
+                        help=f"Decode every workbook and detect every layout instead of reusing {CACHE_DIR}.")
+    parser.add_argument("--bulk-load", action="store_true", default=BULK_LOAD,
+                        help="Stage parsed rows in TSV files and merge them with LOAD DATA LOCAL INFILE at the end (backfills).")
+    parser.add_argument("--from-facts", action="store_true",
+                        help="Load the parsed records kept in the fact store instead of re-parsing the XLS reports.")
+    args = parser.parse_args()
+    exit(main(args.workers, args.no_cache, args.bulk_load, args.from_facts))
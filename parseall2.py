@@ -13,10 +13,17 @@ Wrapper to process all cleaned renewable Excel reports in:
 
 import mysql.connector
 import pandas as pd
+import openpyxl
 from datetime import datetime, date, timedelta
 import re
 import traceback
 import os
+import sys
+import time
+import argparse
+from bulk_loader import BulkLoadWriter, StagedTable
+from fact_store import has_partition, partition_dates, partition_path, read_partition
+from ingest_manifest import IngestManifest
 
 # ============== CONFIG ==============
 DB_CONFIG = {
@@ -27,9 +34,42 @@ DB_CONFIG = {
 }
 
 # Folder containing the cleaned excel files
-REPORTS_FOLDER = r"C:\Users\vishn\OneDrive\Desktop\DBMS_Final\Processed_Renewable_XLSX_reports"
+BASE_DIR = os.path.dirname(os.path.abspath(__file__)) # Data folders live next to this script
+REPORTS_FOLDER = os.path.join(BASE_DIR, "Processed_Renewable_XLSX_reports")
+# Stage PRODUCTIONLOG rows in TSV files and merge them once at the end of the run (--bulk-load)
+BULK_LOAD = False
+FROM_FACTS = False  # Load from the fact store's re_* datasets instead of the XLSX files (--from-facts)
 # ====================================
 
+# PRODUCTIONLOG upserts; executemany() sends each as one multi-row INSERT per file
+SQL_SUMMARY_LOG = """
+    INSERT INTO PRODUCTIONLOG (Plant_ID, Log_Date, Todays_Actual_MU)
+    VALUES (%s,%s,%s)
+    ON DUPLICATE KEY UPDATE Todays_Actual_MU = VALUES(Todays_Actual_MU)
+"""
+SQL_STATION_LOG = """
+    INSERT INTO PRODUCTIONLOG
+    (Plant_ID, Log_Date, Efficiency_Percentage, Todays_Actual_MU, Capable_Generation_MU, Operational_Capacity_MW)
+    VALUES (%s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        Efficiency_Percentage = VALUES(Efficiency_Percentage),
+        Todays_Actual_MU = VALUES(Todays_Actual_MU),
+        Capable_Generation_MU = VALUES(Capable_Generation_MU),
+        Operational_Capacity_MW = VALUES(Operational_Capacity_MW)
+"""
+
+# Fact store columns the loader uses (the rest of each dataset is not read)
+RE_SUMMARY_FACT_COLUMNS = ['State / Region', 'Others RES']
+RE_STATION_FACT_COLUMNS = ['Station', 'State / Region', 'Sector', 'Type', 'Operational Capacity', 'Actual Generation']
+
+# Staging specs for bulk-load mode: same columns / updated columns as the two PRODUCTIONLOG upserts
+BULK_TABLES = {
+    'SUMMARY_LOG': StagedTable('PRODUCTIONLOG', ['Plant_ID', 'Log_Date', 'Todays_Actual_MU'], ['Todays_Actual_MU']),
+    'STATION_LOG': StagedTable('PRODUCTIONLOG',
+                               ['Plant_ID', 'Log_Date', 'Efficiency_Percentage', 'Todays_Actual_MU', 'Capable_Generation_MU', 'Operational_Capacity_MW'],
+                               ['Efficiency_Percentage', 'Todays_Actual_MU', 'Capable_Generation_MU', 'Operational_Capacity_MW']),
+}
+
 # --------------------------
 # Add your canonical state code map here (you provided this earlier)
 # Keys should be uppercase full state names used as canonical forms
@@ -58,6 +98,11 @@ STATE_NORMALIZATION_ALIASES = {
     'DAMAN AND DIU': 'DAMAN AND DIU',
 }
 
+# Row names that mark summary / total / region rows (is_invalid_row_name)
+INVALID_ROW_KEYWORDS = ["total", "region", "summary", "all india", "northern region",
+                        "southern region", "western region", "eastern region", "north-eastern region",
+                        "north east", "north west", "south east", "south west", "total daily"]
+
 # ===========================
 # --- utility: tolerant column getter with synonyms ---
 # ===========================
@@ -157,10 +202,40 @@ def is_invalid_row_name(name):
     s = str(name).strip().lower()
     if s == "" or s in ["nan", "-", "--"]:
         return True
-    junk_keywords = ["total", "region", "summary", "all india", "northern region",
-                     "southern region", "western region", "eastern region", "north-eastern region",
-                     "north east", "north west", "south east", "south west", "total daily"]
-    return any(k in s for k in junk_keywords)
+    return any(k in s for k in INVALID_ROW_KEYWORDS)
+
+# --- column (Series) versions of the helpers above, one pass per sheet ---
+def map_distinct(col, fn):
+    """fn() applied once per distinct non-null value of col; None where col is null or fn gives None."""
+    mapped = col.map({v: fn(v) for v in pd.unique(col.dropna())})
+    return mapped.astype(object).where(mapped.notna(), None)
+
+def clean_numeric_series(col):
+    """clean_numeric() over a column: float Series, NaN where clean_numeric gives None."""
+    cleaned = col.astype(str).str.strip().str.replace(r"[^0-9.\-]", "", regex=True)
+    return pd.to_numeric(cleaned.where(col.notna()), errors="coerce")
+
+def invalid_row_name_mask(col):
+    """is_invalid_row_name() over a column (null cells count as invalid)."""
+    s = col.astype(str).str.strip().str.lower()
+    junk = s.str.contains("|".join(re.escape(k) for k in INVALID_ROW_KEYWORDS), regex=True)
+    return col.isna() | s.isin(["", "nan", "-", "--"]) | junk
+
+def resolve_state_code(state_name, db_states):
+    """State code for a cleaned state name: STATE table (normalized, lowercase keys), then STATE_CODE_MAP."""
+    if not state_name:
+        return None
+    normalized = normalize_state_name_for_lookup(state_name)
+    state_code = db_states.get(normalized.lower()) if normalized else None
+    if state_code is None and normalized:
+        state_code = STATE_CODE_MAP.get(normalized)
+    if state_code is None:
+        state_code = STATE_CODE_MAP.get(state_name.strip().upper())
+    return state_code
+
+def as_optional(col):
+    """Float column -> object column with None for NaN (DB NULL)."""
+    return col.astype(object).where(col.notna(), None)
 
 # ===========================
 # --- DB helpers ---
@@ -201,236 +276,321 @@ def ensure_date_exists(cursor, log_date):
                        (log_date, log_date.day, log_date.month, log_date.year))
         print(f"🗓️ Inserted {log_date} into DATE_DIM")
 
-def get_or_create_plant(cursor, plant_name, state_code, sector_id, type_id, next_id):
-    # plant_name assumed normalized (string)
-    cursor.execute("SELECT Plant_ID FROM POWERPLANTS WHERE Plant_Name = %s", (plant_name,))
-    r = cursor.fetchone()
-    if r:
-        return r['Plant_ID'], next_id
-    new_id = f'P{next_id}'
-    cursor.execute("""
-        INSERT INTO POWERPLANTS (Plant_ID, Plant_Name, State_Code, Sector_ID, Type_ID)
-        VALUES (%s,%s,%s,%s,%s)
-    """, (new_id, plant_name, state_code, sector_id, type_id))
-    print(f"-> Created new plant: {plant_name} (ID: {new_id})")
-    return new_id, next_id + 1
+class PlantNameIndex:
+    """Plant_Name -> Plant_ID map loaded once per run, plus the 'P<n>' ID counter.
+
+    Replaces the per-row POWERPLANTS lookup and the per-file MAX(Plant_ID) scan. Plants created
+    by lookup_or_create() are written together by insert_new() in one multi-row INSERT; commit()
+    keeps them, rollback() forgets the ones not committed (mirroring the DB transaction).
+    created lists the IDs of the plants committed since the index was loaded.
+    """
+    def __init__(self, ids_by_name=None, next_id=1):
+        self.ids_by_name = dict(ids_by_name or {})
+        self.next_id = next_id
+        self.created = []
+        self.new_plants = [] # (Plant_ID, Plant_Name, State_Code, Sector_ID, Type_ID) not yet inserted
+        self._uncommitted = []; self._committed_next_id = next_id
+
+    @staticmethod
+    def _key(plant_name):
+        # MySQL compares Plant_Name case-insensitively
+        return str(plant_name).casefold()
+
+    @classmethod
+    def load(cls, cursor):
+        cursor.execute("SELECT Plant_ID, Plant_Name FROM POWERPLANTS ORDER BY Plant_ID")
+        ids_by_name = {}
+        for r in cursor.fetchall():
+            if r['Plant_Name'] is not None:
+                ids_by_name.setdefault(cls._key(r['Plant_Name']), r['Plant_ID'])
+        index = cls(ids_by_name, get_next_plant_id(cursor))
+        print(f"🏭 Plant index loaded: {len(ids_by_name)} plants, next ID P{index.next_id}")
+        return index
+
+    def lookup_or_create(self, plant_name, state_code, sector_id, type_id):
+        key = self._key(plant_name)
+        plant_id = self.ids_by_name.get(key)
+        if plant_id is not None:
+            return plant_id
+        plant_id = f'P{self.next_id}'
+        self.next_id += 1
+        self.ids_by_name[key] = plant_id; self._uncommitted.append(key)
+        self.new_plants.append((plant_id, plant_name, state_code, sector_id, type_id))
+        print(f"-> Created new plant: {plant_name} (ID: {plant_id})")
+        return plant_id
+
+    def insert_new(self, cursor):
+        """Writes the plants created since the last call in one multi-row INSERT."""
+        if self.new_plants:
+            cursor.executemany("""
+                INSERT INTO POWERPLANTS (Plant_ID, Plant_Name, State_Code, Sector_ID, Type_ID)
+                VALUES (%s,%s,%s,%s,%s)
+            """, self.new_plants)
+        self.new_plants = []
+
+    def commit(self):
+        self.created.extend(self.ids_by_name[key] for key in self._uncommitted)
+        self._uncommitted = []; self._committed_next_id = self.next_id
+
+    def rollback(self):
+        for key in self._uncommitted:
+            self.ids_by_name.pop(key, None)
+        self._uncommitted = []; self.new_plants = []; self.next_id = self._committed_next_id
+
+def load_lookup_maps(cursor):
+    """STATE / SECTOR name -> code maps (lowercase keys), loaded once per run."""
+    return {
+        'states': fetch_lookup_map(cursor, "SELECT State_Name, State_Code FROM STATE", 'State_Name', 'State_Code'),
+        'sectors': fetch_lookup_map(cursor, "SELECT Sector_Name, Sector_ID FROM SECTOR", 'Sector_Name', 'Sector_ID')
+    }
 
 # --- sheet detection helper ---
-def detect_sheets(file_path):
-    xl = pd.ExcelFile(file_path)
+def detect_sheets(sheet_names):
     station_sheet = None
     summary_sheet = None
-    for s in xl.sheet_names:
+    for s in sheet_names:
         low = s.lower()
         if any(k in low for k in ['station', 'plant', 'stations', 'plants', 'details']):
             station_sheet = s
         if any(k in low for k in ['summary', 'state', 'region', 'state data']):
             summary_sheet = s
     if not station_sheet:
-        station_sheet = xl.sheet_names[0]
+        station_sheet = sheet_names[0]
     if not summary_sheet:
-        summary_sheet = xl.sheet_names[-1]
+        summary_sheet = sheet_names[-1]
     print(f"Detected sheets -> station: '{station_sheet}', summary: '{summary_sheet}'")
     return station_sheet, summary_sheet
 
+def sheet_to_frame(ws):
+    """DataFrame of a worksheet with its first row as header, like pd.read_excel(sheet_name=...):
+    trailing empty rows/columns dropped, blank headers named 'Unnamed: i', repeats suffixed '.1', '.2'."""
+    rows = [list(r) for r in ws.iter_rows(values_only=True)]
+    while rows and all(v is None for v in rows[-1]):
+        rows.pop()
+    width = max((max((i + 1 for i, v in enumerate(r) if v is not None), default=0) for r in rows), default=0)
+    if not rows or not width:
+        return pd.DataFrame()
+    rows = [(r + [None] * width)[:width] for r in rows]
+    columns, seen = [], {}
+    for i, v in enumerate(rows[0]):
+        name = f"Unnamed: {i}" if v is None else str(v)
+        n = seen.get(name, 0); seen[name] = n + 1
+        columns.append(f"{name}.{n}" if n else name)
+    return pd.DataFrame(rows[1:], columns=columns)
+
+def read_report_sheets(file_path):
+    """Opens the workbook once (read-only, cached values) and returns
+    (station_sheet, station_df, summary_sheet, summary_df)."""
+    wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        station_sheet, summary_sheet = detect_sheets(wb.sheetnames)
+        frames = {name: sheet_to_frame(wb[name]) for name in {station_sheet, summary_sheet}}
+    finally:
+        wb.close()
+    return station_sheet, frames[station_sheet], summary_sheet, frames[summary_sheet]
+
 # ====== Main integrated processor (core logic copied unchanged) ======
-def process_single_file(conn, cursor, file_path, report_date):
-    """Processes a single Excel file exactly like the original script logic."""
+def process_single_file(conn, cursor, file_path, report_date, bulk=None, plant_index=None, maps=None):
+    """Processes a single Excel file exactly like the original script logic.
+    New plants go out in one multi-row INSERT and the file's PRODUCTIONLOG rows in one batched
+    upsert per statement, then one commit.
+    bulk: BulkLoadWriter that stages the PRODUCTIONLOG rows instead of upserting them.
+    plant_index / maps: run-wide PlantNameIndex and load_lookup_maps() result (loaded here if not given).
+    Returns (rows written, seconds spent reading the workbook)."""
     print(f"\n================ Processing {os.path.basename(file_path)} ({report_date}) ================")
-    maps = {
-        'states': fetch_lookup_map(cursor, "SELECT State_Name, State_Code FROM STATE", 'State_Name', 'State_Code'),
-        'sectors': fetch_lookup_map(cursor, "SELECT Sector_Name, Sector_ID FROM SECTOR", 'Sector_Name', 'Sector_ID')
-    }
+    started = time.perf_counter()
+    station_sheet, df_st, summary_sheet, df_sum = read_report_sheets(file_path)
+    read_s = time.perf_counter() - started
+    return process_report_frames(conn, cursor, report_date, station_sheet, df_st, summary_sheet, df_sum, bulk, plant_index, maps), read_s
+
+def process_report_facts(conn, cursor, report_date, bulk=None, plant_index=None, maps=None):
+    """Same as process_single_file for one date of the fact store's re_station / re_summary datasets
+    (written by integrated_web_scrapping), reading only the columns used below."""
+    print(f"\n================ Processing fact store ({report_date}) ================")
+    started = time.perf_counter()
+    df_st = read_partition('re_station', report_date, RE_STATION_FACT_COLUMNS) if has_partition('re_station', report_date) else pd.DataFrame(columns=RE_STATION_FACT_COLUMNS)
+    df_sum = read_partition('re_summary', report_date, RE_SUMMARY_FACT_COLUMNS) if has_partition('re_summary', report_date) else pd.DataFrame(columns=RE_SUMMARY_FACT_COLUMNS)
+    # Nullable string columns -> object with None, like cells read from the workbook
+    df_st, df_sum = (df.astype(object).where(df.notna(), None) for df in (df_st, df_sum))
+    read_s = time.perf_counter() - started
+    return process_report_frames(conn, cursor, report_date, 're_station', df_st, 're_summary', df_sum, bulk, plant_index, maps), read_s
+
+def report_fact_paths(report_date):
+    """The fact store files one RE report date is loaded from (--from-facts)."""
+    return [partition_path(dataset, report_date) for dataset in ('re_station', 're_summary')]
+
+def process_report_frames(conn, cursor, report_date, station_sheet, df_st, summary_sheet, df_sum, bulk=None, plant_index=None, maps=None):
+    """Loads one report's station / summary tables (sheet names only label the output); returns the rows written."""
+    if maps is None:
+        maps = load_lookup_maps(cursor)
+    if plant_index is None:
+        plant_index = PlantNameIndex.load(cursor)
 
-    next_id = get_next_plant_id(cursor)
     ensure_date_exists(cursor, report_date)
-
-    station_sheet, summary_sheet = detect_sheets(file_path)
+    summary_rows = []  # (Plant_ID, Log_Date, Todays_Actual_MU)
+    station_rows = []  # (Plant_ID, Log_Date, Efficiency, Actual_MU, Capable_MU, Op_Cap_MW)
     skipped_state_list = []
 
     # --------- PROCESS SUMMARY (State Data) FIRST ----------
     print("\nProcessing summary data from sheet:", summary_sheet)
-    df_sum = pd.read_excel(file_path, sheet_name=summary_sheet)
     df_sum = df_sum.dropna(how='all')  # remove empty rows
-    # find columns for state and biomass/others-res (try multiple synonyms)
+    # find columns for state and biomass/others-res (try multiple synonyms), once per sheet
     state_col = pick_col(df_sum, ['State / Region', 'State', 'State Name', 'State / Region '])
     others_col = pick_col(df_sum, ['Others RES', 'Others RES (MU)', 'Biomass (MU)', 'Others', 'Total (MU)', 'Generation (MU)'])
+    alt_col = pick_col(df_sum, ['Generation (MU)', 'Daily Generation (MU)', 'Total (MU)', 'RE Generation (MU)'])
 
     if state_col is None:
         print("⚠️ Could not find a 'State / Region' column in summary sheet; aborting summary processing.")
     else:
-        summary_inserted = 0
-        summary_skipped = 0
-        for _, row in df_sum.iterrows():
-            raw_state = row.get(state_col)
-            state_name = clean_state_name(raw_state)
-            if state_name is None or is_invalid_row_name(state_name):
-                summary_skipped += 1
-                continue
-
-            normalized = normalize_state_name_for_lookup(state_name)
-            # Try DB map (lowercase keys), then fallback to STATE_CODE_MAP (uppercase keys)
-            state_code = None
-            if normalized:
-                state_code = maps['states'].get(normalized.lower())
-            if state_code is None:
-                # try alias map or direct canonical map
-                state_code = STATE_CODE_MAP.get(normalized)
-            if state_code is None:
-                # try one more: try raw uppercase trimmed
-                alt = STATE_CODE_MAP.get(state_name.strip().upper())
-                if alt:
-                    state_code = alt
-
-            if state_code is None:
-                print(f" -> Skipping state '{state_name}': not found in STATE table or STATE_CODE_MAP.")
-                skipped_state_list.append(state_name)
-                summary_skipped += 1
-                continue
+        # Whole-sheet cleaning: state names/codes per distinct value, numbers as Series ops
+        state_names = map_distinct(df_sum[state_col], clean_state_name)
+        named = ~invalid_row_name_mask(state_names)
+        state_codes = map_distinct(state_names, lambda name: resolve_state_code(name, maps['states']))
+        # read Others/Biomass value robustly; fall back to 'Generation (MU)'-like columns
+        actual_mu = clean_numeric_series(df_sum[others_col]) if others_col else pd.Series(float('nan'), index=df_sum.index)
+        if alt_col:
+            actual_mu = actual_mu.fillna(clean_numeric_series(df_sum[alt_col]))
+
+        unresolved = named & state_codes.isna()
+        for state_name in state_names[unresolved]:
+            print(f" -> Skipping state '{state_name}': not found in STATE table or STATE_CODE_MAP.")
+            skipped_state_list.append(state_name)
+        to_insert = named & ~unresolved & actual_mu.notna()
 
+        summary_inserted = 0
+        summary_skipped = len(df_sum) - int(to_insert.sum())
+        sector_id = 'CCT'
+        type_id = 'BIO'
+        for state_code, mu in zip(state_codes[to_insert], actual_mu[to_insert]):
             plant_name = f"Biomass_{state_code}"
-            sector_id = 'CCT'
-            type_id = 'BIO'
-
-            # read Others/Biomass value robustly
-            actual_mu = None
-            if others_col:
-                actual_mu = clean_numeric(row.get(others_col))
-            # Also try columns like 'Generation (MU)' or other synonyms if others_col missing
-            if actual_mu is None:
-                alt = pick_col(df_sum, ['Generation (MU)', 'Daily Generation (MU)', 'Total (MU)', 'RE Generation (MU)'])
-                if alt:
-                    actual_mu = clean_numeric(row.get(alt))
-
-            if actual_mu is None:
-                # nothing to insert
-                summary_skipped += 1
-                continue
-
-            plant_id, next_id = get_or_create_plant(cursor, plant_name, state_code, sector_id, type_id, next_id)
-            cursor.execute("""
-                INSERT INTO PRODUCTIONLOG (Plant_ID, Log_Date, Todays_Actual_MU)
-                VALUES (%s,%s,%s)
-                ON DUPLICATE KEY UPDATE Todays_Actual_MU = VALUES(Todays_Actual_MU)
-            """, (plant_id, report_date, actual_mu))
+            plant_id = plant_index.lookup_or_create(plant_name, state_code, sector_id, type_id)
+            summary_rows.append((plant_id, report_date, float(mu)))
             summary_inserted += 1
 
         print(f"Summary done: inserted={summary_inserted}, skipped={summary_skipped}")
 
     # --------- PROCESS STATION (Plant) DATA NEXT ----------
     print("\nProcessing station data from sheet:", station_sheet)
-    df_st = pd.read_excel(file_path, sheet_name=station_sheet)
     df_st = df_st.dropna(how='all')
-    # pick important columns with synonyms
+    # pick important columns with synonyms, once per sheet
     station_col = pick_col(df_st, ['Station', 'Station Name', 'Plant', 'Plant Name', 'Station/ Plant'])
     state_col_st = pick_col(df_st, ['State / Region', 'State', 'State Name'])
     op_cap_col = pick_col(df_st, ['Operational Capacity (MW)', 'Operational Capacity', 'Capacity (MW)', 'Operational_Capacity_MW'])
     actual_col = pick_col(df_st, ['Actual Generation (MU)', 'Actual Generation', 'Todays Actual (MU)', 'Todays_Actual_MU', 'Generation (MU)'])
     capable_col = pick_col(df_st, ['Capable Generation (MU)', 'Capable Generation', 'Capable_Generation_MU'])
     eff_col = pick_col(df_st, ['Efficiency (%)', 'Efficiency', 'Efficiency_Percentage'])
+    sector_col = pick_col(df_st, ['Sector', 'Sector Name'])
+    type_col = pick_col(df_st, ['Type', 'Plant Type', 'Technology'])
 
     if station_col is None:
         print("⚠️ Could not find 'Station' column in station sheet; aborting station processing.")
     else:
-        st_inserted = 0
-        st_skipped = 0
         type_name_map = {'solar': 'SO', 'wind': 'WI', 'hydro': 'HY', 'thermal': 'TH', 'nuclear': 'NU', 'biomass': 'BIO'}
-        for _, row in df_st.iterrows():
-            raw_plant = row.get(station_col)
-            if pd.isna(raw_plant):
-                st_skipped += 1
-                continue
-            plant_name = str(raw_plant).strip()
-            if is_blank_string(plant_name) or is_invalid_row_name(plant_name):
-                st_skipped += 1
-                continue
-
-            raw_state = row.get(state_col_st) if state_col_st else None
-            state_name = clean_state_name(raw_state)
-            normalized = normalize_state_name_for_lookup(state_name) if state_name else None
-            state_code = None
-            if normalized:
-                state_code = maps['states'].get(normalized.lower())
-            if state_code is None and normalized:
-                state_code = STATE_CODE_MAP.get(normalized)
-            if state_code is None and state_name:
-                state_code = STATE_CODE_MAP.get(state_name.strip().upper())
-
-            # Sector and Type mapping
-            sector_col = pick_col(df_st, ['Sector', 'Sector Name'])
-            sector_raw = row.get(sector_col) if sector_col else None
-            sector_id = maps['sectors'].get(str(sector_raw).strip().lower()) if sector_raw is not None else None
-            type_col = pick_col(df_st, ['Type', 'Plant Type', 'Technology'])
-            type_raw = row.get(type_col) if type_col else None
-            type_id = None
-            if type_raw is not None:
-                type_id = type_name_map.get(str(type_raw).strip().lower())
-
-            # If state not found, log and skip (we require a valid state to link)
-            if (state_name and state_code is None) or (not state_name):
-                print(f" -> Skipping plant '{plant_name}': state '{state_name}' not resolved.")
-                st_skipped += 1
-                continue
-
-            # Numeric fields
-            op_cap = clean_numeric(row.get(op_cap_col)) if op_cap_col else None
-            actual_mu = clean_numeric(row.get(actual_col)) if actual_col else None
-            capable_mu = clean_numeric(row.get(capable_col)) if capable_col else None
-            efficiency = clean_numeric(row.get(eff_col)) if eff_col else None
-
-            # Do not insert rows with no numeric payload
-            if op_cap is None and actual_mu is None and capable_mu is None and efficiency is None:
-                st_skipped += 1
-                continue
-
-            # create/find plant
-            plant_id, next_id = get_or_create_plant(cursor, plant_name, state_code, sector_id, type_id, next_id)
-
-            # Insert into productionlog: include fields if present
-            cursor.execute("""
-                INSERT INTO PRODUCTIONLOG
-                (Plant_ID, Log_Date, Efficiency_Percentage, Todays_Actual_MU, Capable_Generation_MU, Operational_Capacity_MW)
-                VALUES (%s, %s, %s, %s, %s, %s)
-                ON DUPLICATE KEY UPDATE
-                    Efficiency_Percentage = VALUES(Efficiency_Percentage),
-                    Todays_Actual_MU = VALUES(Todays_Actual_MU),
-                    Capable_Generation_MU = VALUES(Capable_Generation_MU),
-                    Operational_Capacity_MW = VALUES(Operational_Capacity_MW)
-            """, (plant_id, report_date, efficiency, actual_mu, capable_mu, op_cap))
+        no_value = pd.Series(None, index=df_st.index, dtype=object)
+
+        # Whole-sheet cleaning
+        raw_plants = df_st[station_col]
+        plant_names = raw_plants.astype(str).str.strip()
+        blank = plant_names.str.lower().isin(["", "nan", "none", "-", "--"])
+        named = raw_plants.notna() & ~blank & ~invalid_row_name_mask(plant_names)
+
+        state_names = map_distinct(df_st[state_col_st], clean_state_name) if state_col_st else no_value
+        state_codes = map_distinct(state_names, lambda name: resolve_state_code(name, maps['states']))
+
+        # Sector and Type mapping
+        sector_ids = (as_optional(df_st[sector_col].astype(str).str.strip().str.lower().map(maps['sectors']))
+                      if sector_col else no_value)
+        type_ids = (as_optional(df_st[type_col].astype(str).str.strip().str.lower().map(type_name_map))
+                    if type_col else no_value)
+
+        # Numeric fields
+        nan_col = pd.Series(float('nan'), index=df_st.index)
+        op_cap = clean_numeric_series(df_st[op_cap_col]) if op_cap_col else nan_col
+        actual_mu = clean_numeric_series(df_st[actual_col]) if actual_col else nan_col
+        capable_mu = clean_numeric_series(df_st[capable_col]) if capable_col else nan_col
+        efficiency = clean_numeric_series(df_st[eff_col]) if eff_col else nan_col
+
+        # If state not found, log and skip (we require a valid state to link)
+        unresolved = named & state_codes.isna()
+        for plant_name, state_name in zip(plant_names[unresolved], state_names[unresolved]):
+            print(f" -> Skipping plant '{plant_name}': state '{state_name}' not resolved.")
+        # Do not insert rows with no numeric payload
+        has_payload = op_cap.notna() | actual_mu.notna() | capable_mu.notna() | efficiency.notna()
+        to_insert = named & ~unresolved & has_payload
 
+        st_inserted = 0
+        st_skipped = len(df_st) - int(to_insert.sum())
+        rows = zip(plant_names[to_insert], state_codes[to_insert], sector_ids[to_insert], type_ids[to_insert],
+                   as_optional(efficiency[to_insert]), as_optional(actual_mu[to_insert]),
+                   as_optional(capable_mu[to_insert]), as_optional(op_cap[to_insert]))
+        for plant_name, state_code, sector_id, type_id, eff_val, actual_val, capable_val, op_cap_val in rows:
+            # create/find plant; productionlog includes fields if present
+            plant_id = plant_index.lookup_or_create(plant_name, state_code, sector_id, type_id)
+            station_rows.append((plant_id, report_date, eff_val, actual_val, capable_val, op_cap_val))
             st_inserted += 1
 
         print(f"Station done: inserted={st_inserted}, skipped={st_skipped}")
 
-    # commit once after both parts
+    # new plants first (PRODUCTIONLOG references them), then the file's production rows in batches
+    plant_index.insert_new(cursor)
+    if bulk is not None:
+        for row in summary_rows:
+            bulk.add('SUMMARY_LOG', row)
+        for row in station_rows:
+            bulk.add('STATION_LOG', row)
+    else:
+        if summary_rows:
+            cursor.executemany(SQL_SUMMARY_LOG, summary_rows)
+        if station_rows:
+            cursor.executemany(SQL_STATION_LOG, station_rows)
+
+    # commit once after both parts (staged rows are only merged at the end of the run)
     conn.commit()
+    plant_index.commit()
+    if bulk is not None:
+        bulk.flush()
     print("\n🎉 All data processed and committed.")
 
     if skipped_state_list:
         print("\n⚠️ The following states were present in the sheet but could not be resolved to a state code:")
         for s in sorted(set(skipped_state_list)):
             print("   -", s)
+    return len(summary_rows) + len(station_rows)
 
 # ===========================
 # Controller (multi-file loop & summary)
 # ===========================
-def main():
-    conn = None
+def main(bulk_load=BULK_LOAD, from_facts=FROM_FACTS, conn=None, touched_dates=None, new_plant_ids=None):
+    """Loads every report that is new or changed since its last load (INGEST_MANIFEST); returns True if no file failed. conn: an open connection to use
+    (e.g. from a pool) instead of connecting with DB_CONFIG; it is closed at the end as well.
+    touched_dates / new_plant_ids: sets that receive the report dates loaded and the Plant_IDs created."""
     cursor = None
+    bulk = None
     processed_count = 0
     skipped_pattern_count = 0
+    unchanged_count = 0
     failed_count = 0
 
     try:
-        conn = get_db_connection(DB_CONFIG)
+        conn = conn or get_db_connection({**DB_CONFIG, 'allow_local_infile': True} if bulk_load else DB_CONFIG)
         cursor = conn.cursor(dictionary=True)
+        maps = load_lookup_maps(cursor)
+        plant_index = PlantNameIndex.load(cursor)
+        manifest = IngestManifest(conn, 're_facts' if from_facts else 're', deferred=bulk_load)
+        print(f"➡️ Manifest: {len(manifest.entries)} files seen, last report loaded: {manifest.watermark()}")
+        if bulk_load:
+            bulk = BulkLoadWriter(BULK_TABLES, label='BULK')
+            print(f"➡️ Bulk-load mode: staging PRODUCTIONLOG rows in {bulk.work_dir}")
 
         print("➡️ Processing all valid files found in the folder...")
         print("   (ON DUPLICATE KEY UPDATE will refresh existing entries.)")
 
-        # gather valid files with parseable dates
+        # gather valid files with parseable dates (or the fact store's report dates)
         valid_files = []
-        for fname in os.listdir(REPORTS_FOLDER):
+        if from_facts:
+            fact_dates = sorted(set(partition_dates('re_station')) | set(partition_dates('re_summary')))
+            valid_files = [(d, f"fact store {d}") for d in fact_dates]
+        for fname in ([] if from_facts else os.listdir(REPORTS_FOLDER)):
             if not fname.lower().endswith(".xlsx"):
                 continue
             
@@ -466,36 +626,71 @@ def main():
 
         if not valid_files:
             print("No valid files found in folder. Exiting.")
-            return
+            return True
 
         print(f"Found {len(valid_files)} candidate files to process.") # This should now show 96
 
         for file_date, fname in valid_files:
-            
-            file_path = os.path.join(REPORTS_FOLDER, fname)
+            # skip files loaded before with the same content (new, changed or failed files are loaded)
+            needs_load, digest = manifest.check(fname, report_fact_paths(file_date) if from_facts else os.path.join(REPORTS_FOLDER, fname))
+            if not needs_load:
+                unchanged_count += 1
+                continue
+
+            started = time.perf_counter()
             try:
-                process_single_file(conn, cursor, file_path, file_date)
+                if from_facts:
+                    rows, read_s = process_report_facts(conn, cursor, file_date, bulk, plant_index, maps)
+                else:
+                    rows, read_s = process_single_file(conn, cursor, os.path.join(REPORTS_FOLDER, fname), file_date, bulk, plant_index, maps)
+                manifest.record(fname, digest, 'loaded', file_date, rows=rows, parse_s=read_s, load_s=time.perf_counter() - started - read_s)
                 processed_count += 1
+                if touched_dates is not None:
+                    touched_dates.add(file_date)
             except Exception as e:
                 print(f"❌ Error processing {fname}: {e}")
-                traceback.print_exc()
+                print(traceback.format_exc(), end="", file=sys.stderr)
+                manifest.record(fname, digest, 'failed', file_date, error=e)
+                if bulk is not None:
+                    bulk.discard()
                 try:
                     conn.rollback()
                 except Exception:
                     pass
+                plant_index.rollback()
                 failed_count += 1
                 # continue to next file
 
+        if new_plant_ids is not None:
+            new_plant_ids.update(plant_index.created)
+
+        # merge everything staged in bulk-load mode in one transaction
+        if bulk is not None:
+            try:
+                merged = bulk.merge(conn)
+                conn.commit()
+                print(f"📦 Bulk merge done: {merged}")
+                bulk.close()
+            except Exception as e:
+                print(f"❌ Bulk merge failed, staged rows rolled back (kept in {bulk.work_dir}): {e}")
+                conn.rollback()
+                manifest.discard() # the files stay new / changed for the next run
+                failed_count += 1
+        manifest.flush()
+
         # final summary
         print("\n================ SUMMARY ================\n")
         print(f"Attempted to process: {processed_count}")
+        print(f"Unchanged (skipped): {unchanged_count}")
         print(f"Skipped (bad pattern): {skipped_pattern_count}")
         print(f"Failed files       : {failed_count}")
         print("\n=========================================\n")
+        return failed_count == 0
 
     except Exception as e:
         print(f"❌ Fatal error: {e}")
-        traceback.print_exc()
+        print(traceback.format_exc(), end="", file=sys.stderr)
+        return False
     finally:
         if cursor:
             try:
@@ -510,4 +705,10 @@ def main():
             print("🔒 DB connection closed.")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Load cleaned renewable XLSX reports into IndianEnergyDB.")
+    parser.add_argument("--bulk-load", action="store_true", default=BULK_LOAD,
+                        help="Stage PRODUCTIONLOG rows in TSV files and merge them with LOAD DATA LOCAL INFILE at the end (backfills).")
+    parser.add_argument("--from-facts", action="store_true", default=FROM_FACTS,
+                        help="Read the RE facts from the fact store instead of the cleaned XLSX reports.")
+    args = parser.parse_args()
+    main(args.bulk_load, args.from_facts)
@@ -3,11 +3,24 @@ update_region_demand_mu.py
 
 Updates REGION_DETAILS.Demand_MU from state_daily_avg.csv
 only for dates that exist in DATE_DIM.
+
+By default only rows past the Demand_MU watermark (latest Report_Date that
+already has a demand value) or whose value differs from the stored one are
+written; --full re-upserts every CSV row. A run is skipped altogether when
+INGEST_MANIFEST shows the CSV unchanged since its last load and DATE_DIM holds
+the same dates as then.
 """
 
+import os
+import time
+import hashlib
+import argparse
+from decimal import Decimal, ROUND_HALF_UP
 import mysql.connector
 import pandas as pd
 from mysql.connector import Error
+from fact_store import partition_dates, partition_path, read_facts
+from ingest_manifest import IngestManifest
 
 # ---------- CONFIGURATION ----------
 DB_CONFIG = {
@@ -17,7 +30,21 @@ DB_CONFIG = {
     "database": "IndianEnergyDB"
 }
 
-CSV_FILE = "state_daily_avg.csv"
+CSV_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "state_daily_avg.csv")
+INCREMENTAL = True  # False (or --full): upsert every CSV row again
+BATCH_SIZE = 1000   # Rows per executemany() upsert
+DEMAND_SCALE = 2    # REGION_DETAILS.Demand_MU is DECIMAL(12, 2)
+MW_TO_MU = Decimal("0.024")  # trg_region_demand_before_insert: MW * 24 h / 1000
+LARGE_DEMAND_MU, LARGE_DEMAND_OFFSET = 100, 15  # ... minus 15 above 100 MU
+DATE_DIM_ENTRY = "DATE_DIM"  # Manifest row holding a hash of the DATE_DIM dates the demand was matched against
+FROM_FACTS = False  # Read the fact store's 'demand' dataset instead of CSV_FILE (--from-facts)
+
+UPSERT_DEMAND_SQL = """
+    INSERT INTO REGION_DETAILS (State_Code, Report_Date, Demand_MU)
+    VALUES (%s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        Demand_MU = VALUES(Demand_MU)
+"""
 
 
 # ---------- FUNCTIONS ----------
@@ -43,75 +70,191 @@ def get_existing_dates(conn):
     return dates_set
 
 
-def upsert_demand_mu(conn, df, valid_dates): # Renamed function
-    """
-    Insert or Update Demand_MU in REGION_DETAILS if the date exists.
-    Uses INSERT ... ON DUPLICATE KEY UPDATE.
-    """
+def get_state_codes(conn):
+    """Fetch all State_Code values from STATE (REGION_DETAILS rows must reference one)."""
     cursor = conn.cursor()
-    affected_rows = 0 # Will count inserts (1) and updates (2)
-    skipped = 0
-
-    for _, row in df.iterrows():
-        state_code = row["StateCode"]
-        date = pd.to_datetime(row["Date"]).date()
-        avg_demand = float(row["Avg_Demand"])
+    cursor.execute("SELECT State_Code FROM STATE")
+    codes = {r[0] for r in cursor.fetchall()}
+    cursor.close()
+    return codes
 
-        # Skip invalid dates
-        if date not in valid_dates:
-            skipped += 1
-            continue
 
-        # [REFINED] Changed from UPDATE to INSERT ... ON DUPLICATE KEY UPDATE
-        query = """
-            INSERT INTO REGION_DETAILS (State_Code, Report_Date, Demand_MU)
-            VALUES (%s, %s, %s)
-            ON DUPLICATE KEY UPDATE
-                Demand_MU = VALUES(Demand_MU)
-        """
-        
-        try:
-            cursor.execute(query, (state_code, date, avg_demand))
-            # Note: rowcount returns 1 for a new INSERT, 2 for an UPDATE
-            affected_rows += cursor.rowcount
-        except Error as e:
-            print(f"❌ Error upserting {state_code} on {date}: {e}")
-            skipped += 1
+def get_demand_watermark(conn):
+    """Latest Report_Date that already has a Demand_MU value (None if none)."""
+    cursor = conn.cursor()
+    cursor.execute("SELECT MAX(Report_Date) FROM REGION_DETAILS WHERE Demand_MU IS NOT NULL")
+    watermark = cursor.fetchone()[0]
+    cursor.close()
+    return watermark
 
 
-    conn.commit()
+def get_existing_demand(conn, start_date, end_date):
+    """Stored Demand_MU per (StateCode, Date) for Report_Date in [start_date, end_date]."""
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT State_Code, Report_Date, Demand_MU FROM REGION_DETAILS
+        WHERE Report_Date BETWEEN %s AND %s AND Demand_MU IS NOT NULL
+    """, (start_date, end_date))
+    rows = cursor.fetchall()
     cursor.close()
-    print(f"✅ Upserted (Inserted/Updated) {affected_rows} records in REGION_DETAILS.")
-    print(f"⚠️ Skipped {skipped} records (missing in DATE_DIM or error).")
+    existing = pd.DataFrame(rows, columns=["StateCode", "Date", "Stored_MU"])
+    existing["Stored_MU"] = existing["Stored_MU"].astype(float)
+    return existing
 
 
-# ---------- MAIN ----------
-def main():
-    print(f"📂 Reading data from {CSV_FILE} ...")
-    df = pd.read_csv(CSV_FILE)
+def stored_demand_mu(avg_demand):
+    """Demand_MU that trg_region_demand_before_insert stores for an Avg_Demand (MW) value."""
+    step = Decimal(1).scaleb(-DEMAND_SCALE)
+    mu = (Decimal(repr(float(avg_demand))).quantize(step, ROUND_HALF_UP) * MW_TO_MU).quantize(step, ROUND_HALF_UP)
+    return float(mu - LARGE_DEMAND_OFFSET if mu > LARGE_DEMAND_MU else mu)
+
 
-    # Check required columns
+def normalize_demand(df):
+    """Checks the CSV columns and normalizes Date / Avg_Demand (last row wins per state and date)."""
     required_cols = {"StateCode", "Date", "Avg_Demand"}
     if not required_cols.issubset(df.columns):
         raise ValueError(f"❌ CSV missing required columns: {required_cols - set(df.columns)}")
 
-    # Normalize data
+    df = df.copy()
     df["Date"] = pd.to_datetime(df["Date"]).dt.date
     df["Avg_Demand"] = pd.to_numeric(df["Avg_Demand"], errors="coerce").fillna(0)
+    return df.drop_duplicates(["StateCode", "Date"], keep="last")
+
+
+def select_rows_to_load(conn, df, valid_dates, incremental=INCREMENTAL):
+    """Rows of df to upsert: dates in DATE_DIM and, when incremental, either past the
+    watermark or whose Demand_MU (as the insert trigger converts it) differs from the stored one."""
+    df = df[df["Date"].isin(valid_dates)]
+    if not incremental or df.empty:
+        return df
+
+    watermark = get_demand_watermark(conn)
+    print(f"🔖 Demand watermark: {watermark}")
+    if watermark is None:
+        return df
+    newer = df["Date"] > watermark
+    older = df[~newer]
+    if older.empty:
+        return df
 
-    conn = connect_db()
+    # Rows up to the watermark only go out if missing or changed
+    existing = get_existing_demand(conn, older["Date"].min(), watermark)
+    merged = older.merge(existing, on=["StateCode", "Date"], how="left")
+    expected = merged["Avg_Demand"].map({v: stored_demand_mu(v) for v in merged["Avg_Demand"].unique()})
+    changed = merged["Stored_MU"].isna() | (expected != merged["Stored_MU"])
+    print(f"🔎 {int(newer.sum())} rows past the watermark, {int(changed.sum())} of {len(older)} older rows new or changed")
+    return pd.concat([merged.loc[changed, df.columns], df[newer]], ignore_index=True)
+
+
+def upsert_demand_mu(conn, df, valid_dates, incremental=INCREMENTAL, batch_size=BATCH_SIZE): # Renamed function
+    """
+    Insert or Update Demand_MU in REGION_DETAILS if the date and state exist.
+    Uses INSERT ... ON DUPLICATE KEY UPDATE, batch_size rows per executemany(); a failed batch
+    is retried row by row so only the bad rows are lost.
+    Returns the set of dates with a row written, the number of rows sent and the number that failed.
+    """
+    known_states = get_state_codes(conn)
+    unknown = ~df["StateCode"].isin(known_states)
+    if unknown.any():
+        print(f"⚠️ Ignoring {int(unknown.sum())} rows of states not in STATE: {sorted(df.loc[unknown, 'StateCode'].unique())}")
+    df = df[~unknown]
+    missing_dates = int((~df["Date"].isin(valid_dates)).sum())
+    to_load = select_rows_to_load(conn, df, valid_dates, incremental)
+    rows = [(state_code, date, float(avg_demand)) for state_code, date, avg_demand
+            in zip(to_load["StateCode"], to_load["Date"], to_load["Avg_Demand"])]
+
+    cursor = conn.cursor()
+    affected_rows = 0 # Will count inserts (1) and updates (2)
+    failed = 0
+    loaded_dates = set()
+
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        try:
+            cursor.executemany(UPSERT_DEMAND_SQL, batch)
+            # Note: rowcount counts 1 per new INSERT, 2 per UPDATE
+            affected_rows += cursor.rowcount
+            loaded_dates.update(row[1] for row in batch)
+            continue
+        except Error as e:
+            print(f"❌ Error upserting {len(batch)} rows from {batch[0][1]} ({e}); retrying row by row.")
+        for row in batch:
+            try:
+                cursor.execute(UPSERT_DEMAND_SQL, row)
+                affected_rows += cursor.rowcount
+                loaded_dates.add(row[1])
+            except Error as e:
+                print(f"❌ Error upserting {row[0]} on {row[1]}: {e}")
+                failed += 1
+
+    conn.commit()
+    cursor.close()
+    print(f"✅ Upserted (Inserted/Updated) {affected_rows} records in REGION_DETAILS ({len(rows)} rows sent).")
+    print(f"⏭️ Unchanged {len(df) - missing_dates - len(rows)} records.")
+    print(f"⚠️ Skipped {missing_dates} records missing in DATE_DIM, {failed} failed.")
+    return loaded_dates, len(rows), failed
+
+
+# ---------- MAIN ----------
+def main(incremental=INCREMENTAL, from_facts=FROM_FACTS, conn=None, touched_dates=None):
+    """Returns True once the demand rows are loaded; conn: an open connection to use (e.g. from a
+    pool) instead of connect_db(), closed at the end as well. touched_dates: a set that receives
+    the dates whose Demand_MU was written."""
+    conn = conn or connect_db()
     if not conn:
-        return
+        return False
 
     valid_dates = get_existing_dates(conn)
     print(f"📅 Loaded {len(valid_dates)} valid dates from DATE_DIM")
 
-    # [REFINED] Call the new function name
-    upsert_demand_mu(conn, df, valid_dates)
+    # Rows only load for dates in DATE_DIM, so its date set is an input like the file (any added
+    # date, backfills included, changes the hash)
+    manifest = IngestManifest(conn, "demand_facts" if from_facts else "demand")
+    name = "demand facts" if from_facts else os.path.basename(CSV_FILE)
+    paths = [partition_path("demand", d) for d in partition_dates("demand")] if from_facts else CSV_FILE
+    needs_load, digest = manifest.check(name, paths)
+    last_date = max(valid_dates, default=None)
+    dates_digest = hashlib.sha256(",".join(sorted(d.isoformat() for d in valid_dates)).encode()).hexdigest()
+    matched = manifest.entries.get(DATE_DIM_ENTRY, {})
+    if incremental and not needs_load and matched.get("status") == "loaded" and matched.get("hash") == dates_digest:
+        print(f"⏭️ {name} and the DATE_DIM dates unchanged since the last load, nothing to do.")
+        conn.close()
+        return True
+
+    started = time.perf_counter()
+    try:
+        if from_facts:
+            print("📂 Reading demand facts from the fact store ...")
+            df = normalize_demand(read_facts("demand", columns=["StateCode", "Avg_Demand"]).astype({"StateCode": object}))
+        else:
+            print(f"📂 Reading data from {os.path.basename(CSV_FILE)} ...")
+            df = normalize_demand(pd.read_csv(CSV_FILE))
+        parse_s = time.perf_counter() - started
+
+        # [REFINED] Call the new function name
+        loaded_dates, rows_sent, failed = upsert_demand_mu(conn, df, valid_dates, incremental)
+    except Exception as e:
+        manifest.record(name, digest, "failed", last_date, error=e)
+        conn.close()
+        raise
+    # Any failed row leaves the CSV 'failed' (and DATE_DIM unmatched) so the next run retries it
+    manifest.record(name, digest, "failed" if failed else "loaded", last_date, rows=rows_sent, parse_s=parse_s,
+                    load_s=time.perf_counter() - started - parse_s, error=f"{failed} rows failed" if failed else None)
+    if not failed:
+        manifest.record(DATE_DIM_ENTRY, dates_digest, "loaded", last_date, rows=len(valid_dates))
+    if touched_dates is not None:
+        touched_dates.update(loaded_dates)
 
     conn.close()
     print("🔚 MySQL connection closed.")
+    return True
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Update REGION_DETAILS.Demand_MU from state_daily_avg.csv")
+    parser.add_argument("--full", action="store_true",
+                        help="Upsert every CSV row instead of only new or changed ones")
+    parser.add_argument("--from-facts", action="store_true", default=FROM_FACTS,
+                        help="Read the fact store's demand dataset instead of the CSV")
+    args = parser.parse_args()
+    main(incremental=INCREMENTAL and not args.full, from_facts=args.from_facts)
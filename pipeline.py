@@ -0,0 +1,282 @@
+"""
+pipeline.py
+
+In-process orchestrator for the data-update pipeline. The stages of
+integrated_web_scrapping / parseall1 / parseall2 / parseall3 and the post-load SQL refresh run
+as a dependency graph in one interpreter, sharing one MySQL connection pool:
+
+  zip_sync ──> parse_dgr ─────────────────────┐
+  pdf_download ──> pdf_extract ──> parse_re ───┼──> load_demand ──> refresh
+  demand_fetch ────────────────────────────────┘
+
+A stage starts as soon as all its dependencies have finished (successfully or not, like the
+old sequential script runs), so the DGR and RE branches and the Merit-India fetch overlap.
+Stages naming the same resource never overlap (parse_dgr / parse_re both write POWERPLANTS
+and DATE_DIM). Each stage's prints are captured separately for its result, without touching the
+process's working directory or sys.stdout / sys.stderr (the backend runs this in its own process):
+the scripts resolve their data folders from their own location, and the print() of the script
+modules is swapped for stage_print(). The loaders report the report dates they wrote, and the
+refresh recomputes only those (--full-refresh: all).
+
+  python pipeline.py [--workers 4] [--full-refresh]
+"""
+
+import io
+import os
+import sys
+import time
+import argparse
+import builtins
+import importlib
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+# ---------- CONFIGURATION ----------
+BASE_DIR = os.path.dirname(os.path.abspath(__file__)) # Folder of the stage scripts (added to sys.path)
+STAGE_WORKERS = 4 # Stages running at the same time
+POOL_NAME = "data_update"
+POOL_SIZE = 4
+OUTPUT_TAIL = 500 # Characters of each stage's output kept in its result
+GRID_FREQUENCY_SQL = "UPDATE REGION_DETAILS SET Grid_Frequency_Hz = 60.00"
+REFRESH_PROCEDURES = [
+    'sp_UpdateRegionGenerationFromProduction',
+    'sp_UpdateRegionSurplusAndImports',
+    'sp_CalculatePlantEfficiency',
+    'sp_InsertAllMissingActiveStatuses',
+]
+FULL_REFRESH = False # True (or --full-refresh): recompute every date instead of the ones just loaded
+CREATE_DATES_SQL = "CREATE TEMPORARY TABLE IF NOT EXISTS tmp_ingest_dates (Report_Date DATE PRIMARY KEY)"
+CREATE_PLANTS_SQL = "CREATE TEMPORARY TABLE IF NOT EXISTS tmp_new_plants (Plant_ID VARCHAR(20) PRIMARY KEY)"
+GRID_FREQUENCY_DATES_SQL = ("UPDATE REGION_DETAILS rd JOIN tmp_ingest_dates t ON rd.Report_Date = t.Report_Date "
+                            "SET rd.Grid_Frequency_Hz = 60.00")
+REFRESH_DATE_PROCEDURES = [ # Date-scoped variants (DML.sql), read tmp_ingest_dates / tmp_new_plants
+    'sp_UpdateRegionGenerationForDates',
+    'sp_UpdateRegionSurplusAndImportsForDates',
+    'sp_CalculatePlantEfficiencyForDates',
+    'sp_InsertMissingActiveStatusesForDates',
+]
+STAGE_MODULES = [ # Modules whose print() output is captured per stage
+    'integrated_web_scrapping', 'cea_downloader', 'remote_zip', 'fact_store', 'bulk_loader',
+    'keyword_matcher', 'ingest_manifest', 'parseall1', 'parseall2', 'parseall3',
+]
+
+_RUN_LOCK = threading.Lock() # One pipeline run per interpreter (stages share the scripts' module state)
+
+
+class Stage:
+    """One node of the graph: fn(ctx) runs once every stage in deps has finished; a False or
+    non-zero return (or an exception) marks it failed. resources: names of locks held while it runs."""
+    def __init__(self, name, step, fn, deps=(), resources=()):
+        self.name = name; self.step = step; self.fn = fn
+        self.deps = tuple(deps); self.resources = tuple(sorted(resources))
+
+
+# ---------------------------
+# OUTPUT CAPTURE (per stage thread)
+# ---------------------------
+_capture = threading.local() # .buffer: output buffer of the stage running in this thread
+
+def stage_print(*args, file=None, **kwargs):
+    """print() of the stage modules: in a stage thread, output meant for stdout / stderr goes to
+    the stage's buffer; other threads (and other files) print as usual."""
+    buffer = getattr(_capture, 'buffer', None)
+    if buffer is not None and file in (None, sys.stdout, sys.stderr): file = buffer
+    builtins.print(*args, file=file, **kwargs)
+
+def _install_stage_print():
+    for name in STAGE_MODULES:
+        try: module = importlib.import_module(name)
+        except Exception: continue # The stage importing it fails and reports the error
+        module.print = stage_print # Module global, shadows the builtin inside that module only
+
+
+# ---------------------------
+# STAGES
+# ---------------------------
+class PipelineContext:
+    """What stages share: the connection pool (created on first use) and the report dates and
+    Plant_IDs the loaders wrote / created, which the refresh recomputes."""
+    def __init__(self, db_config=None, pool_size=POOL_SIZE, full_refresh=FULL_REFRESH):
+        self.db_config = db_config; self.pool_size = pool_size; self.full_refresh = full_refresh
+        self.touched_dates = set(); self.new_plant_ids = set()
+        self._pool = None; self._lock = threading.Lock()
+
+    def connection(self):
+        from mysql.connector import pooling
+        with self._lock:
+            if self._pool is None:
+                import parseall1
+                self._pool = pooling.MySQLConnectionPool(pool_name=POOL_NAME, pool_size=self.pool_size,
+                                                         **(self.db_config or parseall1.DB_CONFIG))
+        return self._pool.get_connection()
+
+
+def _scrape(fn_name):
+    def run(ctx):
+        import integrated_web_scrapping
+        getattr(integrated_web_scrapping, fn_name)()
+    return run
+
+def parse_dgr(ctx):
+    import parseall1
+    return parseall1.main(cnx=ctx.connection(), touched_dates=ctx.touched_dates, new_plant_ids=ctx.new_plant_ids) == 0
+
+def parse_re(ctx):
+    import parseall2
+    return parseall2.main(conn=ctx.connection(), touched_dates=ctx.touched_dates, new_plant_ids=ctx.new_plant_ids)
+
+def load_demand(ctx):
+    import parseall3
+    return parseall3.main(conn=ctx.connection(), touched_dates=ctx.touched_dates)
+
+def _call_procedure(name):
+    def run(cursor):
+        cursor.callproc(name)
+        for result in cursor.stored_results(): result.fetchall()
+    return run
+
+def _refresh_steps(ctx):
+    """[(result key, label, run(cursor))] of the refresh: the whole tables with ctx.full_refresh,
+    otherwise only the report dates and new plants of this run (tmp_ingest_dates / tmp_new_plants, see DML.sql)."""
+    if ctx.full_refresh:
+        return ([('query', 'UPDATE REGION_DETAILS', lambda cursor: cursor.execute(GRID_FREQUENCY_SQL))]
+                + [('procedure', name, _call_procedure(name)) for name in REFRESH_PROCEDURES])
+    return ([('query', 'UPDATE REGION_DETAILS (touched dates)', lambda cursor: cursor.execute(GRID_FREQUENCY_DATES_SQL))]
+            + [('procedure', name, _call_procedure(name)) for name in REFRESH_DATE_PROCEDURES])
+
+def refresh_region_details(ctx):
+    """Grid frequency and the post-load stored procedures; one statement per transaction, later
+    ones still run if one fails. Returns a list of {query|procedure, success[, error]}."""
+    touched, new_plants = sorted(ctx.touched_dates), sorted(ctx.new_plant_ids)
+    if not ctx.full_refresh and not touched and not new_plants:
+        stage_print("No report dates loaded, nothing to refresh.")
+        return [{'query': 'refresh', 'success': True, 'skipped': True}]
+    details = []
+    conn = ctx.connection()
+    try:
+        if not ctx.full_refresh:
+            stage_print(f"Refreshing {len(touched)} report dates" + (f" ({touched[0]} .. {touched[-1]})" if touched else "")
+                  + f", {len(new_plants)} new plants")
+            cursor = conn.cursor()
+            cursor.execute(CREATE_DATES_SQL); cursor.execute(CREATE_PLANTS_SQL)
+            cursor.execute("DELETE FROM tmp_ingest_dates"); cursor.execute("DELETE FROM tmp_new_plants")
+            if touched: cursor.executemany("INSERT INTO tmp_ingest_dates (Report_Date) VALUES (%s)", [(d,) for d in touched])
+            if new_plants: cursor.executemany("INSERT INTO tmp_new_plants (Plant_ID) VALUES (%s)", [(p,) for p in new_plants])
+            conn.commit()
+            cursor.close()
+        for key, label, run in _refresh_steps(ctx):
+            cursor = conn.cursor()
+            try:
+                run(cursor)
+                conn.commit()
+                details.append({key: label, 'success': True})
+                stage_print(f"Successfully ran {label}")
+            except Exception as e:
+                conn.rollback()
+                details.append({key: label, 'success': False, 'error': str(e)})
+                stage_print(f"Error running {label}: {e}")
+            finally:
+                cursor.close()
+    finally:
+        conn.close()
+    return details
+
+def default_stages():
+    return [
+        Stage('zip_sync', 'DGR Report Sync', _scrape('sync_daily_plant_reports')),
+        Stage('parse_dgr', 'Parse Phase 1', parse_dgr, deps=['zip_sync'], resources=['plants']),
+        Stage('pdf_download', 'RE PDF Download', _scrape('download_renewable_pdfs')),
+        Stage('pdf_extract', 'RE PDF Extraction', _scrape('process_renewable_pdfs'), deps=['pdf_download']),
+        Stage('parse_re', 'Parse Phase 2', parse_re, deps=['pdf_extract'], resources=['plants']),
+        Stage('demand_fetch', 'Demand Fetch', _scrape('compute_state_daily_averages')),
+        Stage('load_demand', 'Parse Phase 3', load_demand, deps=['parse_dgr', 'parse_re', 'demand_fetch']),
+        Stage('refresh', 'Database Updates', refresh_region_details, deps=['load_demand']),
+    ]
+
+
+# ---------------------------
+# SCHEDULER
+# ---------------------------
+def _check_graph(stages):
+    names = [s.name for s in stages]
+    if len(set(names)) != len(names): raise ValueError("duplicate stage names")
+    pending = {s.name: set(s.deps) for s in stages}
+    for s in stages:
+        unknown = set(s.deps) - set(names)
+        if unknown: raise ValueError(f"stage {s.name} depends on unknown stages {sorted(unknown)}")
+    while pending:
+        ready = [n for n, deps in pending.items() if not deps & set(pending)]
+        if not ready: raise ValueError(f"dependency cycle among {sorted(pending)}")
+        for n in ready: del pending[n]
+
+def _run_stage(stage, ctx, locks):
+    """Result dict of one stage: step, success, duration_s, output tail, error (and details)."""
+    buffer = io.StringIO()
+    _capture.buffer = buffer
+    held = [locks[r] for r in stage.resources]
+    for lock in held: lock.acquire()
+    started = time.monotonic()
+    result = {'stage': stage.name, 'step': stage.step}
+    try:
+        value = stage.fn(ctx)
+        if isinstance(value, list):
+            result['details'] = value
+            result['success'] = all(d.get('success', False) for d in value)
+        else:
+            result['success'] = value is not False
+        result['error'] = '' if result['success'] else 'stage reported failures'
+    except Exception as e:
+        buffer.write(traceback.format_exc())
+        result['success'] = False; result['error'] = str(e)
+    finally:
+        result['duration_s'] = round(time.monotonic() - started, 2)
+        for lock in reversed(held): lock.release()
+        _capture.buffer = None
+    result['output'] = buffer.getvalue()[-OUTPUT_TAIL:]
+    return result
+
+def run_pipeline(stages=None, workers=STAGE_WORKERS, db_config=None, on_event=None, cancel_event=None,
+                 full_refresh=FULL_REFRESH):
+    """Runs the stage graph and returns the stage results in definition order.
+    on_event(name, state, result): called with 'running' when a stage starts, 'done' when it ends
+    and 'cancelled' for stages never started because cancel_event (a threading.Event) was set;
+    running stages are not interrupted, the run stops once they finish."""
+    stages = stages or default_stages()
+    _check_graph(stages)
+    locks = {r: threading.Lock() for s in stages for r in s.resources}
+    ctx = PipelineContext(db_config, full_refresh=full_refresh)
+    results = {}
+    with _RUN_LOCK:
+        if BASE_DIR not in sys.path: sys.path.insert(0, BASE_DIR)
+        _install_stage_print()
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            running = {}
+            while len(results) < len(stages):
+                for stage in stages:
+                    if stage.name in results or stage.name in running.values(): continue
+                    if cancel_event is not None and cancel_event.is_set():
+                        results[stage.name] = {'stage': stage.name, 'step': stage.step, 'success': False, 'cancelled': True,
+                                               'error': 'cancelled', 'duration_s': 0.0, 'output': ''}
+                        if on_event: on_event(stage.name, 'cancelled', results[stage.name])
+                    elif all(d in results for d in stage.deps):
+                        if on_event: on_event(stage.name, 'running', None)
+                        running[executor.submit(_run_stage, stage, ctx, locks)] = stage.name
+                if not running: continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    results[name] = future.result()
+                    print(f"[PIPELINE] {name}: {'ok' if results[name]['success'] else 'FAILED'} in {results[name]['duration_s']}s")
+                    if on_event: on_event(name, 'done', results[name])
+    return [results[s.name] for s in stages]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the whole data-update pipeline in one process")
+    parser.add_argument("--workers", type=int, default=STAGE_WORKERS, help="Stages running at the same time")
+    parser.add_argument("--full-refresh", action="store_true", default=FULL_REFRESH,
+                        help="Recompute REGION_DETAILS / PRODUCTIONLOG for every date, not only the ones just loaded")
+    args = parser.parse_args()
+    for r in run_pipeline(workers=args.workers, full_refresh=args.full_refresh):
+        print(f"{r['stage']:<14} {'ok' if r['success'] else 'FAILED':<7} {r['duration_s']:>8}s  {r['error']}")
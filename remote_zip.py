@@ -0,0 +1,77 @@
+"""
+remote_zip.py
+
+Seekable read-only file over HTTP Range requests, so zipfile.ZipFile can read a
+remote archive's central directory and single members without downloading it.
+"""
+
+import io
+import requests
+from collections import OrderedDict
+
+BLOCK_SIZE = 256 * 1024  # Bytes per cached block; each miss fetches whole blocks
+MAX_BLOCKS = 64          # Blocks kept in memory (LRU)
+
+
+class RangeNotSupported(Exception):
+    pass
+
+
+class HttpRangeFile(io.RawIOBase):
+    """File-like view of a remote file; reads become Range requests for the missing blocks.
+    Raises RangeNotSupported if the server does not answer a Range probe with 206."""
+    def __init__(self, url, session=None, timeout=60, block_size=BLOCK_SIZE, max_blocks=MAX_BLOCKS):
+        self.session = session or requests.Session()
+        self.timeout = timeout; self.block_size = block_size; self.max_blocks = max_blocks
+        self.blocks = OrderedDict(); self.pos = 0; self.bytes_fetched = 0
+        # Probe: resolves redirects once and reads the total size from Content-Range
+        with self.session.get(url, headers={'Range': 'bytes=0-0'}, stream=True, timeout=timeout) as r:
+            content_range = r.headers.get('Content-Range', '')
+            if r.status_code != 206 or '/' not in content_range or content_range.endswith('/*'):
+                raise RangeNotSupported(f"{url} answered {r.status_code} to a Range request")
+            self.url = r.url; self.size = int(content_range.rsplit('/', 1)[1])
+
+    def readable(self): return True
+    def seekable(self): return True
+    def tell(self): return self.pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET: self.pos = offset
+        elif whence == io.SEEK_CUR: self.pos += offset
+        elif whence == io.SEEK_END: self.pos = self.size + offset
+        else: raise ValueError(f"invalid whence: {whence}")
+        self.pos = max(self.pos, 0)
+        return self.pos
+
+    def _fetch(self, first, last):
+        # One request for blocks first..last (inclusive)
+        start = first * self.block_size; end = min((last + 1) * self.block_size, self.size) - 1
+        r = self.session.get(self.url, headers={'Range': f"bytes={start}-{end}"}, timeout=self.timeout)
+        r.raise_for_status()
+        if r.status_code != 206:
+            raise RangeNotSupported(f"{self.url} answered {r.status_code} to a Range request")
+        data = r.content; self.bytes_fetched += len(data)
+        fetched = {n: data[(n - first) * self.block_size:(n - first + 1) * self.block_size] for n in range(first, last + 1)}
+        for n, block in fetched.items():
+            self.blocks[n] = block; self.blocks.move_to_end(n)
+        while len(self.blocks) > self.max_blocks:
+            self.blocks.popitem(last=False)
+        return fetched
+
+    def read(self, size=-1):
+        end = self.size if size is None or size < 0 else min(self.pos + size, self.size)
+        if self.pos >= end: return b''
+        first, last = self.pos // self.block_size, (end - 1) // self.block_size
+        missing = any(n not in self.blocks for n in range(first, last + 1))
+        fetched = self._fetch(first, last) if missing else {}
+        for n in range(first, last + 1):
+            if n in self.blocks: self.blocks.move_to_end(n)
+        data = b''.join(fetched[n] if n in fetched else self.blocks[n] for n in range(first, last + 1))
+        offset = self.pos - first * self.block_size
+        data = data[offset:offset + end - self.pos]
+        self.pos += len(data)
+        return data
+
+    def readinto(self, buffer):
+        data = self.read(len(buffer)); buffer[:len(data)] = data
+        return len(data)